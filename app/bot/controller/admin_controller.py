@@ -1,206 +1,347 @@
+import asyncio
+import csv
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
 from sqlalchemy.future import select
 from sqlalchemy import func
-from sqlalchemy.orm import selectinload
 
 from app.core.extensions.utils import WORKDIR
+from app.core.utils.executor import run_blocking
 
 SAFE_ROWS_PER_SHEET = 950000  # 90% of Excel's limit for safety
-BATCH_SIZE = 1000  # Process users in batches
+BATCH_SIZE = 5000  # Bitta sahifada olinadigan foydalanuvchilar
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+
+# (sarlavha, ustun kengligi) - kenglik oldindan belgilanadi, kataklar qayta o'qilmaydi
+EXPORT_COLUMNS = [
+    ("ID", 10),
+    ("Telegram ID", 14),
+    ("Full Name", 30),
+    ("Username", 22),
+    ("Language", 10),
+    ("Premium", 12),
+    ("Last Active", 18),
+    ("Referred By", 14),
+    ("Active Status", 14),
+    ("Balance", 10),
+    ("Created At", 18),
+    ("Updated At", 18),
+    ("Text Downloads", 16),
+    ("Voice Downloads", 16),
+    ("YouTube Downloads", 18),
+    ("TikTok Downloads", 17),
+    ("Likee Downloads", 16),
+    ("Snapchat Downloads", 19),
+    ("Instagram Downloads", 20),
+    ("Twitter Downloads", 18),
+]
+
+PARQUET_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("tg_id", pa.int64()),
+        ("full_name", pa.string()),
+        ("username", pa.string()),
+        ("language_code", pa.string()),
+        ("is_tg_premium", pa.bool_()),
+        ("last_active", pa.timestamp("us")),
+        ("referred_by", pa.int64()),
+        ("is_active", pa.bool_()),
+        ("balance", pa.float64()),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+        ("from_text", pa.int64()),
+        ("from_voice", pa.int64()),
+        ("from_youtube", pa.int64()),
+        ("from_tiktok", pa.int64()),
+        ("from_like", pa.int64()),
+        ("from_snapchat", pa.int64()),
+        ("from_instagram", pa.int64()),
+        ("from_twitter", pa.int64()),
+    ]
+)
+
+ExportProgress = Callable[[int, int], Awaitable[None]]
+
+
+def _format_date(value: datetime | None) -> str:
+    return value.strftime("%Y-%m-%d %H:%M") if value else "N/A"
+
+
+def _display_row(row: tuple) -> list:
+    """Excel/CSV uchun o'qishga qulay ko'rinish"""
+    (
+        user_id,
+        tg_id,
+        full_name,
+        username,
+        language_code,
+        is_tg_premium,
+        last_active,
+        referred_by,
+        is_active,
+        balance,
+        created_at,
+        updated_at,
+        *stats,
+    ) = row
+    return [
+        user_id,
+        tg_id,
+        full_name,
+        f"@{username}" if username else "N/A",
+        language_code or "N/A",
+        "⭐ Premium" if is_tg_premium else "Standard",
+        _format_date(last_active),
+        referred_by or "N/A",
+        "✅ Active" if is_active else "❌ Inactive",
+        balance if balance is not None else 0.0,
+        _format_date(created_at),
+        _format_date(updated_at),
+        *stats,
+    ]
+
+
+class _XlsxExportWriter:
+    """openpyxl write-only rejimi - qatorlar xotirada saqlanmay diskka yoziladi"""
+
+    header_font = Font(name="Calibri", size=12, bold=True, color="FFFFFF")
+    header_fill = PatternFill(
+        start_color="2F5597", end_color="2F5597", fill_type="solid"
+    )
+    header_alignment = Alignment(horizontal="center", vertical="center")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.wb = Workbook(write_only=True)
+        self.ws = None
+        self.sheet_rows = 0
+        self.sheet_count = 0
+
+    def _new_sheet(self) -> None:
+        self.sheet_count += 1
+        name = "Users" if self.sheet_count == 1 else f"Users_{self.sheet_count}"
+        self.ws = self.wb.create_sheet(name)
+        self.ws.freeze_panes = "A2"
+        header = []
+        for idx, (title, width) in enumerate(EXPORT_COLUMNS, 1):
+            self.ws.column_dimensions[get_column_letter(idx)].width = width
+            cell = WriteOnlyCell(self.ws, value=title)
+            cell.font = self.header_font
+            cell.fill = self.header_fill
+            cell.alignment = self.header_alignment
+            header.append(cell)
+        self.ws.append(header)
+        self.sheet_rows = 0
+
+    def write(self, rows: list[tuple]) -> None:
+        for row in rows:
+            if self.ws is None or self.sheet_rows >= SAFE_ROWS_PER_SHEET:
+                self._new_sheet()
+            self.ws.append(_display_row(row))
+            self.sheet_rows += 1
+
+    def close(self) -> None:
+        if self.ws is None:
+            self._new_sheet()
+        self.wb.save(self.path)
+
+
+class _CsvExportWriter:
+    def __init__(self, path: str):
+        self.path = path
+        # utf-8-sig - Excel kirill/emoji larni to'g'ri ochishi uchun
+        self.file = open(path, "w", newline="", encoding="utf-8-sig")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([title for title, _ in EXPORT_COLUMNS])
+
+    def write(self, rows: list[tuple]) -> None:
+        self.writer.writerows(_display_row(row) for row in rows)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ParquetExportWriter:
+    """Har bir sahifa alohida row group sifatida yoziladi"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writer = pq.ParquetWriter(path, PARQUET_SCHEMA, compression="zstd")
+
+    def write(self, rows: list[tuple]) -> None:
+        columns = list(zip(*rows))
+        self.writer.write_table(
+            pa.Table.from_arrays(
+                [
+                    pa.array(column, type=field.type)
+                    for column, field in zip(columns, PARQUET_SCHEMA)
+                ],
+                schema=PARQUET_SCHEMA,
+            )
+        )
+
+    def close(self) -> None:
+        self.writer.close()
 
 
-async def export_users_to_excel(
+_EXPORT_WRITERS = {
+    "xlsx": _XlsxExportWriter,
+    "csv": _CsvExportWriter,
+    "parquet": _ParquetExportWriter,
+}
+
+
+def _discard_export(writer, path: str) -> None:
+    try:
+        writer.close()
+    except Exception:
+        pass
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def _fetch_user_rows(after_tg_id: int, active_since: datetime) -> list[tuple]:
+    """Keyset pagination: tg_id bo'yicha keyingi sahifa, ORM obyektlarisiz"""
+    from app.bot.models import Statistics, User
+    from app.core.databases.postgres import get_general_session
+
+    query = (
+        select(
+            User.id,
+            User.tg_id,
+            func.concat_ws(" ", User.first_name, User.last_name).label("full_name"),
+            User.username,
+            User.language_code,
+            User.is_tg_premium,
+            User.last_active,
+            User.referred_by,
+            (User.last_active > active_since).label("is_active"),
+            User.balance,
+            User.created_at,
+            User.updated_at,
+            *(
+                func.coalesce(getattr(Statistics, field), 0)
+                for field in (
+                    "from_text",
+                    "from_voice",
+                    "from_youtube",
+                    "from_tiktok",
+                    "from_like",
+                    "from_snapchat",
+                    "from_instagram",
+                    "from_twitter",
+                )
+            ),
+        )
+        .outerjoin(Statistics, Statistics.tg_id == User.tg_id)
+        .where(User.tg_id > after_tg_id)
+        .order_by(User.tg_id)
+        .limit(BATCH_SIZE)
+    )
+    async with get_general_session() as session:
+        result = await session.execute(query)
+        return [tuple(row) for row in result]
+
+
+async def export_users(
+    fmt: str = "xlsx",
     save_path: str = str(WORKDIR.parent / "media" / "xlsx"),
+    progress: Optional[ExportProgress] = None,
 ) -> str:
+    """
+    Foydalanuvchilarni xlsx/csv/parquet faylga oqim bilan eksport qiladi.
+    Xotirada bir vaqtda ko'pi bilan ikki sahifa turadi: keyingi sahifa bazadan
+    olinayotganda oldingisi alohida thread da faylga yoziladi.
+    """
     from app.bot.models import User
     from app.core.databases.postgres import get_general_session
 
-    os.makedirs(save_path, exist_ok=True)
+    if fmt not in _EXPORT_WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
 
+    os.makedirs(save_path, exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"users_export_{timestamp}.xlsx"
-    full_path = os.path.join(save_path, filename)
+    full_path = os.path.join(save_path, f"users_export_{timestamp}.{fmt}")
 
     async with get_general_session() as session:
-        total_count_result = await session.execute(select(func.count(User.id)))
-        total_users = total_count_result.scalar()
+        total = (await session.execute(select(func.count(User.id)))).scalar()
 
-        sheets_needed = max(
-            1, (total_users + SAFE_ROWS_PER_SHEET - 1) // SAFE_ROWS_PER_SHEET
-        )
+    active_since = datetime.now() - timedelta(days=30)
+    writer = await run_blocking("export", _EXPORT_WRITERS[fmt], full_path)
+    done = 0
+    try:
+        rows = await _fetch_user_rows(0, active_since)
+        while rows:
+            # tg_id - ikkinchi ustun
+            _, next_rows = await asyncio.gather(
+                run_blocking("export", writer.write, rows),
+                _fetch_user_rows(rows[-1][1], active_since),
+            )
+            done += len(rows)
+            rows = next_rows
+            if progress is not None:
+                await progress(done, max(total, done))
+        await run_blocking("export", writer.close)
+    except BaseException:
+        await run_blocking("export", _discard_export, writer, full_path)
+        raise
 
-        wb = Workbook()
-        wb.remove(wb.active)
+    return full_path
 
-        header_font = Font(name="Calibri", size=12, bold=True, color="FFFFFF")
-        header_fill = PatternFill(
-            start_color="2F5597", end_color="2F5597", fill_type="solid"
-        )
-        header_alignment = Alignment(horizontal="center", vertical="center")
 
-        data_font = Font(name="Calibri", size=10)
-        data_alignment = Alignment(horizontal="left", vertical="center")
+async def get_platform_usage(
+    since: datetime, hourly: bool = True
+) -> list[tuple[str, int]]:
+    """
+    since dan beri platformalar bo'yicha hodisalar soni.
+    Faqat rollup jadvallardan o'qiladi - foydalanuvchilar soniga bog'liq emas.
+    """
+    from app.bot.models import UsageDaily, UsageHourly
+    from app.core.databases.postgres import get_general_session
 
-        border = Border(
-            left=Side(style="thin", color="D3D3D3"),
-            right=Side(style="thin", color="D3D3D3"),
-            top=Side(style="thin", color="D3D3D3"),
-            bottom=Side(style="thin", color="D3D3D3"),
-        )
+    if hourly:
+        model, bucket = UsageHourly, UsageHourly.bucket
+        start = since.replace(minute=0, second=0, microsecond=0)
+    else:
+        model, bucket, start = UsageDaily, UsageDaily.day, since.date()
 
-        light_fill = PatternFill(
-            start_color="F8F9FA", end_color="F8F9FA", fill_type="solid"
-        )
-        white_fill = PatternFill(
-            start_color="FFFFFF", end_color="FFFFFF", fill_type="solid"
-        )
-        premium_fill = PatternFill(
-            start_color="FFF3CD", end_color="FFF3CD", fill_type="solid"
+    total = func.sum(model.count)
+    async with get_general_session() as session:
+        result = await session.execute(
+            select(model.platform, total.label("total"))
+            .where(bucket >= start)
+            .group_by(model.platform)
+            .order_by(total.desc())
         )
+        return [(row.platform, int(row.total)) for row in result]
 
-        # Headers
-        headers = [
-            "ID",
-            "Telegram ID",
-            "Full Name",
-            "Username",
-            "Language",
-            "Premium",
-            "Last Active",
-            "Referred By",
-            "Active Status",
-            "Balance",
-            "Created At",
-            "Updated At",
-            "Text Downloads",
-            "Voice Downloads",
-            "YouTube Downloads",
-            "TikTok Downloads",
-            "Likee Downloads",
-            "Snapchat Downloads",
-            "Instagram Downloads",
-            "Twitter Downloads",
-        ]
-
-        # Process users in batches
-        current_sheet_idx = 1
-        current_row = 2
-        current_ws = None
-
-        offset = 0
-        while True:
-            result = await session.execute(
-                select(User)
-                .options(selectinload(User.statistics))
-                .offset(offset)
-                .limit(BATCH_SIZE)
-                .order_by(User.id)
-            )
-            users_batch = result.scalars().all()
-
-            if not users_batch:
-                break
-
-            for user in users_batch:
-                if current_ws is None or current_row > SAFE_ROWS_PER_SHEET:
-                    sheet_name = (
-                        f"Users_Page_{current_sheet_idx}"
-                        if sheets_needed > 1
-                        else "Users"
-                    )
-                    current_ws = wb.create_sheet(sheet_name)
-                    current_row = 2
-                    current_sheet_idx += 1
-
-                    # Add headers
-                    for col, header in enumerate(headers, 1):
-                        cell = current_ws.cell(row=1, column=col, value=header)
-                        cell.font = header_font
-                        cell.fill = header_fill
-                        cell.alignment = header_alignment
-                        cell.border = border
-
-                # User data
-                active_status = "✅ Active" if user.is_active() else "❌ Inactive"
-                premium_status = "⭐ Premium" if user.is_tg_premium else "Standard"
-                stats = user.statistics
-                row_data = [
-                    user.id,
-                    user.tg_id,
-                    user.full_name,
-                    f"@{user.username}" if user.username else "N/A",
-                    user.language_code or "N/A",
-                    premium_status,
-                    (
-                        user.last_active.strftime("%Y-%m-%d %H:%M")
-                        if user.last_active
-                        else "N/A"
-                    ),
-                    user.referred_by or "N/A",
-                    active_status,
-                    user.balance if user.balance is not None else 0.0,
-                    (
-                        user.created_at.strftime("%Y-%m-%d %H:%M")
-                        if hasattr(user, "created_at") and user.created_at
-                        else "N/A"
-                    ),
-                    (
-                        user.updated_at.strftime("%Y-%m-%d %H:%M")
-                        if hasattr(user, "updated_at") and user.updated_at
-                        else "N/A"
-                    ),
-                    stats.from_text if stats else 0,
-                    stats.from_voice if stats else 0,
-                    stats.from_youtube if stats else 0,
-                    stats.from_tiktok if stats else 0,
-                    stats.from_like if stats else 0,
-                    stats.from_snapchat if stats else 0,
-                    stats.from_instagram if stats else 0,
-                    stats.from_twitter if stats else 0,
-                ]
-
-                # Write row
-                for col, value in enumerate(row_data, 1):
-                    cell = current_ws.cell(row=current_row, column=col, value=value)
-                    cell.font = data_font
-                    cell.alignment = data_alignment
-                    cell.border = border
-
-                    # Colors
-                    if user.is_tg_premium:
-                        cell.fill = premium_fill
-                    elif current_row % 2 == 0:
-                        cell.fill = light_fill
-                    else:
-                        cell.fill = white_fill
-
-                current_row += 1
-
-            offset += BATCH_SIZE
-
-        # Auto-adjust columns
-        for sheet in wb.worksheets:
-            for column in sheet.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 30)
-                sheet.column_dimensions[column_letter].width = adjusted_width
-
-        # Set active sheet
-        if wb.worksheets:
-            wb.active = wb.worksheets[0]
-
-        # Save
-        wb.save(full_path)
-
-        return full_path
+
+async def get_hourly_usage(
+    since: datetime, platform: str | None = None
+) -> list[tuple[datetime, int]]:
+    """Soatlar kesimida hodisalar soni (platforma bo'yicha filtr bilan)"""
+    from app.bot.models import UsageHourly
+    from app.core.databases.postgres import get_general_session
+
+    query = (
+        select(UsageHourly.bucket, func.sum(UsageHourly.count).label("total"))
+        .where(UsageHourly.bucket >= since)
+        .group_by(UsageHourly.bucket)
+        .order_by(UsageHourly.bucket)
+    )
+    if platform is not None:
+        query = query.where(UsageHourly.platform == platform)
+
+    async with get_general_session() as session:
+        result = await session.execute(query)
+        return [(row.bucket, int(row.total)) for row in result]
@@ -15,6 +15,7 @@ from app.bot.controller.shorts_controller import YouTubeShortsController
 from app.bot.handlers.instagram_handler import download_instagram_video_only_mp4
 from app.core.extensions.utils import WORKDIR
 from app.core.settings.config import get_settings
+from app.core.utils.executor import run_blocking
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -30,6 +31,17 @@ class PlatformType(Enum):
     YOUTUBE_SHORTS = "youtube_shorts"
     INSTAGRAM = "instagram"
 
+    @property
+    def queue_lane(self) -> str:
+        """job_queue.PLATFORM_WORKERS dagi navbat nomi"""
+        return _QUEUE_LANES.get(self, self.value)
+
+
+# Navbat nomi platforma qiymatidan farq qiladigan holatlar
+_QUEUE_LANES: Dict[PlatformType, str] = {
+    PlatformType.YOUTUBE_SHORTS: "shorts",
+}
+
 
 class GroupController:
     """Guruh uchun universal media downloader"""
@@ -139,8 +151,11 @@ class GroupController:
         """TikTok video yuklab olish"""
         save_path = self.media_dir / "tiktok"
 
-        with TikTokDownloader() as downloader:
-            file_path = downloader.download_video(url, str(save_path))
+        def _download() -> Optional[str]:
+            with TikTokDownloader() as downloader:
+                return downloader.download_video(url, str(save_path))
+
+        file_path = await run_blocking("tiktok", _download)
 
         if file_path and Path(file_path).exists():
             return {
@@ -170,7 +185,7 @@ class GroupController:
         save_path = self.media_dir / "pinterest"
 
         with PinterestDownloader() as downloader:
-            file_path, media_type = downloader.download(
+            file_path, media_type = await downloader.download(
                 url, str(save_path), "pinterest_media"
             )
 
@@ -190,18 +205,14 @@ class GroupController:
     async def _download_threads(self, url: str) -> Dict[str, Any]:
         """Threads media yuklab olish"""
         controller = ThreadsController(self.media_dir / "threads")
+        result = await controller.download_media(url)
 
-        try:
-            result = await controller.download_media(url)
-
-            if result["success"] and result["downloaded_files"]:
-                files = [
-                    {"type": f["type"], "path": f["path"]}
-                    for f in result["downloaded_files"]
-                ]
-                return {"success": True, "message": result["message"], "files": files}
-        finally:
-            controller.close()
+        if result["success"] and result["downloaded_files"]:
+            files = [
+                {"type": f["type"], "path": f["path"]}
+                for f in result["downloaded_files"]
+            ]
+            return {"success": True, "message": result["message"], "files": files}
 
         return {"success": False, "message": "❌ Threads media yuklanmadi", "files": []}
 
@@ -222,7 +233,7 @@ class GroupController:
     async def _download_likee(self, url: str) -> Dict[str, Any]:
         """Likee video yuklab olish"""
         controller = LikeeController(settings.LIKEE_API_KEY)
-        file_path = controller.download_video(url)
+        file_path = await controller.download_video(url)
 
         if file_path and Path(file_path).exists():
             return {
@@ -236,7 +247,9 @@ class GroupController:
     async def _download_snapchat(self, url: str) -> Dict[str, Any]:
         """Snapchat video yuklab olish"""
         controller = SnapchatController()
-        file_path = controller.download_snapchat_video(url, self.media_dir / "snapchat")
+        file_path = await controller.download_snapchat_video(
+            url, self.media_dir / "snapchat"
+        )
 
         if file_path and Path(file_path).exists():
             return {
@@ -0,0 +1,152 @@
+import json
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from app.core.utils.executor import run_blocking
+from app.core.utils.http_client import fetch_text
+
+logger = logging.getLogger(__name__)
+
+HTML_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Sec-Fetch-Mode": "navigate",
+}
+
+# Qaysi bosqich (http / browser) so'rovni bajargani
+_tier_stats: Dict[str, Dict[str, int]] = {}
+
+
+def record_tier(platform: str, tier: str) -> None:
+    platform_stats = _tier_stats.setdefault(
+        platform, {"http": 0, "browser": 0, "miss": 0}
+    )
+    platform_stats[tier] = platform_stats.get(tier, 0) + 1
+
+
+def get_tier_stats() -> Dict[str, Dict[str, int]]:
+    return {platform: dict(stats) for platform, stats in _tier_stats.items()}
+
+
+def _walk(data: Any) -> Iterator[dict]:
+    """JSON ichidagi barcha dict larni aylanib chiqish"""
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            yield item
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+
+
+def extract_og_media(soup: BeautifulSoup) -> List[Tuple[str, str]]:
+    media = []
+    for prop, media_type in (
+        ("og:video:secure_url", "video"),
+        ("og:video", "video"),
+        ("og:image", "image"),
+    ):
+        tag = soup.find("meta", property=prop)
+        if tag and tag.get("content", "").startswith("http"):
+            media.append((media_type, tag["content"]))
+    return media
+
+
+def find_media_url(data: Any) -> Optional[str]:
+    """Snapchat __NEXT_DATA__ ichidan birinchi mediaUrl"""
+    for item in _walk(data):
+        media_url = item.get("mediaUrl")
+        if isinstance(media_url, str) and media_url.startswith("http"):
+            return media_url
+    return None
+
+
+def _threads_post_media(post: dict) -> List[Tuple[str, str]]:
+    items = post.get("carousel_media") or [post]
+    media = []
+    for item in items:
+        videos = item.get("video_versions") or []
+        if videos and videos[0].get("url"):
+            media.append(("video", videos[0]["url"]))
+            continue
+        candidates = (item.get("image_versions2") or {}).get("candidates") or []
+        if candidates:
+            best = max(candidates, key=lambda c: c.get("width") or 0)
+            if best.get("url"):
+                media.append(("image", best["url"]))
+    return media
+
+
+def parse_threads_html(html: str, url: str) -> List[Tuple[str, str]]:
+    """Threads sahifasidagi embedded JSON dan asosiy post medialari"""
+    match = re.search(r"/(?:post|t)/([\w-]+)", url)
+    code = match.group(1) if match else None
+    soup = BeautifulSoup(html, "html.parser")
+
+    fallback = None
+    for script in soup.find_all("script", type="application/json"):
+        text = script.string or ""
+        if "image_versions2" not in text and "video_versions" not in text:
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError:
+            continue
+
+        for item in _walk(data):
+            if "image_versions2" not in item and "video_versions" not in item:
+                continue
+            if code and item.get("code") == code:
+                return _threads_post_media(item)
+            if fallback is None and item.get("code"):
+                fallback = item
+
+    if fallback is not None:
+        return _threads_post_media(fallback)
+
+    # Matnli postlarda og:image - profil rasmi, shuning uchun faqat video olinadi
+    return [m for m in extract_og_media(soup) if m[0] == "video"][:1]
+
+
+def parse_snapchat_html(html: str) -> Optional[str]:
+    """Snapchat sahifasidan video URL (__NEXT_DATA__ yoki og:video)"""
+    soup = BeautifulSoup(html, "html.parser")
+    script = soup.find("script", id="__NEXT_DATA__")
+    if script and script.string:
+        try:
+            media_url = find_media_url(json.loads(script.string))
+            if media_url:
+                return media_url
+        except ValueError:
+            pass
+
+    for media_type, media_url in extract_og_media(soup):
+        if media_type == "video":
+            return media_url
+    return None
+
+
+async def fetch_threads_media(url: str) -> List[Tuple[str, str]]:
+    html = await fetch_text(url, headers=HTML_HEADERS)
+    if not html:
+        return []
+    try:
+        return await run_blocking("default", parse_threads_html, html, url)
+    except Exception as e:
+        logger.warning(f"Threads HTML tahlilida xatolik: {e}")
+        return []
+
+
+async def fetch_snapchat_media_url(url: str) -> Optional[str]:
+    html = await fetch_text(url, headers=HTML_HEADERS)
+    if not html:
+        return None
+    try:
+        return await run_blocking("default", parse_snapchat_html, html)
+    except Exception as e:
+        logger.warning(f"Snapchat HTML tahlilida xatolik: {e}")
+        return None
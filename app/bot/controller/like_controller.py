@@ -1,8 +1,9 @@
 import os
-import requests
+import aiohttp
 from uuid import uuid4
 from typing import Optional
 from app.core.extensions.utils import WORKDIR
+from app.core.utils.http_client import download_file, fetch_json
 
 
 class LikeeController:
@@ -20,16 +21,14 @@ class LikeeController:
         video_id = url.strip("/").split("/")[-1] or str(uuid4())
         return f"{nick_name}_{video_id}.mp4"
 
-    def download_video(self, video_url: str) -> Optional[str]:
+    async def download_video(self, video_url: str) -> Optional[str]:
         try:
-            response = requests.get(
+            data = await fetch_json(
                 self.BASE_URL,
                 headers=self.headers,
                 params={"url": video_url},
-                timeout=15,
+                timeout=aiohttp.ClientTimeout(total=15),
             )
-            response.raise_for_status()
-            data = response.json()
 
             download_url = (
                 data.get("withoutWater") or data.get("video_url") or data.get("url")
@@ -42,12 +41,8 @@ class LikeeController:
             os.makedirs(output_dir, exist_ok=True)
             filepath = output_dir / filename
 
-            video_response = requests.get(download_url, stream=True, timeout=30)
-            video_response.raise_for_status()
-
-            with open(filepath, "wb") as f:
-                for chunk in video_response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            if not await download_file(download_url, filepath):
+                return None
 
             return str(filepath)
 
@@ -2,21 +2,23 @@ import os
 import shutil
 import uuid
 
-import requests
 import re
 import json
 from bs4 import BeautifulSoup
 
+from app.core.utils.executor import run_blocking
+from app.core.utils.http_client import get_http_session, stream_download
+
 
 class PinterestDL:
-    def scrape(self, url):
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    }
 
-        # Step 1: Get HTML
-        res = requests.get(url, headers=headers)
-        soup = BeautifulSoup(res.text, "html.parser")
+    @staticmethod
+    def parse(html: str) -> tuple[str | None, str | None]:
+        """HTML dan (video_url, image_url) - CPU ishi, pool da bajariladi"""
+        soup = BeautifulSoup(html, "html.parser")
 
         # Step 2: Try to find video in <script> tag first (more reliable)
         video_url = None
@@ -70,15 +72,32 @@ class PinterestDL:
             if video_tag and video_tag.get("content"):
                 video_url = video_tag["content"]
 
-        # Step 4: If we found a video URL, use it
         if video_url:
             # Clean up the URL (remove escape characters)
             video_url = video_url.replace("\\u0026", "&").replace("\\/", "/")
 
+        image_url = None
+        image_tag = soup.find("meta", property="og:image")
+        if image_tag and image_tag.get("content"):
+            image_url = image_tag["content"]
+
+        return video_url, image_url
+
+    async def scrape(self, url):
+        session = await get_http_session()
+
+        # Step 1: Get HTML
+        async with session.get(url, headers=self.headers) as res:
+            html = await res.text()
+
+        video_url, image_url = await run_blocking("pinterest", self.parse, html)
+
+        # Step 4: If we found a video URL, use it
+        if video_url:
             # Verify it's actually a video by checking the response
             try:
-                head_response = requests.head(video_url, headers=headers)
-                content_type = head_response.headers.get("content-type", "").lower()
+                async with session.head(video_url, headers=self.headers) as head:
+                    content_type = head.headers.get("content-type", "").lower()
 
                 if "video" in content_type or video_url.endswith(".mp4"):
                     media_url = video_url
@@ -94,30 +113,20 @@ class PinterestDL:
 
         # Step 5: Fallback to image if no video found
         if not video_url:
-            image_tag = soup.find("meta", property="og:image")
-            if image_tag and image_tag.get("content"):
-                media_url = image_tag["content"]
+            if image_url:
+                media_url = image_url
                 media_type = "image"
                 extension = ".jpg"
             else:
                 raise ValueError("❌ Could not find media in Pinterest page")
 
-        # Step 6: Download the media
-        print(f"📥 Downloading {media_type} from: {media_url}")
-        media_response = requests.get(media_url, headers=headers)
-
-        if media_response.status_code != 200:
-            raise ValueError(
-                f"❌ Failed to download media: HTTP {media_response.status_code}"
-            )
-
+        # Step 6: Media faylni PinterestDownloader.download oqim bilan yozadi
         return type(
             "ScrapedData",
             (object,),
             {
                 "media_type": media_type,
                 "extension": extension,
-                "buffer": media_response.content,
                 "url": media_url,
             },
         )()
@@ -133,15 +142,16 @@ class PinterestDownloader:
     def __exit__(self, exc_type, exc_value, traceback):
         pass
 
-    def download(self, url: str, out_path: str, filename: str) -> tuple[str, str]:
+    async def download(self, url: str, out_path: str, filename: str) -> tuple[str, str]:
         """
         Downloads media from a given URL and saves it to a specified location with a specified filename.
 
         This method uses a downloader instance to scrape media from the provided URL. The resulting
         media is written to disk in the specified output path and filename. The media type and
         file extension are determined based on the scraper's result, and if not provided, defaults
-        are applied. The function ensures the output path exists and writes the scraped media
-        buffer to a file at the designated location.
+        are applied. The function ensures the output path exists and streams the scraped
+        media to a file at the designated location in chunks, so memory usage does
+        not grow with the file size.
 
         Parameters:
         url: str
@@ -157,14 +167,14 @@ class PinterestDownloader:
 
         >>> Example:
         >>>    with PinterestDownloader() as downloader:
-        >>>    a = downloader.download(
+        >>>    a = await downloader.download(
         >>>    url="https://pin.it/4OdmhuJ4a",
         >>>    out_path="./downloads",
         >>>    filename=uuid.uuid4().hex
         >>>)
         >>>print(a)
         """
-        result = self.downloader.scrape(url)
+        result = await self.downloader.scrape(url)
 
         media_type = result.media_type or "unknown"
         ext = result.extension or (".mp4" if media_type == "video" else ".jpg")
@@ -172,8 +182,8 @@ class PinterestDownloader:
 
         os.makedirs(out_path, exist_ok=True)
 
-        with open(full_path, "wb") as f:
-            f.write(result.buffer)
+        print(f"📥 Downloading {media_type} from: {result.url}")
+        await stream_download(result.url, full_path, headers=self.downloader.headers)
 
         print(f"✅ Downloaded {media_type} to {full_path}")
         return full_path, media_type
@@ -1,12 +1,15 @@
 from __future__ import annotations
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from app.bot.handlers.youtube_search import youtube_search
 from app.bot.handlers.youtube_handler import (
+    download_audio_by_id,
     download_music_from_youtube,
     download_video_from_youtube,
     cleanup_old_files,
+    prefetch_audio,
+    release_file,
 )
 
 logger = logging.getLogger(__name__)
@@ -40,8 +43,20 @@ class ShazamController:
             logger.error(f"Search error: {e}")
             return []
 
-    async def download_full_track(self, title: str, artist: str) -> Optional[str]:
+    def prefetch(self, video_ids: Iterable[str]) -> None:
+        """Start background download of the top results."""
+        prefetch_audio(video_ids)
+
+    async def download_full_track(
+        self, title: str, artist: str, video_id: Optional[str] = None
+    ) -> Optional[str]:
         """Faster track download."""
+        if video_id:
+            # Natijadagi aniq video - qayta qidirilmaydi
+            file_path = await download_audio_by_id(video_id.strip())
+            if file_path:
+                return file_path
+
         if not title or not artist:
             return None
 
@@ -74,6 +89,10 @@ class ShazamController:
             logger.error(f"Video error: {e}")
             return None
 
+    async def release_file(self, file_path: str) -> None:
+        """Delete a downloaded file once every request sharing it is done."""
+        await release_file(file_path)
+
     @staticmethod
     def ytdict_to_info(data: Dict[str, Any]) -> Dict[str, str]:
         """Fast conversion with validation."""
@@ -1,6 +1,9 @@
 import logging
 from pathlib import Path
-from pytubefix import YouTube
+from pytubefix import YouTube, extract
+
+from app.core.utils.executor import run_blocking
+from app.core.utils.single_flight import get_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +14,16 @@ class YouTubeShortsController:
         self.save_dir.mkdir(parents=True, exist_ok=True)
 
     async def download_video(self, url: str) -> str:
+        # Bir xil video parallel so'ralsa, bitta yuklash natijasi ulashiladi
+        try:
+            key = extract.video_id(url)
+        except Exception:
+            key = url
+        return await get_single_flight("shorts").do(
+            key, run_blocking, "shorts", self._download_video_sync, url
+        )
+
+    def _download_video_sync(self, url: str) -> str:
         try:
             yt = YouTube(url)
 
@@ -1,60 +1,70 @@
 import time
-import base64
+import json
 import logging
-import requests
 from pathlib import Path
 from uuid import uuid4
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
+
+from app.bot.controller.http_extractor import (
+    fetch_snapchat_media_url,
+    find_media_url,
+    record_tier,
+)
+from app.core.utils.driver_pool import get_driver_pool
+from app.core.utils.executor import run_blocking
+from app.core.utils.http_client import download_file
+from app.core.utils.metrics import get_latency
+from app.core.utils.page_ready import wait_for_media
 
 logger = logging.getLogger(__name__)
 
 
 class SnapchatController:
-    def __init__(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920x1080")
-
-        self.driver = webdriver.Chrome(
-            service=Service("/usr/bin/chromedriver"), options=chrome_options
-        )
-
-    def download_snapchat_video(self, url: str, save_dir: Path) -> str | None:
+    def _get_video_url(self, url: str) -> str | None:
+        started = time.monotonic()
         try:
-            self.driver.get(url)
-            time.sleep(5)
+            with get_driver_pool().driver() as driver:
+                driver.get(url)
+                signal = wait_for_media(driver, "snapchat")
 
-            video_element = self.driver.find_element(By.TAG_NAME, "video")
-            video_url = video_element.get_attribute("src")
+                if signal == "json":
+                    data = driver.execute_script(
+                        "return document.getElementById('__NEXT_DATA__').textContent"
+                    )
+                    return find_media_url(json.loads(data))
 
-            if not video_url:
-                logger.error("❌ No video URL found.")
-                return None
+                video_element = driver.find_element(By.TAG_NAME, "video")
+                return video_element.get_attribute("src")
+        finally:
+            get_latency("scrape.snapchat").observe(time.monotonic() - started)
 
-            response = requests.get(video_url, stream=True)
-            if response.status_code != 200:
-                logger.error("❌ Failed to fetch video content.")
-                return None
+    async def download_snapchat_video(self, url: str, save_dir: Path) -> str | None:
+        try:
+            # Avval brauzersiz (HTML + __NEXT_DATA__), topilmasa Selenium
+            tier = "http"
+            video_url = await fetch_snapchat_media_url(url)
+            if not video_url:
+                tier = "browser"
+                video_url = await run_blocking("snapchat", self._get_video_url, url)
 
-            filename = f"{uuid4().hex}.mp4"
-            file_path = save_dir / filename
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+            record_tier("snapchat", tier if video_url else "miss")
 
-            with open(file_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            if not video_url:
+                logger.error("❌ No video URL found.")
+                return None
 
-            return str(file_path)
+            logger.info(f"Snapchat media manbasi: {tier}")
+            return await self._download_file(video_url, save_dir)
 
         except Exception as e:
             logger.error(f"Snapchat download error: {e}")
             return None
-        finally:
-            self.driver.quit()
+
+    async def _download_file(self, video_url: str, save_dir: Path) -> str | None:
+        file_path = save_dir / f"{uuid4().hex}.mp4"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if not await download_file(video_url, file_path):
+            logger.error("❌ Failed to fetch video content.")
+            return None
+        return str(file_path)
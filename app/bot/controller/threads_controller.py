@@ -1,18 +1,19 @@
 import os
-import requests
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.remote.webdriver import WebDriver
 from urllib.parse import urlparse
 import time
-import re
 from pathlib import Path
 from typing import List, Tuple, Optional
 import logging
 
+from app.bot.controller.http_extractor import fetch_threads_media, record_tier
+from app.core.utils.driver_pool import get_driver_pool
+from app.core.utils.executor import run_blocking
+from app.core.utils.http_client import download_file
+from app.core.utils.metrics import get_latency
+from app.core.utils.page_ready import wait_for_media
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,72 +21,39 @@ class ThreadsController:
     def __init__(self, download_path: Optional[Path] = None):
         self.download_path = download_path or Path.cwd().parent / "media" / "threads"
         self.download_path.mkdir(parents=True, exist_ok=True)
-        self.driver = None
-        self._init_driver()
-
-    def _init_driver(self):
-        """Chrome driver sozlamalari"""
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option("useAutomationExtension", False)
-        chrome_options.add_argument(
-            "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-
-        try:
-            self.driver = webdriver.Chrome(
-                service=Service("/usr/bin/chromedriver"), options=chrome_options
-            )
-            self.driver.execute_script(
-                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-            )
-        except Exception as e:
-            logger.error(f"Chrome driver ishga tushirishda xatolik: {e}")
-            raise
 
     async def download_file(self, url: str, filename: str) -> bool:
         """Fayl yuklab olish"""
-        try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-            }
-            response = requests.get(url, headers=headers, stream=True, timeout=30)
-            response.raise_for_status()
-
-            filepath = self.download_path / filename
-            with open(filepath, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
+        headers = {
+            "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        }
+        if await download_file(url, self.download_path / filename, headers=headers):
             logger.info(f"✓ Yuklandi: {filename}")
             return True
-        except Exception as e:
-            logger.error(f"✗ Xatolik: {filename} - {str(e)}")
-            return False
+        logger.error(f"✗ Xatolik: {filename}")
+        return False
 
     async def get_post_media(self, thread_url: str) -> List[Tuple[str, str]]:
         """Faqat asosiy post medialarini olish"""
+        return await run_blocking("threads", self._get_post_media_sync, thread_url)
+
+    def _get_post_media_sync(self, thread_url: str) -> List[Tuple[str, str]]:
+        started = time.monotonic()
+        try:
+            with get_driver_pool().driver() as driver:
+                return self._scrape_post_media(driver, thread_url)
+        finally:
+            get_latency("scrape.threads").observe(time.monotonic() - started)
+
+    def _scrape_post_media(
+        self, driver: WebDriver, thread_url: str
+    ) -> List[Tuple[str, str]]:
         try:
             logger.info("Sahifa yuklanmoqda...")
-            self.driver.get(thread_url)
-            time.sleep(8)  # Sahifa to'liq yuklanishi uchun
-
-            # Scroll qilish - ba'zida medialar lazy load bo'ladi
-            self.driver.execute_script(
-                "window.scrollTo(0, document.body.scrollHeight/2);"
-            )
-            time.sleep(2)
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(2)
+            driver.get(thread_url)
+            # Qat'iy sleep o'rniga media paydo bo'lishi bilan davom etamiz
+            wait_for_media(driver, "threads")
 
             media_urls = []
 
@@ -110,7 +78,7 @@ class ThreadsController:
             post_container = None
             for selector in main_post_selectors:
                 try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
                     if elements:
                         post_container = elements[0]  # Birinchi element - asosiy post
                         logger.info(f"Post container topildi: {selector}")
@@ -120,7 +88,7 @@ class ThreadsController:
 
             if not post_container:
                 logger.info("Post container topilmadi, barcha sahifani qidiryapman...")
-                post_container = self.driver.find_element(By.TAG_NAME, "body")
+                post_container = driver.find_element(By.TAG_NAME, "body")
 
             # Post container ichidagi medialarni qidirish
             logger.info("Post ichidagi medialarni qidiryapman...")
@@ -323,7 +291,15 @@ class ThreadsController:
         logger.info(f"Thread tahlil qilinmoqda: {thread_url}")
 
         try:
-            media_urls = await self.get_post_media(thread_url)
+            # Avval brauzersiz (HTML + embedded JSON), topilmasa Selenium
+            tier = "http"
+            media_urls = await fetch_threads_media(thread_url)
+            if not media_urls:
+                tier = "browser"
+                media_urls = await self.get_post_media(thread_url)
+
+            record_tier("threads", tier if media_urls else "miss")
+            logger.info(f"Threads media manbasi: {tier}")
 
             if not media_urls:
                 return {
@@ -376,6 +352,7 @@ class ThreadsController:
                 "downloaded_files": downloaded_files,
                 "failed_files": failed_files,
                 "total_found": len(media_urls),
+                "tier": tier,
             }
 
         except Exception as e:
@@ -387,11 +364,4 @@ class ThreadsController:
             }
 
     def close(self):
-        """Brauzer yopish"""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
-
-    def __del__(self):
-        """Destructor"""
-        self.close()
+        """Driverlar pool da yashaydi - bu yerda yopiladigan narsa yo'q"""
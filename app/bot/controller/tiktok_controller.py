@@ -1,11 +1,14 @@
-import yt_dlp
+import logging
 import os
 import re
 import time
 
-from app.bot.extensions.get_random_cookie import get_random_cookie_for_instagram
 from app.core.extensions.enums import CookieType
 from app.core.extensions.utils import WORKDIR
+from app.core.utils.cookie_pool import OUTCOME_OK, classify_error, get_cookie_pool
+from app.core.utils.ydl_pool import pooled_ydl
+
+logger = logging.getLogger(__name__)
 
 
 class TikTokDownloader:
@@ -34,22 +37,27 @@ class TikTokDownloader:
         os.makedirs(save_path, exist_ok=True)
         output_path = os.path.join(save_path, self._generate_filename(url, filename))
 
+        cookie_pool = get_cookie_pool(CookieType.TIKTOK.value)
+        cookie_file = cookie_pool.acquire()
         ydl_opts = {
-            "outtmpl": output_path,
             "format": "bestvideo+bestaudio/best",
             "merge_output_format": "mp4",
-            "quiet": False,  # Debug uchun False
+            "quiet": True,
+            "no_warnings": True,
             "noplaylist": True,
-            "cookiefile": get_random_cookie_for_instagram(CookieType.TIKTOK.value),
-            "verbose": True,  # Debug loglar uchun
+            "cookiefile": cookie_file,
         }
 
         try:
-            print(f"📥 Downloading TikTok video: {url}")
-            print(f"📁 Output path: {output_path}")
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            logger.info(f"Downloading TikTok video: {url} -> {output_path}")
+            started = time.monotonic()
+            with pooled_ydl("tiktok", "video", ydl_opts, outtmpl=output_path) as ydl:
                 ydl.download([url])
-            return output_path if os.path.exists(output_path) else None
+            if not os.path.exists(output_path):
+                return None
+            cookie_pool.report(cookie_file, OUTCOME_OK, time.monotonic() - started)
+            return output_path
         except Exception as e:
-            print(f"❌ TikTok download error: {e}")
+            logger.error(f"TikTok download error: {e}")
+            cookie_pool.report(cookie_file, classify_error(e))
             return None
@@ -1,9 +1,16 @@
-import os
-import requests
 import json
 import logging
 from pathlib import Path
+
+import aiohttp
+
 from app.core.settings.config import Settings, get_settings
+from app.core.utils.http_client import (
+    FileTooLargeError,
+    download_file,
+    get_http_session,
+    stream_download,
+)
 
 logger = logging.getLogger(__name__)
 settings: Settings = get_settings()
@@ -21,22 +28,24 @@ class TwitterController:
 
     async def download_media(self, tweet_url: str) -> dict:
         try:
-            response = requests.get(
+            session = await get_http_session()
+            async with session.get(
                 self.api_url, headers=self.headers, params={"url": tweet_url}
-            )
-            data = response.json()
+            ) as response:
+                status_code = response.status
+                data = await response.json(content_type=None)
 
             # API javobini batafsil logga yozish
             logger.info(f"=== TWITTER API JAVOBI ===")
-            logger.info(f"Status Code: {response.status_code}")
+            logger.info(f"Status Code: {status_code}")
             logger.info(f"Response: {json.dumps(data, indent=2, ensure_ascii=False)}")
 
             # Xato tekshirish
-            if response.status_code != 200:
+            if status_code != 200:
                 return {
                     "success": False,
                     "downloaded_files": [],
-                    "message": f"❌ API xatosi: {response.status_code}",
+                    "message": f"❌ API xatosi: {status_code}",
                 }
 
             if "error" in data:
@@ -62,7 +71,7 @@ class TwitterController:
                             logger.info(f"Eng yaxshi video URL: {video_url}")
 
                             filename = self.save_dir / f"video_{tweet_id}_{i + 1}.mp4"
-                            success = self._download_video_safe(video_url, filename)
+                            success = await self._download_video_safe(video_url, filename)
                             if success:
                                 download_paths.append(
                                     {"type": "video", "path": str(filename)}
@@ -84,7 +93,7 @@ class TwitterController:
                         logger.info(f"Eng yaxshi video URL: {video_url}")
 
                         filename = self.save_dir / f"video_{tweet_id}.mp4"
-                        success = self._download_video_safe(video_url, filename)
+                        success = await self._download_video_safe(video_url, filename)
                         if success:
                             download_paths.append(
                                 {"type": "video", "path": str(filename)}
@@ -92,12 +101,12 @@ class TwitterController:
 
                 elif isinstance(video_data, str):
                     # To'g'ridan-to'g'ri URL
-                    video_info = self._check_video_url(video_data)
+                    video_info = await self._check_video_url(video_data)
                     logger.info(f"Video URL info: {video_info}")
 
                     if video_info["valid"]:
                         filename = self.save_dir / f"video_{tweet_id}.mp4"
-                        success = self._download_video_safe(video_data, filename)
+                        success = await self._download_video_safe(video_data, filename)
                         if success:
                             download_paths.append(
                                 {"type": "video", "path": str(filename)}
@@ -106,11 +115,9 @@ class TwitterController:
             # 3. Rasmlar
             if data.get("media", {}).get("photo"):
                 for i, photo in enumerate(data["media"]["photo"]):
-                    img_resp = requests.get(photo["url"], timeout=30)
                     filename = self.save_dir / f"photo_{tweet_id}_{i + 1}.jpg"
-                    with open(filename, "wb") as f:
-                        f.write(img_resp.content)
-                    download_paths.append({"type": "image", "path": str(filename)})
+                    if await download_file(photo["url"], filename):
+                        download_paths.append({"type": "image", "path": str(filename)})
 
             # Natija
             if not download_paths:
@@ -162,16 +169,20 @@ class TwitterController:
         )
         return video_url
 
-    def _check_video_url(self, video_url: str) -> dict:
+    async def _check_video_url(self, video_url: str) -> dict:
         """Video URL ni tekshirish"""
         try:
-            response = requests.head(video_url, timeout=10)
-            content_type = response.headers.get("content-type", "")
-            content_length = response.headers.get("content-length", "0")
+            session = await get_http_session()
+            async with session.head(
+                video_url, timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                status_code = response.status
+                content_type = response.headers.get("content-type", "")
+                content_length = response.headers.get("content-length", "0")
 
             return {
-                "valid": response.status_code == 200,
-                "status_code": response.status_code,
+                "valid": status_code == 200,
+                "status_code": status_code,
                 "content_type": content_type,
                 "content_length": content_length,
                 "is_video": "video" in content_type.lower(),
@@ -180,51 +191,34 @@ class TwitterController:
             logger.error(f"Video URL tekshirishda xatolik: {e}")
             return {"valid": False, "error": str(e)}
 
-    def _download_video_safe(self, video_url: str, filename: Path) -> bool:
+    async def _download_video_safe(self, video_url: str, filename: Path) -> bool:
         """Video faylini xavfsiz yuklab olish"""
         try:
             logger.info(f"Video yuklab olish boshlandi: {video_url}")
 
-            with requests.get(video_url, stream=True, timeout=60) as response:
-                response.raise_for_status()
+            # .mp4 bo'lmagan URL lar uchun Content-Type video bo'lishi shart
+            expect_type = None if video_url.endswith(".mp4") else "video"
+            file_size = await stream_download(
+                video_url, filename, expect_type=expect_type
+            )
+            logger.info(f"Yuklangan fayl o'lchami: {file_size} bytes")
+
+            # Fayl o'lchamini tekshirish
+            if file_size == 0:
+                logger.error("Fayl bo'sh!")
+                filename.unlink(missing_ok=True)
+                return False
 
-                content_type = response.headers.get("content-type", "")
-                logger.info(f"Content-Type: {content_type}")
-
-                # Video formatini tekshirish
-                if "video" not in content_type.lower() and not video_url.endswith(
-                    ".mp4"
-                ):
-                    logger.warning(f"Bu video fayl emas: {content_type}")
-                    return False
-
-                total_size = int(response.headers.get("content-length", 0))
-                logger.info(f"Fayl o'lchami: {total_size} bytes")
-
-                # Fayl yuklab olish
-                with open(filename, "wb") as f:
-                    downloaded = 0
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-
-                file_size = filename.stat().st_size
-                logger.info(f"Yuklangan fayl o'lchami: {file_size} bytes")
-
-                # Fayl o'lchamini tekshirish
-                if file_size == 0:
-                    logger.error("Fayl bo'sh!")
-                    filename.unlink(missing_ok=True)
-                    return False
-
-                # Minimum o'lcham tekshirish (1KB)
-                if file_size < 1024:
-                    logger.warning(f"Fayl juda kichik: {file_size} bytes")
-
-                logger.info(f"Video muvaffaqiyatli yuklandi: {filename}")
-                return True
+            # Minimum o'lcham tekshirish (1KB)
+            if file_size < 1024:
+                logger.warning(f"Fayl juda kichik: {file_size} bytes")
 
+            logger.info(f"Video muvaffaqiyatli yuklandi: {filename}")
+            return True
+
+        except FileTooLargeError as e:
+            logger.warning(f"Video Telegram limitidan katta: {e}")
+            return False
         except Exception as e:
             logger.error(f"Video yuklab olishda xatolik: {e}")
             if filename.exists():
@@ -1,39 +1,16 @@
-from app.core.extensions.utils import WORKDIR
-from itertools import cycle
-import os
+from typing import Optional
 
-COOKIE_CYCLES = {}
+from app.core.utils.cookie_pool import get_cookie_pool
 
 
-def get_random_cookie_for_instagram(_cookie_type: str) -> str:
-    cookies_path = WORKDIR.parent / "static" / "cookie" / _cookie_type
-    if _cookie_type not in COOKIE_CYCLES:
-        items = os.listdir(cookies_path)
-        items.sort()
-        COOKIE_CYCLES[_cookie_type] = cycle(items)
+def get_random_cookie_for_instagram(_cookie_type: str) -> Optional[str]:
+    return get_cookie_pool(_cookie_type).acquire()
 
-    return next(COOKIE_CYCLES[_cookie_type])
 
-
-COOKIE_CYCLES_YOUTUBE = {}
-
-
-def get_random_cookie_for_youtube(_cookie_type: str) -> str:
-    cookies_path = WORKDIR.parent / "static" / "cookie" / _cookie_type
-    if _cookie_type not in COOKIE_CYCLES_YOUTUBE:
-        items = os.listdir(cookies_path)
-        items.sort()
-        COOKIE_CYCLES_YOUTUBE[_cookie_type] = cycle(items)
-
-    return next(COOKIE_CYCLES_YOUTUBE[_cookie_type])
+def get_random_cookie_for_youtube(_cookie_type: str) -> Optional[str]:
+    return get_cookie_pool(_cookie_type).acquire()
 
 
 def get_all_youtube_cookies(_cookie_type: str) -> list[str]:
-    cookies_path = WORKDIR.parent / "static" / "cookie" / _cookie_type
-    if not cookies_path.exists():
-        return []
-    return sorted(
-        str(cookies_path / item)
-        for item in os.listdir(cookies_path)
-        if item.endswith(".txt")
-    )
+    """Sog'lom cookie lar, eng yaxshisi birinchi"""
+    return get_cookie_pool(_cookie_type).candidates()
@@ -1,17 +1,25 @@
 import asyncio
-from aiogram.types import ContentType
-from aiogram import Bot
+import logging
+from cachetools import TTLCache
 from datetime import datetime, timedelta
-from sqlalchemy import func, desc
-from app.bot.models import User
-from app.bot.keyboards.admin_keyboards import get_admin_panel_keyboard
+from sqlalchemy import func, desc, text
+from sqlalchemy.orm import aliased
+from app.bot.handlers.statistics_handler import COUNTER_FIELDS, statistics_buffer
+from app.bot.models import Statistics, User
 from app.bot.models import AdminRequirements
 from app.core.databases.postgres import get_general_session
 from sqlalchemy.future import select
 from app.core.settings.config import get_settings, Settings
+from app.core.utils.single_flight import get_single_flight
 
 settings: Settings = get_settings()
 
+DASHBOARD_MATVIEW = "admin_dashboard_summary"
+
+_dashboard_cache: TTLCache = TTLCache(maxsize=1, ttl=settings.DASHBOARD_CACHE_TTL)
+_dashboard_flight = get_single_flight("admin-dashboard")
+_dashboard_refresh_task: asyncio.Task | None = None
+
 
 async def get_token_per_referral() -> int:
     async with get_general_session() as session:
@@ -53,117 +61,121 @@ async def update_premium_price(new_value: float) -> None:
             raise ValueError("AdminRequirements not found in the database.")
 
 
-async def get_last_7_days_statistics() -> dict:
-    now = datetime.now()
+def _summary_query(now: datetime):
+    """Barcha vaqt oraliqlari va foydalanish yig'indilari - bitta so'rovda"""
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     yesterday_start = today_start - timedelta(days=1)
-    week_start = now - timedelta(days=7)
-    month_start = now - timedelta(days=30)
-    year_start = now - timedelta(days=365)
-
-    async with get_general_session() as session:
-
-        def count_where(*conds):
-            q = (
-                select(func.count()).select_from(User).where(*conds)
-                if conds
-                else select(func.count()).select_from(User)
+    growth = (
+        select(
+            func.count().filter(User.created_at >= today_start).label("today"),
+            func.count()
+            .filter(
+                User.created_at >= yesterday_start, User.created_at < today_start
             )
-            return session.execute(q)
-
-        today_res = await count_where(User.created_at >= today_start)
-        yesterday_res = await count_where(
-            User.created_at >= yesterday_start, User.created_at < today_start
+            .label("yesterday"),
+            func.count()
+            .filter(User.created_at >= now - timedelta(days=7))
+            .label("last_week"),
+            func.count()
+            .filter(User.created_at >= now - timedelta(days=30))
+            .label("last_month"),
+            func.count()
+            .filter(User.created_at >= now - timedelta(days=365))
+            .label("last_year"),
+            func.count().label("all_time"),
         )
-        week_res = await count_where(User.created_at >= week_start)
-        month_res = await count_where(User.created_at >= month_start)
-        year_res = await count_where(User.created_at >= year_start)
-        all_res = await count_where()
-
-        today = today_res.scalar_one()
-        yesterday = yesterday_res.scalar_one()
-        last_week = week_res.scalar_one()
-        last_month = month_res.scalar_one()
-        last_year = year_res.scalar_one()
-        all_time = all_res.scalar_one()
-
-        ref_q = (
-            select(User.referred_by, func.count(User.id).label("ref_count"))
-            .where(User.referred_by != None)
-            .group_by(User.referred_by)
-            .order_by(desc("ref_count"))
-            .limit(10)
+        .select_from(User)
+        .subquery()
+    )
+    usage = select(
+        *(
+            func.coalesce(func.sum(getattr(Statistics, field)), 0).label(field)
+            for field in COUNTER_FIELDS
         )
-        ref_rows = (await session.execute(ref_q)).all()
-        ref_ids = [row[0] for row in ref_rows]
-
-        # fetch names in one go
-        if ref_ids:
-            users_q = select(User.tg_id, User.first_name, User.last_name).where(
-                User.tg_id.in_(ref_ids)
-            )
-            users = (await session.execute(users_q)).all()
-            name_map = {tg: f"{fn} {ln or ''}".strip() for tg, fn, ln in users}
-        else:
-            name_map = {}
+    ).subquery()
+    return select(growth, usage)
+
+
+def _top_referrers_query(limit: int = 10):
+    referrer = aliased(User)
+    ref_count = func.count(User.id).label("ref_count")
+    return (
+        select(User.referred_by, referrer.first_name, referrer.last_name, ref_count)
+        .outerjoin(referrer, referrer.tg_id == User.referred_by)
+        .where(User.referred_by.isnot(None))
+        .group_by(User.referred_by, referrer.first_name, referrer.last_name)
+        .order_by(desc(ref_count))
+        .limit(limit)
+    )
 
-        top_referrers = [
-            {"tg_id": tg, "name": name_map.get(tg, str(tg)), "count": cnt}
-            for tg, cnt in ref_rows
-        ]
 
+async def _load_dashboard_statistics() -> dict:
+    async with get_general_session() as session:
+        if settings.DASHBOARD_USE_MATVIEW:
+            result = await session.execute(text(f"SELECT * FROM {DASHBOARD_MATVIEW}"))
+        else:
+            result = await session.execute(_summary_query(datetime.now()))
+        summary = dict(result.mappings().one())
+        ref_rows = (await session.execute(_top_referrers_query())).all()
+
+    summary["top_referrers"] = [
+        {
+            "tg_id": tg_id,
+            "name": (
+                f"{first_name} {last_name or ''}".strip() if first_name else str(tg_id)
+            ),
+            "count": count,
+        }
+        for tg_id, first_name, last_name, count in ref_rows
+    ]
+    return summary
+
+
+async def get_dashboard_statistics() -> dict:
+    """
+    Admin panel statistikasi: foydalanuvchilar o'sishi, foydalanish yig'indilari
+    va top referrerlar. Natija DASHBOARD_CACHE_TTL soniya keshlanadi.
+    """
+    summary = _dashboard_cache.get("summary")
+    if summary is None:
+        summary = await _dashboard_flight.do("summary", _load_dashboard_statistics)
+        _dashboard_cache["summary"] = summary
+
+    # Hali bazaga yozilmagan hodisalar ham hisobga olinadi
+    pending = statistics_buffer.pending()
     return {
-        "today": today,
-        "yesterday": yesterday,
-        "last_week": last_week,
-        "last_month": last_month,
-        "last_year": last_year,
-        "all_time": all_time,
-        "top_referrers": top_referrers,
+        **summary,
+        **{field: summary[field] + pending[field] for field in COUNTER_FIELDS},
     }
 
 
-bot = Bot(settings.BOT_TOKEN)
+async def refresh_dashboard_matview() -> None:
+    async with get_general_session() as session:
+        await session.execute(
+            text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {DASHBOARD_MATVIEW}")
+        )
+        await session.commit()
+    _dashboard_cache.clear()
+
+
+async def _dashboard_refresh_loop() -> None:
+    while True:
+        try:
+            await refresh_dashboard_matview()
+        except Exception as e:
+            logging.error(f"Dashboard materialized view yangilanmadi: {e}")
+        await asyncio.sleep(settings.DASHBOARD_REFRESH_INTERVAL)
 
 
-async def run_broadcast(text: str, media: tuple[str, str] | None, admin_id: int):
-    await asyncio.sleep(1)  # allow handler to return
-    batch = 1000
+def start_dashboard_refresh() -> None:
+    """DASHBOARD_USE_MATVIEW yoqilgan bo'lsa, view fonda yangilab turiladi"""
+    global _dashboard_refresh_task
+    if not settings.DASHBOARD_USE_MATVIEW:
+        return
+    if _dashboard_refresh_task is None or _dashboard_refresh_task.done():
+        _dashboard_refresh_task = asyncio.create_task(_dashboard_refresh_loop())
 
-    async with get_general_session() as session:
-        total = (await session.execute(select(User))).scalars().all()
-        total_count = len(total)
-
-    for offset in range(0, total_count, batch):
-        async with get_general_session() as session:
-            uids = (
-                (await session.execute(select(User.tg_id).offset(offset).limit(batch)))
-                .scalars()
-                .all()
-            )
 
-        for uid in uids:
-            try:
-                if media:
-                    ctype, fid = media
-                    if ctype == ContentType.PHOTO:
-                        await bot.send_photo(
-                            uid, photo=fid, caption=text, parse_mode="HTML"
-                        )
-                    elif ctype == ContentType.VIDEO:
-                        await bot.send_video(
-                            uid, video=fid, caption=text, parse_mode="HTML"
-                        )
-                    else:
-                        await bot.send_document(
-                            uid, document=fid, caption=text, parse_mode="HTML"
-                        )
-                else:
-                    await bot.send_message(uid, text, parse_mode="HTML")
-            except:
-                pass
-            await asyncio.sleep(0.05)
-
-    await bot.send_message(
-        admin_id, "📬 Broadcast complete!", reply_markup=get_admin_panel_keyboard()
-    )
+def stop_dashboard_refresh() -> None:
+    if _dashboard_refresh_task is not None:
+        _dashboard_refresh_task.cancel()
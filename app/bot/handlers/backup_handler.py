@@ -1,32 +1,215 @@
-from sqlalchemy.future import select
-from aiogram.types import FSInputFile, Message
+import logging
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator
+
 from aiogram import Bot
-from sqlalchemy.exc import MultipleResultsFound
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
 
+from app.bot.handlers.instagram_handler import validate_instagram_url
+from app.bot.handlers.likee_handler import validate_likee_url
+from app.bot.handlers.tiktok_handler import validate_tiktok_url
 from app.bot.models import Backup
 from app.core.databases.postgres import get_general_session
+from app.core.extensions.utils import WORKDIR
 from app.core.settings.config import get_settings, Settings
+from app.core.utils.single_flight import get_single_flight
 
 settings: Settings = get_settings()
-bot = Bot(settings.BOT_TOKEN)
+logger = logging.getLogger(__name__)
+
+BACKUP_TTL = timedelta(days=settings.MEDIA_CACHE_TTL_DAYS)
+RESTORE_DIR = WORKDIR.parent / "media" / "backup"
+
+_YOUTUBE_ID = re.compile(r"(?:youtube\.com/shorts/|youtu\.be/)([\w-]{6,})")
+
+_stats = {"hits": 0, "misses": 0, "expired": 0, "stored": 0, "invalidated": 0}
+
+# Bir xil URL ni bir vaqtda bir nechta chat so'rasa, faqat bittasi yuklaydi
+_media_flight = get_single_flight("media")
+
+
+def normalize_media_url(url: str) -> str:
+    """Bir xil media uchun bitta kalit: query, slash va domen farqlarini olib tashlaydi"""
+    url = url.strip()
+    if "tiktok.com" in url:
+        return validate_tiktok_url(url)
+    if "instagram.com" in url:
+        return validate_instagram_url(url)
+    if "likee.video" in url:
+        return validate_likee_url(url)
+
+    match = _YOUTUBE_ID.search(url)
+    if match:
+        return f"https://youtu.be/{match.group(1)}"
+
+    clean_url = url.split("#")[0].split("?")[0].rstrip("/")
+    return re.sub(r"^https?://(www\.)?(twitter|x)\.com", "https://x.com", clean_url)
+
+
+def _extract_media(message: Message) -> tuple[str, str, str, int | None] | None:
+    if message.video:
+        media = message.video
+        media_type = "video"
+    elif message.photo:
+        media = message.photo[-1]
+        media_type = "image"
+    elif message.document:
+        media = message.document
+        media_type = "document"
+    elif message.audio:
+        media = message.audio
+        media_type = "audio"
+    else:
+        return None
+    return media_type, media.file_id, media.file_unique_id, media.file_size
+
+
+def _is_expired(backup: Backup) -> bool:
+    stored_at = backup.updated_at or backup.created_at
+    return stored_at is None or datetime.now() - stored_at > BACKUP_TTL
 
 
 async def get_from_backup(url: str) -> Backup | None:
+    key = normalize_media_url(url)
     async with get_general_session() as session:
-        query = select(Backup).where(Backup.url == url)
+        query = select(Backup).where(Backup.url == key)
         result = await session.execute(query)
-        return result.scalar_one_or_none()
-
-
-# async def add_to_backup(url: str, video_path: str) -> None:
-#     video = FSInputFile(video_path)
-#     sent_msg: Message = await bot.send_video(chat_id=settings.CHANNEL_ID, video=video)
-#     async with get_general_session() as session:
-#         backup = Backup(url=url, message_id=sent_msg.message_id)
-#         session.get_transaction()
-#         try:
-#             session.add(backup)
-#             await session.commit()
-#         except MultipleResultsFound:
-#             await session.rollback()
-#             return
+        backup = result.scalar_one_or_none()
+
+    if backup is None:
+        _stats["misses"] += 1
+        return None
+
+    if _is_expired(backup):
+        _stats["expired"] += 1
+        _stats["misses"] += 1
+        await invalidate_backup(key)
+        return None
+
+    _stats["hits"] += 1
+    return backup
+
+
+@asynccontextmanager
+async def media_flight(url: str) -> AsyncIterator[Backup | None]:
+    """
+    get_from_backup ning single-flight varianti. Shu URL boshqa so'rovda
+    yuklanayotgan bo'lsa, u tugashini kutib keshdagi file_id ni qaytaradi.
+    None bo'lsa - blok ichida yuklab, yuborib, add_to_backup qilish kerak;
+    blok tugaguncha shu URL ga kelgan boshqa so'rovlar kutib turadi.
+    """
+    key = normalize_media_url(url)
+    while True:
+        async with _media_flight.hold(key) as leader:
+            backup = await get_from_backup(key)
+            if leader or backup is not None:
+                yield backup
+                return
+        # Oldingi yuklash muvaffaqiyatsiz tugadi - kutayotganlardan biri leader
+        # bo'ladi, qolganlari yana uning natijasini kutadi
+
+
+async def add_to_backup(url: str, message: Message, platform: str | None = None) -> None:
+    """Yuborilgan xabardagi file_id ni URL bo'yicha saqlaydi"""
+    if message is None:
+        return
+    media = _extract_media(message)
+    if media is None:
+        return
+
+    media_type, file_id, file_unique_id, file_size = media
+    now = datetime.now()
+    values = {
+        "url": normalize_media_url(url),
+        "message_id": message.message_id,
+        "platform": platform,
+        "file_id": file_id,
+        "file_unique_id": file_unique_id,
+        "media_type": media_type,
+        "file_size": file_size,
+        "created_at": now,
+        "updated_at": now,
+    }
+    query = insert(Backup).values(**values)
+    query = query.on_conflict_do_update(
+        index_elements=[Backup.url],
+        set_={k: query.excluded[k] for k in values if k not in ("url", "created_at")},
+    )
+    try:
+        async with get_general_session() as session:
+            await session.execute(query)
+            await session.commit()
+        _stats["stored"] += 1
+    except Exception as e:
+        logger.error(f"Backup saqlashda xatolik ({url}): {e}")
+
+
+async def invalidate_backup(url: str) -> None:
+    async with get_general_session() as session:
+        await session.execute(delete(Backup).where(Backup.url == normalize_media_url(url)))
+        await session.commit()
+    _stats["invalidated"] += 1
+
+
+async def answer_from_backup(
+    message: Message, backup: Backup, reply: bool = False, **kwargs
+) -> Message | None:
+    """
+    Keshdagi file_id orqali yuboradi. file_id yaroqsiz bo'lsa yozuv o'chiriladi
+    va None qaytadi, shunda chaqiruvchi odatdagidek yuklab oladi.
+    """
+    try:
+        if backup.media_type == "video":
+            send = message.reply_video if reply else message.answer_video
+        elif backup.media_type == "image":
+            send = message.reply_photo if reply else message.answer_photo
+        elif backup.media_type == "audio":
+            send = message.reply_audio if reply else message.answer_audio
+        else:
+            send = message.reply_document if reply else message.answer_document
+        return await send(backup.file_id, **kwargs)
+    except TelegramBadRequest as e:
+        logger.warning(f"Keshdagi file_id ishlamadi ({backup.url}): {e}")
+        await invalidate_backup(backup.url)
+        return None
+
+
+async def restore_from_backup(bot: Bot, file_id: str, suffix: str = ".mp4") -> str | None:
+    """Kesh orqali yuborilgan media uchun faylni Telegramdan qayta oladi (musiqa ajratish uchun)"""
+    RESTORE_DIR.mkdir(parents=True, exist_ok=True)
+    destination = RESTORE_DIR / f"{file_id[-24:]}{suffix}"
+    try:
+        await bot.download(file_id, destination=destination)
+    except Exception as e:
+        logger.error(f"Keshdagi faylni yuklab bo'lmadi: {e}")
+        return None
+    return str(destination) if Path(destination).exists() else None
+
+
+def get_backup_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+    }
+
+
+async def resolve_session_video(bot: Bot, session: dict | None) -> str | None:
+    """Sessiyadagi video faylini qaytaradi, u bo'lmasa keshdagi file_id dan tiklaydi"""
+    if not session:
+        return None
+    video_path = session.get("video_path")
+    if video_path and Path(video_path).exists():
+        return video_path
+    if session.get("file_id"):
+        video_path = await restore_from_backup(bot, session["file_id"])
+        session["video_path"] = video_path
+        return video_path
+    return None
@@ -0,0 +1,373 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from functools import cache
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+from aiogram.types import ContentType
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from app.bot.handlers.user_handlers import invalidate_user
+from app.bot.keyboards.admin_keyboards import get_admin_panel_keyboard
+from app.bot.models import Broadcast, BroadcastRecipient, User
+from app.bot.models.broadcast import (
+    RECIPIENT_BLOCKED,
+    RECIPIENT_DEACTIVATED,
+    RECIPIENT_FAILED,
+    RECIPIENT_SENT,
+)
+from app.core.databases.postgres import get_general_session
+from app.core.settings.config import get_settings, Settings
+from app.core.utils.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+# (tg_id, status, attempts)
+DeliveryResult = Tuple[int, int, int]
+
+# broadcast_id -> ishlayotgan task
+_running: Dict[int, asyncio.Task] = {}
+
+
+@cache
+def get_broadcast_limiter() -> TokenBucket:
+    """Telegram cheklovi global, shuning uchun barcha broadcast lar bitta bucket da"""
+    return TokenBucket(settings.BROADCAST_RATE, settings.BROADCAST_BURST)
+
+
+async def create_broadcast(
+    admin_id: int,
+    text: str | None = None,
+    media: tuple[str, str] | None = None,
+    source: tuple[int, int] | None = None,
+) -> Broadcast:
+    async with get_general_session() as session:
+        total = (
+            await session.execute(
+                select(func.count()).select_from(User).where(User.is_blocked.is_(False))
+            )
+        ).scalar_one()
+        broadcast = Broadcast(
+            admin_id=admin_id,
+            text=text,
+            media_type=media[0] if media else None,
+            media_file_id=media[1] if media else None,
+            source_chat_id=source[0] if source else None,
+            source_message_id=source[1] if source else None,
+            status="running",
+            total=total,
+            created_at=datetime.now(),
+        )
+        session.add(broadcast)
+        await session.commit()
+        return broadcast
+
+
+async def _fetch_recipients(after_tg_id: int, limit: int) -> List[int]:
+    """
+    Keyset pagination - OFFSET siz, har bir sahifa indeks bo'yicha olinadi.
+    Botni bloklagan foydalanuvchilarga yuborilmaydi.
+    """
+    async with get_general_session() as session:
+        result = await session.execute(
+            select(User.tg_id)
+            .where(User.tg_id > after_tg_id, User.is_blocked.is_(False))
+            .order_by(User.tg_id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+
+async def _save_progress(
+    broadcast: Broadcast, results: List[DeliveryResult]
+) -> None:
+    blocked_ids = [
+        tg_id
+        for tg_id, status, _ in results
+        if status in (RECIPIENT_BLOCKED, RECIPIENT_DEACTIVATED)
+    ]
+    async with get_general_session() as session:
+        if results:
+            stmt = insert(BroadcastRecipient).values(
+                [
+                    {
+                        "broadcast_id": broadcast.id,
+                        "tg_id": tg_id,
+                        "status": status,
+                        "attempts": attempts,
+                    }
+                    for tg_id, status, attempts in results
+                ]
+            )
+            # Qayta ishga tushganda oxirgi sahifa qayta yuborilishi mumkin
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["broadcast_id", "tg_id"],
+                    set_={
+                        "status": stmt.excluded.status,
+                        "attempts": BroadcastRecipient.attempts
+                        + stmt.excluded.attempts,
+                    },
+                )
+            )
+        await session.execute(
+            update(Broadcast)
+            .where(Broadcast.id == broadcast.id)
+            .values(
+                last_tg_id=broadcast.last_tg_id,
+                sent=broadcast.sent,
+                failed=broadcast.failed,
+                blocked=broadcast.blocked,
+                deactivated=broadcast.deactivated,
+                retries=broadcast.retries,
+                status=broadcast.status,
+                finished_at=broadcast.finished_at,
+            )
+        )
+        if blocked_ids:
+            await session.execute(
+                update(User).where(User.tg_id.in_(blocked_ids)).values(is_blocked=True)
+            )
+        await session.commit()
+    for tg_id in blocked_ids:
+        invalidate_user(tg_id)
+
+
+class BroadcastRunner:
+    """
+    Bitta broadcast ni yuboradi: tg_id lar keyset bo'yicha sahifalab olinadi,
+    har bir xabar token bucket dan ruxsat oladi, har sahifadan keyin
+    progress bazaga yoziladi (qayta ishga tushganda shu joydan davom etadi).
+    """
+
+    def __init__(self, bot: Bot, broadcast: Broadcast):
+        self.bot = bot
+        self.broadcast = broadcast
+        self.limiter = get_broadcast_limiter()
+        self._workers = asyncio.Semaphore(settings.BROADCAST_WORKERS)
+        self._started = time.monotonic()
+        self._processed_at_start = broadcast.processed
+        self._progress_message_id: Optional[int] = None
+
+    async def _send(self, tg_id: int) -> None:
+        broadcast = self.broadcast
+        text = broadcast.text
+        if broadcast.source_message_id is not None:
+            await self.bot.copy_message(
+                chat_id=tg_id,
+                from_chat_id=broadcast.source_chat_id,
+                message_id=broadcast.source_message_id,
+            )
+        elif broadcast.media_type == ContentType.PHOTO:
+            await self.bot.send_photo(
+                tg_id, photo=broadcast.media_file_id, caption=text, parse_mode="HTML"
+            )
+        elif broadcast.media_type == ContentType.VIDEO:
+            await self.bot.send_video(
+                tg_id, video=broadcast.media_file_id, caption=text, parse_mode="HTML"
+            )
+        elif broadcast.media_type:
+            await self.bot.send_document(
+                tg_id, document=broadcast.media_file_id, caption=text, parse_mode="HTML"
+            )
+        else:
+            await self.bot.send_message(tg_id, text, parse_mode="HTML")
+
+    async def _deliver(self, tg_id: int) -> DeliveryResult:
+        async with self._workers:
+            attempts = 0
+            while attempts < settings.BROADCAST_MAX_RETRIES:
+                attempts += 1
+                await self.limiter.acquire()
+                try:
+                    await self._send(tg_id)
+                    return tg_id, RECIPIENT_SENT, attempts
+                except TelegramRetryAfter as e:
+                    logger.warning(f"Broadcast: flood limit, {e.retry_after}s kutiladi")
+                    self.limiter.pause(e.retry_after)
+                except TelegramForbiddenError as e:
+                    if "deactivated" in e.message.lower():
+                        return tg_id, RECIPIENT_DEACTIVATED, attempts
+                    return tg_id, RECIPIENT_BLOCKED, attempts
+                except TelegramBadRequest as e:
+                    logger.info(f"Broadcast: {tg_id} ga yuborilmadi: {e.message}")
+                    break
+                except Exception as e:
+                    logger.warning(f"Broadcast: {tg_id} ga yuborishda xatolik: {e}")
+                    break
+            return tg_id, RECIPIENT_FAILED, attempts
+
+    def _progress_text(self) -> str:
+        broadcast = self.broadcast
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        rate = (broadcast.processed - self._processed_at_start) / elapsed
+        remaining = max(broadcast.total - broadcast.processed, 0)
+        eta = f"{int(remaining / rate // 60)} min" if rate > 0 else "—"
+        return (
+            f"📬 <b>Broadcast #{broadcast.id}</b>: "
+            f"{broadcast.processed}/{broadcast.total}\n"
+            f"✅ Sent: {broadcast.sent}\n"
+            f"🚫 Blocked: {broadcast.blocked}\n"
+            f"👻 Deactivated: {broadcast.deactivated}\n"
+            f"⚠️ Failed: {broadcast.failed}\n"
+            f"🔁 Retries: {broadcast.retries}\n"
+            f"⚡ {rate:.1f} msg/s, ETA: {eta}"
+        )
+
+    async def _report_progress(self) -> None:
+        try:
+            if self._progress_message_id is None:
+                message = await self.bot.send_message(
+                    self.broadcast.admin_id, self._progress_text(), parse_mode="HTML"
+                )
+                self._progress_message_id = message.message_id
+            else:
+                await self.bot.edit_message_text(
+                    self._progress_text(),
+                    chat_id=self.broadcast.admin_id,
+                    message_id=self._progress_message_id,
+                    parse_mode="HTML",
+                )
+        except Exception as e:
+            logger.debug(f"Broadcast progress yangilanmadi: {e}")
+
+    async def _progress_loop(self) -> None:
+        while True:
+            await self._report_progress()
+            await asyncio.sleep(settings.BROADCAST_PROGRESS_INTERVAL)
+
+    async def run(self) -> None:
+        broadcast = self.broadcast
+        progress = asyncio.create_task(self._progress_loop())
+        try:
+            while True:
+                page = await _fetch_recipients(
+                    broadcast.last_tg_id, settings.BROADCAST_PAGE_SIZE
+                )
+                if not page:
+                    break
+
+                results = await asyncio.gather(*(self._deliver(uid) for uid in page))
+                statuses = [status for _, status, _ in results]
+                broadcast.sent += statuses.count(RECIPIENT_SENT)
+                broadcast.failed += statuses.count(RECIPIENT_FAILED)
+                broadcast.blocked += statuses.count(RECIPIENT_BLOCKED)
+                broadcast.deactivated += statuses.count(RECIPIENT_DEACTIVATED)
+                broadcast.retries += sum(attempts - 1 for _, _, attempts in results)
+                broadcast.last_tg_id = page[-1]
+                await _save_progress(broadcast, results)
+
+            broadcast.status = "done"
+            broadcast.finished_at = datetime.now()
+            await _save_progress(broadcast, [])
+        finally:
+            progress.cancel()
+
+        await self._report_progress()
+        await self.bot.send_message(
+            broadcast.admin_id,
+            "📬 Broadcast complete!",
+            reply_markup=get_admin_panel_keyboard(),
+        )
+
+
+def _start_runner(bot: Bot, broadcast: Broadcast) -> None:
+    task = asyncio.create_task(BroadcastRunner(bot, broadcast).run())
+    _running[broadcast.id] = task
+
+    def _done(t: asyncio.Task) -> None:
+        _running.pop(broadcast.id, None)
+        if not t.cancelled() and t.exception():
+            logger.error(f"Broadcast #{broadcast.id} to'xtadi: {t.exception()}")
+
+    task.add_done_callback(_done)
+
+
+async def launch_broadcast(
+    bot: Bot,
+    admin_id: int,
+    text: str | None = None,
+    media: tuple[str, str] | None = None,
+    source: tuple[int, int] | None = None,
+) -> Broadcast:
+    """text/media yoki source (chat_id, message_id) - copy_message rejimi"""
+    broadcast = await create_broadcast(admin_id, text, media, source)
+    _start_runner(bot, broadcast)
+    return broadcast
+
+
+async def resume_broadcasts(bot: Bot) -> None:
+    """Bot qayta ishga tushganda tugallanmagan broadcast lar davom ettiriladi"""
+    async with get_general_session() as session:
+        result = await session.execute(
+            select(Broadcast).where(Broadcast.status == "running")
+        )
+        broadcasts = result.scalars().all()
+    for broadcast in broadcasts:
+        if broadcast.id not in _running:
+            logger.info(
+                f"Broadcast #{broadcast.id} davom ettirilmoqda "
+                f"(tg_id > {broadcast.last_tg_id})"
+            )
+            _start_runner(bot, broadcast)
+
+
+async def get_broadcast_summary(broadcast_id: int | None = None) -> dict | None:
+    """
+    Broadcast holati (broadcast_id berilmasa - oxirgisi).
+    Natijalar broadcast_recipients jadvalidan status bo'yicha yig'iladi.
+    """
+    async with get_general_session() as session:
+        query = select(Broadcast)
+        if broadcast_id is None:
+            query = query.order_by(Broadcast.id.desc()).limit(1)
+        else:
+            query = query.where(Broadcast.id == broadcast_id)
+        broadcast = (await session.execute(query)).scalar_one_or_none()
+        if broadcast is None:
+            return None
+
+        result = await session.execute(
+            select(
+                BroadcastRecipient.status,
+                func.count().label("count"),
+                func.sum(BroadcastRecipient.attempts - 1).label("retries"),
+            )
+            .where(BroadcastRecipient.broadcast_id == broadcast.id)
+            .group_by(BroadcastRecipient.status)
+        )
+        rows = {row.status: row for row in result}
+
+    def count(status: int) -> int:
+        return rows[status].count if status in rows else 0
+
+    return {
+        "id": broadcast.id,
+        "status": broadcast.status,
+        "mode": "copy" if broadcast.source_message_id is not None else "send",
+        "total": broadcast.total,
+        "processed": sum(row.count for row in rows.values()),
+        "sent": count(RECIPIENT_SENT),
+        "blocked": count(RECIPIENT_BLOCKED),
+        "deactivated": count(RECIPIENT_DEACTIVATED),
+        "failed": count(RECIPIENT_FAILED),
+        "retries": sum(int(row.retries or 0) for row in rows.values()),
+        "created_at": broadcast.created_at,
+        "finished_at": broadcast.finished_at,
+    }
+
+
+def stop_broadcasts() -> None:
+    # Progress har sahifadan keyin saqlangan - keyingi ishga tushishda davom etadi
+    for task in list(_running.values()):
+        task.cancel()
@@ -1,8 +1,38 @@
+import asyncio
+import logging
+import time
+
+from cachetools import TTLCache
+
 from app.bot.models import Channel
 from app.core.databases.postgres import get_general_session
+from app.core.settings.config import get_settings, Settings
 from sqlalchemy.future import select
 from aiogram.exceptions import TelegramBadRequest
 
+settings: Settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SUBSCRIBED_STATUSES = ("member", "administrator", "creator")
+
+# (user_id, channel_id) -> obuna holati. Obuna bo'lganlar uzoqroq,
+# obuna bo'lmaganlar qisqa saqlanadi (obuna bo'lgach tez tekshirilishi uchun)
+_subscribed: TTLCache = TTLCache(
+    maxsize=100_000, ttl=settings.SUBSCRIPTION_POSITIVE_TTL
+)
+_unsubscribed: TTLCache = TTLCache(
+    maxsize=100_000, ttl=settings.SUBSCRIPTION_NEGATIVE_TTL
+)
+# channel_id -> True: bot a'zolikni tekshira olmagan kanallar (har bir
+# foydalanuvchi uchun qayta so'rov yuborilmasligi uchun)
+_unreachable: TTLCache = TTLCache(
+    maxsize=1_000, ttl=settings.SUBSCRIPTION_UNREACHABLE_TTL
+)
+
+# Faol kanallar ro'yxati: kanal qo'shilganda/o'zgarganda/o'chirilganda yangilanadi
+_active_channels: list[Channel] | None = None
+_active_channels_loaded_at = 0.0
+
 
 async def get_channel_by_id(channel_id: int) -> Channel | None:
     async with get_general_session() as session:
@@ -31,7 +61,8 @@ async def add_channel(
         )
         session.add(channel)
         await session.commit()
-        return channel
+    invalidate_channel_cache()
+    return channel
 
 
 async def update_channel(
@@ -49,7 +80,8 @@ async def update_channel(
         channel.update(name=name, link=link, is_active=is_active)
         session.add(channel)
         await session.commit()
-        return channel
+    invalidate_channel_cache()
+    return channel
 
 
 async def delete_channel(channel_id: int) -> None:
@@ -59,20 +91,58 @@ async def delete_channel(channel_id: int) -> None:
             raise ValueError("Channel not found.")
         await session.delete(channel)
         await session.commit()
+    invalidate_channel_cache()
+
+
+def invalidate_channel_cache() -> None:
+    global _active_channels
+    _active_channels = None
+    _unsubscribed.clear()
+    _unreachable.clear()
+
+
+async def get_active_channels() -> list[Channel]:
+    """Faol kanallar - jarayon ichida keshlanadi"""
+    global _active_channels, _active_channels_loaded_at
+    age = time.monotonic() - _active_channels_loaded_at
+    if _active_channels is None or age > settings.CHANNELS_CACHE_TTL:
+        _active_channels = list(await get_all_channels(is_active=True))
+        _active_channels_loaded_at = time.monotonic()
+    return _active_channels
+
+
+async def _is_subscribed(bot, user_id: int, channel: Channel) -> bool:
+    key = (user_id, channel.channel_id)
+    if key in _subscribed:
+        return True
+    if key in _unsubscribed:
+        return False
+    if channel.channel_id in _unreachable:
+        return True
+
+    try:
+        member = await bot.get_chat_member(chat_id=channel.channel_id, user_id=user_id)
+    except TelegramBadRequest as e:
+        # Bot kanalga kira olmasa foydalanuvchi bloklanmaydi
+        logger.warning(f"Kanal a'zoligini tekshirib bo'lmadi ({channel.name}): {e}")
+        _unreachable[channel.channel_id] = True
+        return True
+
+    if member.status in SUBSCRIBED_STATUSES:
+        _subscribed[key] = True
+        return True
+    _unsubscribed[key] = True
+    return False
 
 
 async def fetch_unsubscribed_channels(user_id: int, bot) -> list[Channel]:
-    unsubscribed: list[Channel] = []
-    channels = await get_all_channels(is_active=True)
-
-    for channel in channels:
-        try:
-            member = await bot.get_chat_member(
-                chat_id=channel.channel_id, user_id=user_id
-            )
-            if member.status not in ("member", "administrator", "creator"):
-                unsubscribed.append(channel)
-        except TelegramBadRequest:
-            continue
-
-    return unsubscribed
+    channels = await get_active_channels()
+    if not channels:
+        return []
+
+    statuses = await asyncio.gather(
+        *(_is_subscribed(bot, user_id, channel) for channel in channels)
+    )
+    return [
+        channel for channel, subscribed in zip(channels, statuses) if not subscribed
+    ]
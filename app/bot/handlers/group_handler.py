@@ -1,5 +1,5 @@
+import asyncio
 import logging
-import time
 from pathlib import Path
 from aiogram import Router, F
 from aiogram.types import (
@@ -7,6 +7,8 @@ from aiogram.types import (
     FSInputFile,
     InlineKeyboardMarkup,
     InlineKeyboardButton,
+    InputMediaPhoto,
+    InputMediaVideo,
     CallbackQuery,
 )
 from aiogram.exceptions import TelegramAPIError
@@ -15,6 +17,13 @@ from aiogram.utils.i18n import gettext as _
 
 from app.bot.controller.group_controller import GroupController
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+    restore_from_backup,
+)
+from app.bot.handlers.queue_handler import is_premium_user
 from app.bot.handlers.statistics_handler import update_statistics
 from app.bot.handlers.tiktok_handler import extract_audio_from_tiktok_video_smart
 from app.bot.handlers import shazam_handler as shz
@@ -22,9 +31,19 @@ from app.bot.routers.music_router import (
     get_controller,
     format_page_text,
     create_keyboard,
-    _cache,
+    store_results,
 )
 from app.bot.keyboards.general_buttons import get_music_download_button
+from app.core.constants.media import (
+    TELEGRAM_MAX_FILE_SIZE,
+    TELEGRAM_MEDIA_GROUP_LIMIT,
+)
+from app.core.utils.executor import run_blocking
+from app.core.utils.job_queue import (
+    QueueFullError,
+    UserLimitError,
+    get_download_queue,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +54,10 @@ group_controller = GroupController()
 # User sessions for music download
 user_sessions = {}
 
+# Bitta xabardagi linklar parallel yuklanadi
+GROUP_MAX_PARALLEL = 4
+GROUP_URL_TIMEOUT = 180
+
 
 # Guruh commandlari uchun alohida filterlar
 @group_router.message(Command("help"))
@@ -111,8 +134,8 @@ async def handle_group_message(message: Message):
     if not bot_mentioned and not _should_respond_automatically(message):
         return
 
-    # URLlarni ajratib olish
-    urls = group_controller.extract_urls(message.text)
+    # URLlarni ajratib olish (takrorlanganlari bir marta)
+    urls = list(dict.fromkeys(group_controller.extract_urls(message.text)))
     if not urls:
         return
 
@@ -130,35 +153,61 @@ async def handle_group_message(message: Message):
         ),
     )
 
+    async def notify_queued(position: int) -> None:
+        await processing_msg.edit_text(
+            f"⏳ Navbatdasiz: {position}-o'rin",
+            reply_markup=processing_msg.reply_markup,
+        )
+
     try:
-        downloaded_files = []
-        failed_urls = []
+        premium = await is_premium_user(message.from_user.id)
+        semaphore = asyncio.Semaphore(GROUP_MAX_PARALLEL)
 
-        for url in urls:
+        async def process(url: str) -> tuple[int, int, str | None]:
+            platform = group_controller.detect_platform(url)
             try:
-                result = await group_controller.download_media(url)
-
-                if result["success"] and result["files"]:
-                    downloaded_files.extend(result["files"])
-                    # URL va platformani session'da saqlash
-                    user_id = message.from_user.id
-                    if user_id not in user_sessions:
-                        user_sessions[user_id] = []
-
-                    platform = group_controller.detect_platform(url)
-                    user_sessions[user_id].append(
-                        {
-                            "url": url,
-                            "platform": platform.value if platform else "unknown",
-                            "files": result["files"],
-                        }
+                async with semaphore, get_download_queue().slot(
+                    platform.queue_lane if platform else "default",
+                    None,
+                    premium,
+                    on_wait=notify_queued,
+                ):
+                    # Har bir link tayyor bo'lishi bilan o'zi yuboriladi
+                    return await asyncio.wait_for(
+                        _process_group_url(message, url), GROUP_URL_TIMEOUT
                     )
-                else:
-                    failed_urls.append((url, result.get("message", "Noma'lum xatolik")))
-
+            except asyncio.TimeoutError:
+                logger.warning(f"Group download timeout: {url}")
+                return 0, 0, "Yuklash vaqti tugadi"
+            except QueueFullError:
+                return 0, 0, "Navbat to'la, birozdan so'ng urinib ko'ring"
             except Exception as e:
                 logger.error(f"Download error for {url}: {e}")
-                failed_urls.append((url, f"Xatolik: {str(e)}"))
+                return 0, 0, f"Xatolik: {str(e)}"
+
+        # Xabar bitta foydalanuvchi yuklashi sifatida hisoblanadi,
+        # ichidagi linklar parallel yuklanadi
+        try:
+            async with get_download_queue().slot(
+                "group", message.from_user.id, premium, on_wait=notify_queued
+            ):
+                results = await asyncio.gather(*(process(url) for url in urls))
+        except UserLimitError:
+            await processing_msg.edit_text(
+                "⏳ Oldingi yuklashlaringiz tugashini kuting", reply_markup=None
+            )
+            return
+        except QueueFullError:
+            await processing_msg.edit_text(
+                "Navbat to'la, birozdan so'ng urinib ko'ring", reply_markup=None
+            )
+            return
+
+        sent_count = sum(result[0] for result in results)
+        cached_count = sum(result[1] for result in results)
+        failed_urls = [
+            (url, result[2]) for url, result in zip(urls, results) if result[2]
+        ]
 
         # Processing xabarini o'chirish
         try:
@@ -166,12 +215,10 @@ async def handle_group_message(message: Message):
         except:
             pass
 
-        # Natijalarni yuborish
-        if downloaded_files:
-            await _send_media_files(message, downloaded_files)
-
+        # Yakuniy xabar
+        if sent_count or cached_count:
             # Muvaffaqiyat xabari music download tugmasi bilan
-            success_text = f"✅ {len(downloaded_files)} ta fayl yuklandi"
+            success_text = f"✅ {sent_count + cached_count} ta fayl yuklandi"
 
             if failed_urls:
                 success_text += f"\n❌ {len(failed_urls)} ta link yuklanmadi"
@@ -259,6 +306,17 @@ async def handle_group_music_callback(callback_query: CallbackQuery):
 
         logger.info(f"Processing music for platform: {platform}, URL: {url}")
 
+        # Keshdan yuborilgan video bo'lsa faylni Telegramdan qayta olish
+        for file_info in files:
+            if (
+                file_info["type"] == "video"
+                and not file_info.get("path")
+                and file_info.get("file_id")
+            ):
+                file_info["path"] = await restore_from_backup(
+                    callback_query.bot, file_info["file_id"]
+                )
+
         # Platform bo'yicha audio ajratish
         audio_path = await extract_audio_for_platform(platform, url, files)
 
@@ -303,15 +361,12 @@ async def handle_group_music_callback(callback_query: CallbackQuery):
         )
 
         # Cache'ga saqlash
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         # Musiqa ro'yxatini ko'rsatish
         await callback_query.message.reply(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
@@ -337,7 +392,7 @@ async def handle_group_music_callback(callback_query: CallbackQuery):
             try:
                 last_download = session[-1]
                 for file_info in last_download["files"]:
-                    if file_info["type"] == "video":
+                    if file_info["type"] == "video" and file_info.get("path"):
                         file_path = Path(file_info["path"])
                         if file_path.exists():
                             file_path.unlink()
@@ -398,7 +453,9 @@ async def extract_audio_for_platform(platform: str, url: str, files: list) -> st
                 )
                 from app.core.utils.audio import extract_audio_from_video
 
-                return extract_audio_from_video(video_path)
+                return await run_blocking(
+                    "audio", extract_audio_from_video, video_path
+                )
             else:
                 logger.warning(f"No video file found for {platform}")
                 return None
@@ -423,57 +480,141 @@ def get_video_file_path(files: list) -> str:
     return None
 
 
-# group_handler.py dagi _send_media_files funksiyasini ham yangilash kerak:
-async def _send_media_files(message: Message, files: list):
-    """Media fayllarni yuborish - yangilangan versiya"""
-    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+def _media_caption(message: Message, media_type: str) -> str:
+    via = f"🔗 Via @{message.bot.username if hasattr(message.bot, 'username') else ''}"
+    if media_type == "video":
+        return f"📹 Video\n{via}"
+    if media_type == "image":
+        return f"🖼 Rasm\n{via}"
+    if media_type == "album":
+        return f"🗂 Albom\n{via}"
+    return f"📄 Media\n{via}"
+
+
+async def _process_group_url(
+    message: Message, url: str
+) -> tuple[int, int, str | None]:
+    """Bitta linkni keshdan yoki yuklab yuboradi: (yuborilgan, keshdan, xatolik)"""
+    platform = group_controller.detect_platform(url)
+
+    # Bir xil link bir vaqtda boshqa guruhda yuklanayotgan bo'lsa,
+    # o'sha yuklash tugashini kutib keshdagi file_id yuboriladi
+    async with media_flight(url) as backup:
+        if backup and await answer_from_backup(
+            message,
+            backup,
+            reply=True,
+            caption=_media_caption(message, backup.media_type),
+        ):
+            user_sessions.setdefault(message.from_user.id, []).append(
+                {
+                    "url": url,
+                    "platform": backup.platform or "unknown",
+                    "files": [{"type": backup.media_type, "file_id": backup.file_id}],
+                }
+            )
+            return 0, 1, None
 
-    for file_info in files:
-        try:
-            file_path = Path(file_info["path"])
+        result = await group_controller.download_media(url)
+        if not (result["success"] and result["files"]):
+            return 0, 0, result.get("message", "Noma'lum xatolik")
 
-            if not file_path.exists():
-                logger.warning(f"File not found: {file_path}")
-                continue
+        sent_messages = await _send_media_files(message, result["files"])
 
-            # Fayl hajmini tekshirish
-            if file_path.stat().st_size > MAX_FILE_SIZE:
-                await message.reply(f"❌ Fayl juda katta: {file_path.name}")
-                continue
+        # Bitta faylli natijalar keshga yoziladi
+        if len(result["files"]) == 1 and sent_messages[0]:
+            await add_to_backup(
+                url, sent_messages[0], platform=platform.value if platform else None
+            )
 
-            file_input = FSInputFile(str(file_path))
+    # URL va platformani session'da saqlash
+    user_sessions.setdefault(message.from_user.id, []).append(
+        {
+            "url": url,
+            "platform": platform.value if platform else "unknown",
+            "files": result["files"],
+        }
+    )
+    return len(result["files"]), 0, None
+
+
+# group_handler.py dagi _send_media_files funksiyasini ham yangilash kerak:
+async def _send_single_file(message: Message, file_info: dict) -> Message:
+    file_input = FSInputFile(str(file_info["path"]))
+    caption = _media_caption(message, file_info["type"])
+
+    # Media turini aniqlash va yuborish
+    if file_info["type"] == "video":
+        return await message.reply_video(video=file_input, caption=caption)
+    if file_info["type"] == "image":
+        return await message.reply_photo(photo=file_input, caption=caption)
+    return await message.reply_document(document=file_input, caption=caption)
+
+
+async def _send_album(message: Message, album: list) -> list:
+    """Rasm/videolarni bitta albom qilib yuborish (Telegram: 2-10 ta)"""
+    media = []
+    for i, file_info in enumerate(album):
+        caption = _media_caption(message, "album") if i == 0 else None
+        file_input = FSInputFile(str(file_info["path"]))
+        if file_info["type"] == "video":
+            media.append(InputMediaVideo(media=file_input, caption=caption))
+        else:
+            media.append(InputMediaPhoto(media=file_input, caption=caption))
+    return await message.reply_media_group(media=media)
 
-            # Media turini aniqlash va yuborish
-            if file_info["type"] == "video":
-                await message.reply_video(
-                    video=file_input,
-                    caption=f"📹 Video\n🔗 Via @{message.bot.username if hasattr(message.bot, 'username') else ''}",
-                )
-            elif file_info["type"] == "image":
-                await message.reply_photo(
-                    photo=file_input,
-                    caption=f"🖼 Rasm\n🔗 Via @{message.bot.username if hasattr(message.bot, 'username') else ''}",
-                )
-            else:
-                await message.reply_document(
-                    document=file_input,
-                    caption=f"📄 Media\n🔗 Via @{message.bot.username if hasattr(message.bot, 'username') else ''}",
-                )
 
-            # MUHIM: Video fayllarni hozircha o'chirmang (music extraction uchun kerak)
-            # Faqat image va boshqa fayllarni o'chiring
-            if file_info["type"] != "video":
-                try:
-                    file_path.unlink()
-                except Exception as e:
-                    logger.error(f"Failed to delete file {file_path}: {e}")
+async def _send_media_files(message: Message, files: list) -> list:
+    """Media fayllarni yuborish - yuborilgan xabarlar files tartibida qaytadi"""
+    sent_messages = [None] * len(files)
+    ready = []
 
+    for index, file_info in enumerate(files):
+        file_path = Path(file_info["path"])
+        if not file_path.exists():
+            logger.warning(f"File not found: {file_path}")
+            continue
+
+        # Fayl hajmini tekshirish
+        if file_path.stat().st_size > TELEGRAM_MAX_FILE_SIZE:
+            await message.reply(f"❌ Fayl juda katta: {file_path.name}")
+            continue
+        ready.append(index)
+
+    # Bir nechta rasm/video bo'lsa albom qilib yuboriladi
+    album = [i for i in ready if files[i]["type"] in ("image", "video")]
+    if len(album) > 1:
+        for start in range(0, len(album), TELEGRAM_MEDIA_GROUP_LIMIT):
+            chunk = album[start : start + TELEGRAM_MEDIA_GROUP_LIMIT]
+            if len(chunk) == 1:
+                continue
+            try:
+                sent = await _send_album(message, [files[i] for i in chunk])
+                for i, sent_message in zip(chunk, sent):
+                    sent_messages[i] = sent_message
+            except TelegramAPIError as e:
+                logger.warning(f"Albom yuborilmadi, alohida yuboriladi: {e}")
+
+    for index in ready:
+        if sent_messages[index] is not None:
+            continue
+        try:
+            sent_messages[index] = await _send_single_file(message, files[index])
         except TelegramAPIError as e:
             logger.error(f"Telegram API error: {e}")
-            continue
         except Exception as e:
             logger.error(f"Send media error: {e}")
-            continue
+
+    # MUHIM: Video fayllarni hozircha o'chirmang (music extraction uchun kerak)
+    # Faqat image va boshqa fayllarni o'chiring
+    for index in ready:
+        if sent_messages[index] is not None and files[index]["type"] != "video":
+            try:
+                Path(files[index]["path"]).unlink()
+            except Exception as e:
+                logger.error(f"Failed to delete file {files[index]['path']}: {e}")
+
+    return sent_messages
 
 
 async def _is_bot_mentioned(message: Message) -> bool:
@@ -1,14 +1,22 @@
 import os
 import asyncio
 import subprocess
+import time
 from pathlib import Path
 from uuid import uuid4
 import logging
 
 from yt_dlp import YoutubeDL
-from app.bot.extensions.get_random_cookie import get_random_cookie_for_instagram
 from app.core.extensions.enums import CookieType
 from app.core.extensions.utils import WORKDIR, logger
+from app.core.utils.cookie_pool import OUTCOME_OK, classify_error, get_cookie_pool
+from app.core.utils.executor import run_blocking
+from app.core.utils.ydl_pool import pooled_ydl
+
+
+def _download_video_sync(url: str, ydl_opts: dict, output_template: str) -> None:
+    with pooled_ydl("instagram", "video", ydl_opts, outtmpl=output_template) as ydl:
+        ydl.download([url])
 
 
 async def download_instagram_video_only_mp4(url: str, target_folder=None) -> str:
@@ -23,37 +31,43 @@ async def download_instagram_video_only_mp4(url: str, target_folder=None) -> str
     filename = str(uuid4())
     output_template = str(target_folder / f"{filename}.%(ext)s")
 
+    # Eng sog'lom (karantinda bo'lmagan) cookie
+    cookie_pool = get_cookie_pool(CookieType.INSTAGRAM.value)
+    cookie_file = cookie_pool.acquire()
     ydl_opts = {
-        "outtmpl": output_template,
         "format": "best[ext=mp4]/best",
         "merge_output_format": "mp4",
         "noplaylist": True,
         "quiet": True,
         "no_warnings": True,
-        "cookiefile": get_random_cookie_for_instagram(CookieType.INSTAGRAM.value),
+        "cookiefile": cookie_file,
         "http_headers": {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         },
     }
 
+    started = time.monotonic()
     try:
-        with YoutubeDL(ydl_opts) as ydl:
-            await asyncio.get_event_loop().run_in_executor(None, ydl.download, [url])
+        # YoutubeDL instance instagram pool thread ida olinadi va qayta ishlatiladi
+        await run_blocking(
+            "instagram", _download_video_sync, url, ydl_opts, output_template
+        )
 
         # Find the downloaded file
         for file in target_folder.glob(f"{filename}.*"):
             if file.suffix in [".mp4", ".webm", ".mkv", ".mov"]:
                 logger.info(f"Instagram video downloaded: {file}")
+                cookie_pool.report(cookie_file, OUTCOME_OK, time.monotonic() - started)
                 return str(file)
 
         raise Exception("Downloaded file not found")
 
     except Exception as e:
-        logger.error(f"Instagram download error: {e}")
+        # Cookie fayl yo'li faqat logga yoziladi, foydalanuvchiga ko'rsatilmaydi
+        logger.error(f"Instagram download error: {e} (cookie: {cookie_file})")
+        cookie_pool.report(cookie_file, classify_error(e))
 
-        raise Exception(
-            f"Instagram yuklab olishda xatolik: {str(e)}, cookie: {ydl_opts['cookiefile']}"
-        )
+        raise Exception("Instagram yuklab olishda xatolik") from e
 
 
 def validate_instagram_url(url: str) -> str:
@@ -197,8 +211,8 @@ async def extract_with_ytdlp(video_path: str, audio_path: str) -> str:
         }
 
         with YoutubeDL(ydl_opts) as ydl:
-            await asyncio.get_event_loop().run_in_executor(
-                None, ydl.extract_info, video_path, {"extract_flat": False}
+            await run_blocking(
+                "audio", ydl.extract_info, video_path, {"extract_flat": False}
             )
 
         # Find the extracted audio file
@@ -6,6 +6,7 @@ import moviepy as mp
 from app.bot.controller.like_controller import LikeeController
 from app.core.extensions.utils import WORKDIR
 from app.core.settings.config import get_settings
+from app.core.utils.executor import run_blocking
 
 settings = get_settings()
 
@@ -16,12 +17,18 @@ def validate_likee_url(url: str) -> str:
 
 async def get_likee_video(url: str) -> str:
     controller = LikeeController(api_key=settings.LIKEE_API_KEY)
-    video_path = controller.download_video(url)
+    video_path = await controller.download_video(url)
     if not video_path or not Path(video_path).exists():
         raise Exception("❌ Likee video could not be downloaded.")
     return video_path
 
 
+def _write_audio_sync(video_path: str, audio_path: str) -> None:
+    video = mp.VideoFileClip(video_path)
+    video.audio.write_audiofile(audio_path, logger=None)
+    video.close()
+
+
 async def extract_audio_from_likee_video_smart(url: str) -> str:
     video_path = await get_likee_video(url)
     if not video_path or not os.path.exists(video_path):
@@ -33,9 +40,7 @@ async def extract_audio_from_likee_video_smart(url: str) -> str:
     os.makedirs(audio_path.parent, exist_ok=True)
 
     try:
-        video = mp.VideoFileClip(video_path)
-        video.audio.write_audiofile(str(audio_path), logger=None)
-        video.close()
+        await run_blocking("audio", _write_audio_sync, video_path, str(audio_path))
         os.remove(video_path)
         return str(audio_path)
     except Exception as e:
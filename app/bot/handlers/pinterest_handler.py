@@ -23,13 +23,13 @@ async def download_pinterest_media(url: str) -> tuple[str, str] | None:
             A tuple containing the path and filename of the downloaded media, or None if the
             download fails.
     """
-    with PinterestDownloader() as downloader:
-        try:
-            return downloader.download(
+    try:
+        with PinterestDownloader() as downloader:
+            return await downloader.download(
                 url,
                 out_path=WORKDIR.parent / "media" / "pinterest",
                 filename=uuid4().hex,
             )
-        except Exception as e:
-            print(f"❌ Pinterest download error: {e}")
-            return None
+    except Exception as e:
+        print(f"❌ Pinterest download error: {e}")
+        return None
@@ -0,0 +1,81 @@
+import logging
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from aiogram.types import CallbackQuery, Message
+from aiogram.utils.i18n import gettext as _
+
+from app.bot.handlers.user_handlers import get_user_by_tg_id
+from app.bot.models import User
+from app.core.utils.job_queue import (
+    QueueFullError,
+    UserLimitError,
+    get_download_queue,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def is_premium_user(tg_id: int, user: Optional[User] = None) -> bool:
+    if user is None:
+        user = await get_user_by_tg_id(tg_id)
+    return bool(user and user.is_premium())
+
+
+async def run_queued(
+    message: Message,
+    user_id: int,
+    platform: str,
+    func: Callable[..., Awaitable[T]],
+    *args: Any,
+    user: Optional[User] = None,
+    **kwargs: Any,
+) -> Optional[T]:
+    """
+    func ni yuklashlar navbati orqali bajaradi. Kutish kerak bo'lsa foydalanuvchiga
+    navbatdagi o'rni, rad etilsa sababi yuboriladi va None qaytadi.
+    user berilsa premium holati DB ga murojaatsiz aniqlanadi.
+    """
+
+    async def notify(position: int) -> None:
+        await message.answer(_("queue_waiting").format(position=position))
+
+    try:
+        async with get_download_queue().slot(
+            platform,
+            user_id,
+            await is_premium_user(user_id, user),
+            on_wait=notify,
+        ):
+            return await func(*args, **kwargs)
+    except UserLimitError:
+        await message.answer(_("queue_user_limit"))
+    except QueueFullError:
+        logger.warning(f"{platform} navbati to'la, so'rov rad etildi: {user_id}")
+        await message.answer(_("queue_full"))
+    return None
+
+
+def queued_download(platform: str):
+    """Link handler ni to'liq (yuklash + yuborish) navbat orqali ishga tushiradi"""
+
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapper(event: Message | CallbackQuery, *args, **kwargs):
+            message = event.message if isinstance(event, CallbackQuery) else event
+            return await run_queued(
+                message,
+                event.from_user.id,
+                platform,
+                handler,
+                event,
+                *args,
+                user=kwargs.get("db_user"),
+                **kwargs,
+            )
+
+        return wrapper
+
+    return decorator
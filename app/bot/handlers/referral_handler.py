@@ -1,6 +1,8 @@
+from sqlalchemy import func
 from sqlalchemy.future import select
 from datetime import datetime, timedelta
 
+from app.bot.handlers.user_handlers import get_user_by_tg_id
 from app.bot.models import Referral, AdminRequirements, User
 from app.core.databases.postgres import get_general_session
 
@@ -31,14 +33,9 @@ async def add_referral(tg_id: int, invited_tg_id: int) -> Referral | None:
         return referral
 
 
-async def get_user_by_tg_id(tg_id: int) -> User | None:
-    async with get_general_session() as session:
-        result = await session.execute(select(User).where(User.tg_id == tg_id))
-        return result.scalar_one_or_none()
-
-
-async def is_free_for_month(tg_id: int) -> bool:
-    user = await get_user_by_tg_id(tg_id)
+async def is_free_for_month(tg_id: int, user: User | None = None) -> bool:
+    if user is None:
+        user = await get_user_by_tg_id(tg_id)
     if not user:
         return False
     async with get_general_session() as session:
@@ -46,8 +43,7 @@ async def is_free_for_month(tg_id: int) -> bool:
         admin_req = result.scalars().first()
         if not admin_req:
             return True
-        referral_count = await session.execute(
-            select(Referral).where(Referral.tg_id == tg_id)
+        count = await session.scalar(
+            select(func.count()).select_from(Referral).where(Referral.tg_id == tg_id)
         )
-        count = len(referral_count.scalars().all())
         return count >= admin_req.referral_count_for_free_month or user.is_premium()
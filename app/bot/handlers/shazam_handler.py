@@ -10,6 +10,8 @@ from uuid import uuid4
 import aiohttp
 from shazamio import Shazam
 from app.core.extensions.utils import WORKDIR
+from app.core.utils.http_client import stream_download
+from app.core.utils.search_cache import SearchCache, normalize_query
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +25,16 @@ MAX_RESULTS, CHUNK = 30, 10
 FFMPEG_WAV = "-vn -acodec pcm_s16le -ac 1 -ar 16000 -t 10 -f wav"
 TOKEN_RE = re.compile(r"\w+")
 
-# Smaller cache for faster lookups
-_text_search_cache: Dict[str, tuple] = {}  # (results, timestamp)
-CACHE_MAX_SIZE = 30
+CACHE_MAX_SIZE = 500
 CACHE_TTL = 180  # 3 minutes
+_text_search_cache = SearchCache(
+    "shazam-text",
+    max_entries=CACHE_MAX_SIZE,
+    ttl=CACHE_TTL,
+    # Shazam javoblari katta - xotira baytlar bo'yicha ham cheklanadi
+    max_bytes=32 * 1024 * 1024,
+    persistent=True,
+)
 
 
 def _score(hit: Dict, tokens: List[str]) -> float:
@@ -58,11 +66,10 @@ async def find_music_by_text(text: str) -> List[Dict]:
 
     text = text.strip()
 
-    # Check cache with TTL
-    if text in _text_search_cache:
-        results, timestamp = _text_search_cache[text]
-        if asyncio.get_event_loop().time() - timestamp < CACHE_TTL:
-            return results
+    cache_key = normalize_query(text)
+    cached = await _text_search_cache.aget(cache_key)
+    if cached is not None:
+        return cached
 
     try:
         # Parallel search with smaller chunks
@@ -88,14 +95,8 @@ async def find_music_by_text(text: str) -> List[Dict]:
 
         result = hits[:MAX_RESULTS]
 
-        # Update cache
-        if len(_text_search_cache) >= CACHE_MAX_SIZE:
-            oldest_key = min(
-                _text_search_cache.keys(), key=lambda k: _text_search_cache[k][1]
-            )
-            del _text_search_cache[oldest_key]
-
-        _text_search_cache[text] = (result, asyncio.get_event_loop().time())
+        if result:
+            _text_search_cache.set(cache_key, result)
         return result
 
     except asyncio.TimeoutError:
@@ -168,29 +169,16 @@ async def download_music(url: str, filename: Optional[str] = None) -> Optional[s
     file_path = MUSIC_DIR / filename
 
     try:
-        # Faster timeout and connection settings
-        timeout = aiohttp.ClientTimeout(total=20, connect=5)
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
-
-        async with aiohttp.ClientSession(
-            timeout=timeout, connector=connector
-        ) as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-
-                # Larger chunks for faster download
-                with open(file_path, "wb") as fp:
-                    downloaded = 0
-                    async for chunk in response.content.iter_chunked(16384):
-                        fp.write(chunk)
-                        downloaded += len(chunk)
-
-                        # Size limit
-                        if downloaded > 40 * 1024 * 1024:  # 40MB
-                            break
-
-                if file_path.exists() and file_path.stat().st_size > 0:
-                    return str(file_path)
+        # Umumiy keep-alive sessiya, fayl bo'laklab diskka yoziladi
+        await stream_download(
+            url,
+            file_path,
+            max_size=40 * 1024 * 1024,  # 40MB
+            timeout=aiohttp.ClientTimeout(total=20, connect=5),
+        )
+
+        if file_path.exists() and file_path.stat().st_size > 0:
+            return str(file_path)
 
     except Exception as e:
         logger.error(f"Download error: {e}")
@@ -202,5 +190,4 @@ async def download_music(url: str, filename: Optional[str] = None) -> Optional[s
 
 def clear_text_search_cache() -> None:
     """Clear cache."""
-    global _text_search_cache
     _text_search_cache.clear()
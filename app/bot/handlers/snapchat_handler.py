@@ -8,10 +8,9 @@ logger = logging.getLogger(__name__)
 async def download_snapchat_media(url: str) -> str | None:
     try:
         controller = SnapchatController()
-        file_path = controller.download_snapchat_video(
+        return await controller.download_snapchat_video(
             url, WORKDIR.parent / "media" / "snapchat"
         )
-        return file_path
     except Exception as e:
         logger.error(f"Snapchat handler error: {e}")
         return None
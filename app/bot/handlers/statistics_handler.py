@@ -1,8 +1,37 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import values, column, BigInteger
+from sqlalchemy.dialects.postgresql import insert
 
-from app.bot.models import Statistics
+from app.bot.handlers.usage_handler import (
+    UsageRecord,
+    platform_from_field,
+    write_usage,
+)
+from app.bot.models import Statistics, User
 from app.core.databases.postgres import get_general_session
+from app.core.settings.config import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+COUNTER_FIELDS = (
+    "from_text",
+    "from_voice",
+    "from_youtube",
+    "from_tiktok",
+    "from_like",
+    "from_snapchat",
+    "from_instagram",
+    "from_twitter",
+    "from_video",
+)
+# Router lar yuboradigan, lekin ustuni boshqacha nomlangan maydonlar
+FIELD_ALIASES = {"from_likee": "from_like"}
 
 
 async def get_statistics_by_tg_id(tg_id: int) -> Statistics | None:
@@ -27,55 +56,163 @@ async def create_statistics(
         return statistics
 
 
-async def update_statistics(tg_id: int, field: str) -> Statistics:
+class StatisticsBuffer:
+    """
+    Statistika hisoblagichlari uchun write-behind bufer.
+    Hodisalar xotirada (tg_id, field) bo'yicha yig'iladi va har N soniyada
+    yoki M ta hodisadan keyin bitta INSERT ... ON CONFLICT bilan yoziladi.
+    Shu flush da usage_events va soatlik/kunlik rollup lar ham yoziladi.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.STATS_FLUSH_INTERVAL,
+        max_events: int = settings.STATS_FLUSH_MAX_EVENTS,
+        max_keys: int = settings.STATS_BUFFER_MAX_KEYS,
+    ):
+        self.interval = interval
+        self.max_events = max_events
+        self.max_keys = max_keys
+        self._counts: Dict[Tuple[int, str], int] = {}
+        self._records: List[UsageRecord] = []
+        self._events = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"events": 0, "flushes": 0, "rows": 0, "dropped": 0}
+
+    def add(self, tg_id: int, field: str) -> None:
+        if len(self._records) >= self.max_keys:
+            # DB uzoq vaqt ishlamasa xotira cheksiz o'smasligi uchun
+            self.stats["dropped"] += 1
+            self._schedule_flush()
+            return
+        self._records.append((tg_id, platform_from_field(field), datetime.now()))
+        self._events += 1
+        self.stats["events"] += 1
+
+        field = FIELD_ALIASES.get(field, field)
+        key = (tg_id, field)
+        if field in COUNTER_FIELDS and (
+            key in self._counts or len(self._counts) < self.max_keys
+        ):
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+        if self._events >= self.max_events or len(self._records) >= self.max_keys:
+            self._schedule_flush()
+
+    def pending(self) -> Dict[str, int]:
+        totals = dict.fromkeys(COUNTER_FIELDS, 0)
+        for (_, field), count in self._counts.items():
+            totals[field] += count
+        return totals
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """Buferdagi hisoblagichlarni bitta so'rov bilan bazaga yozadi"""
+        async with self._lock:
+            if not self._records and not self._counts:
+                return 0
+            counts, self._counts, self._events = self._counts, {}, 0
+            records, self._records = self._records, []
+
+            rows: Dict[int, Dict[str, int]] = {}
+            for (tg_id, field), count in counts.items():
+                rows.setdefault(tg_id, dict.fromkeys(COUNTER_FIELDS, 0))[field] = count
+
+            try:
+                await self._write(rows, records)
+            except Exception as e:
+                logger.error(f"Statistikani yozishda xatolik: {e}")
+                # Keyingi flush da qayta urinish uchun buferga qaytariladi
+                room = self.max_keys - len(self._records)
+                kept = records[-room:] if room > 0 else []
+                self._records[:0] = kept
+                self.stats["dropped"] += len(records) - len(kept)
+                for key, count in counts.items():
+                    if key in self._counts or len(self._counts) < self.max_keys:
+                        self._counts[key] = self._counts.get(key, 0) + count
+                return 0
+
+            self.stats["flushes"] += 1
+            self.stats["rows"] += len(rows)
+            return len(rows)
+
+    @staticmethod
+    async def _write(
+        rows: Dict[int, Dict[str, int]], records: List[UsageRecord]
+    ) -> None:
+        async with get_general_session() as session:
+            if rows:
+                await session.execute(StatisticsBuffer._upsert_statement(rows))
+            await write_usage(session, records)
+            await session.commit()
+
+    @staticmethod
+    def _upsert_statement(rows: Dict[int, Dict[str, int]]):
+        data = values(
+            column("tg_id", BigInteger),
+            *(column(field, BigInteger) for field in COUNTER_FIELDS),
+            name="delta",
+        ).data(
+            [
+                (tg_id, *(fields[f] for f in COUNTER_FIELDS))
+                for tg_id, fields in rows.items()
+            ]
+        )
+        # users bilan join - bazada yo'q foydalanuvchilar FK xatosiga olib kelmaydi
+        source = select(data).join(User, User.tg_id == data.c.tg_id)
+        stmt = insert(Statistics).from_select(["tg_id", *COUNTER_FIELDS], source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Statistics.tg_id],
+            set_={
+                field: getattr(Statistics, field) + getattr(stmt.excluded, field)
+                for field in COUNTER_FIELDS
+            },
+        )
+        return stmt
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """To'xtash oldidan buferdagi barcha hodisalarni yozib qo'yadi"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+statistics_buffer = StatisticsBuffer()
+
+
+async def update_statistics(tg_id: int, field: str) -> None:
     """
     Fields:
-    - user_id: ID of the user
     - from_text: Count of text messages sent by the user
     - from_voice: Count of voice messages sent by the user
     - from_youtube: Count of YouTube links shared by the user
     - from_tiktok: Count of TikTok links shared by the user
-    - from_like: Count of likes given by the user
+    - from_like: Count of Likee links shared by the user
     - from_snapchat: Count of Snapchat links shared by the user
     - from_instagram: Count of Instagram links shared by the user
     - from_twitter: Count of Twitter links shared by the user
     - from_video: Count of videos shared by the user
-    """
-    statistics = await get_statistics_by_tg_id(tg_id)
-    if not statistics:
-        statistics = await create_statistics(tg_id)
-    statistics.add_one(field)
-    async with get_general_session() as session:
-        session.add(statistics)
-        await session.commit()
-        return statistics
-
 
-async def get_all_statistics() -> dict[str, int]:
-    async with get_general_session() as session:
-        query = select(
-            func.coalesce(func.sum(Statistics.from_text), 0).label("from_text"),
-            func.coalesce(func.sum(Statistics.from_voice), 0).label("from_voice"),
-            func.coalesce(func.sum(Statistics.from_youtube), 0).label("from_youtube"),
-            func.coalesce(func.sum(Statistics.from_tiktok), 0).label("from_tiktok"),
-            func.coalesce(func.sum(Statistics.from_like), 0).label("from_like"),
-            func.coalesce(func.sum(Statistics.from_snapchat), 0).label("from_snapchat"),
-            func.coalesce(func.sum(Statistics.from_instagram), 0).label(
-                "from_instagram"
-            ),
-            func.coalesce(func.sum(Statistics.from_twitter), 0).label("from_twitter"),
-        )
+    Hisoblagich darhol bazaga yozilmaydi - bufer orqali guruhlab yoziladi.
+    """
+    statistics_buffer.add(tg_id, field)
 
-        result = await session.execute(query)
-        row = result.one_or_none()
-
-        return {
-            "from_text": row.from_text,
-            "from_voice": row.from_voice,
-            "from_youtube": row.from_youtube,
-            "from_tiktok": row.from_tiktok,
-            "from_like": row.from_like,
-            "from_snapchat": row.from_snapchat,
-            "from_instagram": row.from_instagram,
-            "from_twitter": row.from_twitter,
-        }
@@ -8,7 +8,9 @@ from pathlib import Path
 import re
 from typing import List, Optional
 
+from app.core.constants.media import TELEGRAM_MAX_FILE_SIZE
 from app.core.utils.audio import extract_audio_from_video
+from app.core.utils.executor import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -131,7 +133,7 @@ class ThreadHandler:
                     continue
 
                 size = path.stat().st_size
-                if size > 50 * 1024 * 1024:
+                if size > TELEGRAM_MAX_FILE_SIZE:
                     await message.reply(
                         _("threads_video_too_large").format(
                             name=video["filename"],
@@ -170,4 +172,4 @@ class ThreadHandler:
         return None
 
     async def extract_audio(self, video_path: str) -> Optional[str]:
-        return extract_audio_from_video(video_path)
+        return await run_blocking("audio", extract_audio_from_video, video_path)
@@ -6,6 +6,7 @@ import moviepy
 
 from app.bot.controller.tiktok_controller import TikTokDownloader
 from app.core.extensions.utils import WORKDIR
+from app.core.utils.executor import run_blocking
 
 
 def validate_tiktok_url(url: str) -> str:
@@ -21,14 +22,29 @@ def validate_tiktok_url(url: str) -> str:
     return base_url
 
 
+def _download_tiktok_sync(url: str, download_path: str, filename: str) -> str | None:
+    with TikTokDownloader(headless=True) as downloader:
+        return downloader.download_video(url, download_path, filename)
+
+
+def _write_audio_sync(video_path: str, audio_path: str) -> None:
+    video = moviepy.VideoFileClip(video_path)
+    audio = video.audio
+    audio.write_audiofile(audio_path, logger=None)
+
+    audio.close()
+    video.close()
+
+
 async def get_tiktok_video(url: str) -> str:
     download_path = WORKDIR.parent / "media" / "tiktok"
     filename = str(uuid4())
-    with TikTokDownloader(headless=True) as downloader:
-        video_path = downloader.download_video(url, str(download_path), filename)
-        if not video_path:
-            raise Exception("❌ TikTok video could not be downloaded (returned None)")
-        return video_path
+    video_path = await run_blocking(
+        "tiktok", _download_tiktok_sync, url, str(download_path), filename
+    )
+    if not video_path:
+        raise Exception("❌ TikTok video could not be downloaded (returned None)")
+    return video_path
 
 
 async def extract_audio_from_tiktok_video_smart(url: str) -> str:
@@ -44,12 +60,7 @@ async def extract_audio_from_tiktok_video_smart(url: str) -> str:
     os.makedirs(os.path.dirname(audio_path), exist_ok=True)
 
     try:
-        video = moviepy.VideoFileClip(video_path)
-        audio = video.audio
-        audio.write_audiofile(audio_path, logger=None)
-
-        audio.close()
-        video.close()
+        await run_blocking("audio", _write_audio_sync, video_path, audio_path)
         os.remove(video_path)
 
         return audio_path
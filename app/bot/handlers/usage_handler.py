@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import re
+from collections import Counter
+from datetime import date, datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bot.models import UsageDaily, UsageEvent, UsageHourly
+from app.core.databases.postgres import get_general_session
+from app.core.settings.config import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+# (tg_id, platform, vaqt)
+UsageRecord = Tuple[int, str, datetime]
+
+PARTITION_RE = re.compile(r"^usage_events_(\d{4})_(\d{2})$")
+DEFAULT_PARTITION = "usage_events_default"
+MAINTENANCE_INTERVAL = 6 * 60 * 60
+
+
+def platform_from_field(field: str) -> str:
+    return field.removeprefix("from_")
+
+
+def _month_start(year: int, month: int) -> date:
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return date(year, month, 1)
+
+
+def _upsert_rollup(model, key: str, counts: Counter):
+    stmt = insert(model).values(
+        [
+            {key: bucket, "platform": platform, "count": count}
+            for (bucket, platform), count in counts.items()
+        ]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[key, "platform"],
+        set_={"count": model.count + stmt.excluded.count},
+    )
+
+
+async def write_usage(session: AsyncSession, records: Iterable[UsageRecord]) -> None:
+    """
+    Hodisalarni usage_events ga yozadi va soatlik/kunlik rollup larni shu
+    tranzaksiyada oshiradi. Commit chaqiruvchi tomonidan qilinadi.
+    """
+    records = list(records)
+    if not records:
+        return
+
+    hourly: Counter = Counter()
+    daily: Counter = Counter()
+    for _, platform, created_at in records:
+        hourly[(created_at.replace(minute=0, second=0, microsecond=0), platform)] += 1
+        daily[(created_at.date(), platform)] += 1
+
+    await session.execute(
+        insert(UsageEvent),
+        [
+            {"tg_id": tg_id, "platform": platform, "created_at": created_at}
+            for tg_id, platform, created_at in records
+        ],
+    )
+    await session.execute(_upsert_rollup(UsageHourly, "bucket", hourly))
+    await session.execute(_upsert_rollup(UsageDaily, "day", daily))
+
+
+async def _create_partition(start: date) -> None:
+    """Bitta oy partition i, o'z tranzaksiyasida"""
+    name = f"usage_events_{start:%Y_%m}"
+    end = _month_start(start.year, start.month + 1)
+    bounds = {"start": start, "end": end}
+    in_range = "created_at >= :start AND created_at < :end"
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF usage_events "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+    async with get_general_session() as session:
+        exists = await session.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+        )
+        if exists.scalar():
+            return
+
+        stray = await session.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"),
+            bounds,
+        )
+        if not stray.scalar():
+            await session.execute(create)
+        else:
+            # Default da shu oy qatorlari bo'lsa PostgreSQL partition yaratmaydi:
+            # default ajratiladi, qatorlar yangi partition ga ko'chiriladi
+            logger.warning(
+                f"{DEFAULT_PARTITION} dagi qatorlar {name} ga ko'chirilmoqda"
+            )
+            await session.execute(
+                text(f"ALTER TABLE usage_events DETACH PARTITION {DEFAULT_PARTITION}")
+            )
+            await session.execute(create)
+            await session.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    f"WHERE {in_range} RETURNING *) "
+                    f"INSERT INTO usage_events SELECT * FROM moved"
+                ),
+                bounds,
+            )
+            await session.execute(
+                text(
+                    f"ALTER TABLE usage_events "
+                    f"ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+                )
+            )
+        await session.commit()
+        logger.info(f"usage partition yaratildi: {name}")
+
+
+async def _drop_old_partitions(cutoff: date) -> None:
+    async with get_general_session() as session:
+        result = await session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = 'usage_events'"
+            )
+        )
+        names = list(result.scalars())
+
+    for name in names:
+        match = PARTITION_RE.match(name)
+        if not match or date(int(match[1]), int(match[2]), 1) >= cutoff:
+            continue
+        async with get_general_session() as session:
+            await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            await session.commit()
+        logger.info(f"Eski usage partition o'chirildi: {name}")
+
+
+async def maintain_usage_partitions(
+    months_ahead: int = 2,
+    retention_months: int = settings.USAGE_EVENTS_RETENTION_MONTHS,
+) -> None:
+    """
+    Joriy va keyingi oylar uchun partition yaratadi, saqlash muddati o'tganlarini
+    o'chiradi. Rollup jadvallar o'chirilmaydi. Har bir partition alohida
+    tranzaksiyada - bittasidagi xato qolganlarini to'xtatmaydi.
+    """
+    today = date.today()
+    for offset in range(months_ahead + 1):
+        start = _month_start(today.year, today.month + offset)
+        try:
+            await _create_partition(start)
+        except Exception as e:
+            logger.error(f"usage_events_{start:%Y_%m} partition yaratilmadi: {e}")
+
+    await _drop_old_partitions(
+        _month_start(today.year, today.month - retention_months)
+    )
+
+
+_maintenance_task: Optional[asyncio.Task] = None
+
+
+async def _maintenance_loop() -> None:
+    while True:
+        try:
+            await maintain_usage_partitions()
+        except Exception as e:
+            logger.error(f"usage_events partition larini yangilashda xatolik: {e}")
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+
+def start_usage_maintenance() -> None:
+    global _maintenance_task
+    if _maintenance_task is None or _maintenance_task.done():
+        _maintenance_task = asyncio.create_task(_maintenance_loop())
+
+
+def stop_usage_maintenance() -> None:
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+
@@ -1,28 +1,62 @@
 from aiogram.types import Message
+from cachetools import TTLCache
 from datetime import datetime, timedelta
 
 from app.bot.models import User, AdminRequirements
 from app.core.databases.postgres import get_general_session
+from app.core.settings.config import get_settings, Settings
+from sqlalchemy import and_, case, or_, update
 from sqlalchemy.future import select
 
+settings: Settings = get_settings()
+
+# tg_id -> User. Keshdagi obyektlar faqat o'qish uchun: yozuvchi funksiyalar
+# qatorni o'z sessiyasida qayta o'qiydi va commit dan keyin keshni tozalaydi
+_user_cache: TTLCache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL
+)
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+async def _select_user(session, tg_id: int) -> User | None:
+    # User da PK (id, tg_id) - session.get(User, tg_id) ishlamaydi
+    result = await session.execute(select(User).where(User.tg_id == tg_id))
+    return result.scalar_one_or_none()
+
 
 async def get_user_by_tg_id(tg_id: int) -> User | None:
+    user = _user_cache.get(tg_id)
+    if user is not None:
+        _cache_stats["hits"] += 1
+        return user
+
+    _cache_stats["misses"] += 1
     async with get_general_session() as session:
-        user = await session.execute(select(User).where(User.tg_id == tg_id))
-        return user.scalar_one_or_none()
+        user = await _select_user(session, tg_id)
+    if user is not None:
+        _user_cache[tg_id] = user
+    return user
+
+
+def invalidate_user(tg_id: int) -> None:
+    _user_cache.pop(tg_id, None)
+
+
+def get_user_cache_stats() -> dict:
+    return {**_cache_stats, "size": len(_user_cache)}
 
 
 async def update_user_by_tg_id(tg_id, data: dict) -> User:
     async with get_general_session() as session:
-        user = await get_user_by_tg_id(tg_id)
+        user = await _select_user(session, tg_id)
         if not user:
             user = User(tg_id=tg_id, **data)
             session.add(user)
         else:
             user.update(**data)
-            session.add(user)
         await session.commit()
-        return user
+    invalidate_user(tg_id)
+    return user
 
 
 async def update_user_by_message(message: Message) -> User:
@@ -33,6 +67,8 @@ async def update_user_by_message(message: Message) -> User:
         "is_tg_premium": (
             message.from_user.is_premium if message.from_user.is_premium else False
         ),
+        # Qayta /start bosgan foydalanuvchi botni blokdan chiqargan
+        "is_blocked": False,
     }
     return await update_user_by_tg_id(message.from_user.id, data)
 
@@ -41,8 +77,7 @@ async def create_user(message: Message, ref_id: int | None = None) -> User:
     async with get_general_session() as session:
         existing_user = await get_user_by_tg_id(message.from_user.id)
         if existing_user:
-            await update_user_by_message(message)
-            return existing_user
+            return await update_user_by_message(message)
         user = User(
             tg_id=message.from_user.id,
             first_name=message.from_user.first_name,
@@ -55,7 +90,8 @@ async def create_user(message: Message, ref_id: int | None = None) -> User:
         )
         session.add(user)
         await session.commit()
-        return user
+    invalidate_user(user.tg_id)
+    return user
 
 
 async def get_referral_count(tg_id: int) -> int:
@@ -65,20 +101,24 @@ async def get_referral_count(tg_id: int) -> int:
 
 
 async def add_user_balance(tg_id: int, amount: float) -> User:
+    query = (
+        update(User)
+        .where(User.tg_id == tg_id)
+        .values(balance=User.balance + amount)
+        .returning(User)
+    )
     async with get_general_session() as session:
-        user = await get_user_by_tg_id(tg_id)
-        user.balance += amount
-        session.add(user)
+        user = (await session.execute(query)).scalar_one()
         await session.commit()
-        return user
+    invalidate_user(tg_id)
+    return user
 
 
 async def get_user_balance(tg_id: int) -> float:
-    async with get_general_session() as session:
-        user = await get_user_by_tg_id(tg_id)
-        if user:
-            return user.balance
-        return 0.0
+    user = await get_user_by_tg_id(tg_id)
+    if user:
+        return user.balance
+    return 0.0
 
 
 async def remove_user_balance(tg_id: int, amount: float) -> User:
@@ -100,55 +140,83 @@ async def remove_user_balance(tg_id: int, amount: float) -> User:
     Returns:
         User: The updated user object reflecting the new balance.
     """
+    # Tekshirish va ayirish bitta UPDATE da - parallel so'rovlar balansni
+    # manfiyga tushira olmaydi
+    query = (
+        update(User)
+        .where(User.tg_id == tg_id, User.balance >= amount)
+        .values(balance=User.balance - amount)
+        .returning(User)
+    )
     async with get_general_session() as session:
-        user = await get_user_by_tg_id(tg_id)
-        if user.balance >= amount:
-            user.balance -= amount
-            session.add(user)
-            await session.commit()
-            return user
-        else:
-            raise ValueError("Insufficient balance")
+        user = (await session.execute(query)).scalar_one_or_none()
+        await session.commit()
+    if user is None:
+        raise ValueError("Insufficient balance")
+    invalidate_user(tg_id)
+    return user
 
 
-async def remove_token(message: Message) -> bool:
+async def consume_quota(tg_id: int) -> bool:
+    """
+    Bitta so'rov uchun ruxsat: premium bo'lsa token ayirilmaydi, aks holda
+    tokens > 0 bo'lsa bittaga kamayadi. Bitta atomik UPDATE ... RETURNING.
+    """
+    is_premium = and_(
+        User.subscription_expiry.is_not(None),
+        User.subscription_expiry > datetime.now(),
+    )
+    query = (
+        update(User)
+        .where(User.tg_id == tg_id, or_(User.tokens > 0, is_premium))
+        .values(tokens=case((is_premium, User.tokens), else_=User.tokens - 1))
+        .returning(User.tokens)
+    )
     async with get_general_session() as session:
+        consumed = (await session.execute(query)).first() is not None
+        await session.commit()
+    if consumed:
+        invalidate_user(tg_id)
+    return consumed
+
+
+async def remove_token(message: Message, user: User | None = None) -> bool:
+    # Middleware yuklagan db_user berilsa qayta qidirilmaydi
+    if user is None:
         user = await get_user_by_tg_id(message.from_user.id)
-        if user.subscription_expiry and user.subscription_expiry > datetime.now():
-            return True
-        if user.tokens > 0:
-            user.tokens -= 1
-            session.add(user)
-            await session.commit()
-            return True
-        return False
+    if user and user.is_premium():
+        return True
+    return await consume_quota(message.from_user.id)
 
 
 async def add_tokens(user_id: int):
-    user = await get_user_by_tg_id(user_id)
-
     async with get_general_session() as session:
         res = await session.execute(select(AdminRequirements))
         token_obj = res.scalar_one_or_none()
         token = token_obj.referral_count_for_free_month if token_obj else 10
-        if user:
-            user.tokens += token
-            session.add(user)
-            await session.commit()
-            return user
-        return None
+        query = (
+            update(User)
+            .where(User.tg_id == user_id)
+            .values(tokens=User.tokens + token)
+            .returning(User)
+        )
+        user = (await session.execute(query)).scalar_one_or_none()
+        await session.commit()
+    if user:
+        invalidate_user(user_id)
+    return user
 
 
 async def update_user_premium_time(tg_id):
     async with get_general_session() as session:
-        user = await get_user_by_tg_id(tg_id)
+        user = await _select_user(session, tg_id)
         if user:
             user.subscription_expiry = (
                 datetime.now()
                 + timedelta(days=31)
                 + timedelta(hours=23, minutes=59, seconds=59)
             )
-            session.add(user)
             await session.commit()
+            invalidate_user(tg_id)
             return user
         return None
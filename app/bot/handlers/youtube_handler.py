@@ -1,32 +1,37 @@
 from __future__ import annotations
 import asyncio
-import concurrent.futures
 import logging
 import os
 import time
 from pathlib import Path
-from typing import Optional
-import yt_dlp
+from typing import Dict, Iterable, Optional, Set
 
-from app.bot.extensions.get_random_cookie import (
-    get_random_cookie_for_youtube,
-    get_all_youtube_cookies,
+from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.youtube_handler_pytube import (
+    download_audio_by_id_with_pytube,
+    download_audio_with_pytube,
 )
-from app.bot.handlers.youtube_handler_pytube import download_audio_with_pytube
 from app.core.extensions.enums import CookieType
 from app.core.extensions.utils import WORKDIR
+from app.core.settings.config import get_settings, Settings
+from app.core.utils.cookie_pool import (
+    OUTCOME_CONTENT,
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    classify_error,
+    get_cookie_pool,
+)
+from app.core.utils.executor import run_blocking, get_executor
+from app.core.utils.single_flight import get_single_flight
+from app.core.utils.ydl_pool import pooled_ydl
 
 logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
 
-# Optimized paths and thread pool
+# Optimized paths
 MUSIC_DIR = WORKDIR.parent / "media" / "music"
 MUSIC_DIR.mkdir(parents=True, exist_ok=True)
 
-# Much larger thread pool for parallel downloads
-_pool = concurrent.futures.ThreadPoolExecutor(
-    max_workers=min(16, (os.cpu_count() or 1) * 4), thread_name_prefix="yt-dl"
-)
-
 # Improved format selection with proper fallbacks
 AUDIO_OPTS_SMART = {
     # More robust format selection with better fallbacks
@@ -38,11 +43,11 @@ AUDIO_OPTS_SMART = {
     "quiet": True,
     "no_warnings": True,
     "noplaylist": True,
-    "ignoreerrors": True,
+    # Xato matni cookie sog'lig'ini baholash uchun kerak
+    "ignoreerrors": False,
     "socket_timeout": 10,
     "retries": 3,
     "fragment_retries": 3,
-    "cookiefile": get_random_cookie_for_youtube(CookieType.YOUTUBE.value),
     # Add extractaudio for audio-only downloads
     "extractaudio": True,
     # Prefer free formats when available
@@ -59,22 +64,17 @@ VIDEO_OPTS = {
     "quiet": True,
     "no_warnings": True,
     "noplaylist": True,
-    "ignoreerrors": True,
+    "ignoreerrors": False,
     "socket_timeout": 15,
     "retries": 3,
     "fragment_retries": 3,
-    "cookiefile": get_random_cookie_for_youtube(CookieType.YOUTUBE.value),
     "merge_output_format": "mp4",  # Ensure consistent output format
 }
-print("Youtube video handler: ", VIDEO_OPTS["cookiefile"])
 
 
 def _get_smart_audio_opts(
     convert_to_mp3: bool = False, allow_large: bool = False
 ) -> dict:
-    AUDIO_OPTS_SMART["cookiefile"] = get_random_cookie_for_youtube(
-        CookieType.YOUTUBE.value
-    )
     opts = AUDIO_OPTS_SMART.copy()
 
     if allow_large:
@@ -105,20 +105,20 @@ def _get_smart_audio_opts(
 
 
 def _audio_sync(query: str) -> Optional[str]:
+    pool = get_cookie_pool(CookieType.YOUTUBE.value)
 
-    cookies = get_all_youtube_cookies(CookieType.YOUTUBE.value)
-
-    for cookie_file in cookies:
+    # Eng sog'lom cookie lar birinchi, hammasini ketma-ket sinab chiqilmaydi
+    for cookie_file in pool.candidates(limit=settings.COOKIE_MAX_ATTEMPTS):
         opts = _get_smart_audio_opts()
         opts["cookiefile"] = cookie_file
-        print("Trying cookie:", cookie_file)
+        started = time.monotonic()
 
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
+            with pooled_ydl("youtube", "audio", opts) as ydl:
                 info = ydl.extract_info(f"ytsearch1:{query}", download=False)
                 if not info or not info.get("entries") or not info["entries"][0]:
                     logger.warning(f"No results for query: {query}")
-                    continue
+                    return None
 
                 entry = info["entries"][0]
                 ydl.download([entry["webpage_url"]])
@@ -127,28 +127,34 @@ def _audio_sync(query: str) -> Optional[str]:
                 for ext in [".m4a", ".mp3", ".webm", ".opus"]:
                     test_file = file_path.with_suffix(ext)
                     if test_file.exists() and test_file.stat().st_size > 1000:
+                        pool.report(cookie_file, OUTCOME_OK, time.monotonic() - started)
                         return str(test_file)
 
+            pool.report(cookie_file, OUTCOME_ERROR)
+
         except Exception as e:
-            logger.warning(f"Cookie {cookie_file} failed: {e}")
-            continue
+            outcome = classify_error(e)
+            pool.report(cookie_file, outcome)
+            logger.warning(f"Cookie {Path(cookie_file).name} failed ({outcome}): {e}")
+            if outcome == OUTCOME_CONTENT:
+                break
 
     logger.warning(f"No valid audio file found for: {query}")
     return None
 
 
 def _video_sync(video_id: str, title: str) -> Optional[str]:
-    cookies = get_all_youtube_cookies(CookieType.YOUTUBE.value)
+    pool = get_cookie_pool(CookieType.YOUTUBE.value)
 
     safe_title = "".join(c for c in title if c.isalnum() or c in " -_")[:40]
 
-    for cookie_file in cookies:
+    for cookie_file in pool.candidates(limit=settings.COOKIE_MAX_ATTEMPTS):
         opts = VIDEO_OPTS.copy()
         opts["cookiefile"] = cookie_file
-        print("Trying cookie:", cookie_file)
+        started = time.monotonic()
 
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
+            with pooled_ydl("youtube", "video", opts) as ydl:
                 url = f"https://youtube.com/watch?v={video_id}"
                 ydl.download([url])
 
@@ -162,15 +168,61 @@ def _video_sync(video_id: str, title: str) -> Optional[str]:
                     for ext in ("mp4", "webm", "mkv", "avi"):
                         for file_path in MUSIC_DIR.glob(f"{pattern}.{ext}"):
                             if file_path.exists() and file_path.stat().st_size > 1000:
+                                pool.report(
+                                    cookie_file, OUTCOME_OK, time.monotonic() - started
+                                )
                                 return str(file_path)
+
+            pool.report(cookie_file, OUTCOME_ERROR)
+
         except Exception as e:
-            logger.warning(f"Video download failed with {cookie_file}: {e}")
-            continue
+            outcome = classify_error(e)
+            pool.report(cookie_file, outcome)
+            logger.warning(
+                f"Video download failed with {Path(cookie_file).name} ({outcome}): {e}"
+            )
+            if outcome == OUTCOME_CONTENT:
+                break
 
     logger.error(f"All cookies failed for video: {video_id}")
     return None
 
 
+# Single-flight tufayli bir xil trekni so'raganlar bitta faylni oladi.
+# Fayl oxirgi foydalanuvchi release_file chaqirganda o'chiriladi
+_file_users: Dict[str, int] = {}
+
+
+def _acquire_file(path: Optional[str]) -> Optional[str]:
+    if path:
+        _file_users[path] = _file_users.get(path, 0) + 1
+    return path
+
+
+def _release_file(path: str) -> bool:
+    """Fayl endi hech kimga kerak bo'lmasa True"""
+    users = _file_users.pop(path, 0) - 1
+    if users > 0:
+        _file_users[path] = users
+        return False
+    return True
+
+
+async def release_file(path: str) -> None:
+    if _release_file(path):
+        await atomic_clear(path)
+
+
+def _drop_orphan(path: Optional[str]) -> None:
+    """Yuklangan, lekin hech kim olmagan fayl (timeout, tashlab ketilgan prefetch)"""
+    if not path or path in _file_users:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
 # Faster async wrappers with improved error handling
 async def download_music_from_youtube(title: str, artist: str) -> str | None:
     """Audio download using pytubefix."""
@@ -178,13 +230,20 @@ async def download_music_from_youtube(title: str, artist: str) -> str | None:
         return None
 
     query = f"{title} {artist}"
-    loop = asyncio.get_running_loop()
 
     try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(None, download_audio_with_pytube, query),
+        path = await asyncio.wait_for(
+            get_single_flight("yt-audio").do(
+                query.lower(),
+                run_blocking,
+                "youtube",
+                download_audio_with_pytube,
+                query,
+                on_orphan=_drop_orphan,
+            ),
             timeout=60,
         )
+        return _acquire_file(path)
     except asyncio.TimeoutError:
         logger.warning(f"Audio download timeout: {query}")
         return None
@@ -193,18 +252,185 @@ async def download_music_from_youtube(title: str, artist: str) -> str | None:
         return None
 
 
+class _Prefetched:
+    __slots__ = ("path", "size", "created_at")
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.created_at = time.monotonic()
+
+
+# video id -> oldindan yuklangan, hali tanlanmagan fayl
+_prefetched: Dict[str, _Prefetched] = {}
+_prefetch_inflight: Set[str] = set()
+# Prefetch tugashini kutib turgan tanlovlar - fayl ularga beriladi
+_prefetch_claimed: Set[str] = set()
+_prefetch_tasks: Set[asyncio.Task] = set()
+_prefetch_stats = {
+    "started": 0,
+    "skipped": 0,
+    "completed": 0,
+    "failed": 0,
+    "hits": 0,
+    "joined": 0,
+    "misses": 0,
+    "used_bytes": 0,
+    "wasted_bytes": 0,
+}
+
+
+def _expire_prefetched() -> None:
+    """Muddatida tanlanmagan fayllar o'chiriladi va 'wasted' ga yoziladi"""
+    now = time.monotonic()
+    for video_id, item in list(_prefetched.items()):
+        if now - item.created_at < settings.MUSIC_PREFETCH_TTL:
+            continue
+        del _prefetched[video_id]
+        _prefetch_stats["wasted_bytes"] += item.size
+        if not _release_file(item.path):
+            # Fayl boshqa yuklashga ham tegishli - o'sha foydalanuvchi o'chiradi
+            continue
+        try:
+            os.remove(item.path)
+        except OSError:
+            pass
+
+
+async def _prefetch_one(video_id: str) -> None:
+    try:
+        path = await get_single_flight("yt-audio-id").do(
+            video_id,
+            run_blocking,
+            "prefetch",
+            download_audio_by_id_with_pytube,
+            video_id,
+            settings.MUSIC_PREFETCH_MAX_FILE_SIZE,
+            on_orphan=_drop_orphan,
+        )
+    except Exception as e:
+        logger.warning(f"Prefetch failed for {video_id}: {e}")
+        path = None
+    finally:
+        _prefetch_inflight.discard(video_id)
+
+    claimed = video_id in _prefetch_claimed
+    _prefetch_claimed.discard(video_id)
+    if not path or not os.path.exists(path):
+        _prefetch_stats["failed"] += 1
+        return
+
+    _prefetch_stats["completed"] += 1
+    size = os.path.getsize(path)
+    if claimed:
+        _prefetch_stats["used_bytes"] += size
+    else:
+        _prefetched[video_id] = _Prefetched(_acquire_file(path), size)
+
+
+def prefetch_audio(video_ids: Iterable[str]) -> None:
+    """
+    Natijalar ro'yxatidagi birinchi MUSIC_PREFETCH_TOP ta audio fon rejimida
+    yuklanadi. Byudjet: bir vaqtda MAX_INFLIGHT ta, diskda MAX_BYTES gacha.
+    """
+    _expire_prefetched()
+    ready_bytes = sum(item.size for item in _prefetched.values())
+    for video_id in list(video_ids)[: settings.MUSIC_PREFETCH_TOP]:
+        if not video_id or video_id in _prefetched or video_id in _prefetch_inflight:
+            continue
+        if (
+            len(_prefetch_inflight) >= settings.MUSIC_PREFETCH_MAX_INFLIGHT
+            or ready_bytes >= settings.MUSIC_PREFETCH_MAX_BYTES
+        ):
+            _prefetch_stats["skipped"] += 1
+            continue
+
+        _prefetch_stats["started"] += 1
+        _prefetch_inflight.add(video_id)
+        task = asyncio.create_task(_prefetch_one(video_id))
+        _prefetch_tasks.add(task)
+        task.add_done_callback(_prefetch_tasks.discard)
+
+
+async def download_audio_by_id(video_id: str) -> Optional[str]:
+    """Tanlangan natijani qayta qidirmasdan, video id bo'yicha yuklash"""
+    item = _prefetched.pop(video_id, None)
+    if item is not None:
+        if os.path.exists(item.path):
+            _prefetch_stats["hits"] += 1
+            _prefetch_stats["used_bytes"] += item.size
+            # Prefetch ushlab turgan fayl shu so'rovga o'tadi
+            return item.path
+        _release_file(item.path)
+
+    joined = video_id in _prefetch_inflight
+    if joined:
+        _prefetch_stats["joined"] += 1
+        _prefetch_claimed.add(video_id)
+    else:
+        _prefetch_stats["misses"] += 1
+
+    def download():
+        return get_single_flight("yt-audio-id").do(
+            video_id,
+            run_blocking,
+            "youtube",
+            download_audio_by_id_with_pytube,
+            video_id,
+            on_orphan=_drop_orphan,
+        )
+
+    path = None
+    try:
+        path = await asyncio.wait_for(download(), timeout=60)
+        if path is None and joined:
+            # Prefetch hajm chegarasi tufayli yuklamagan bo'lishi mumkin
+            path = await asyncio.wait_for(download(), timeout=60)
+        return _acquire_file(path)
+    except asyncio.TimeoutError:
+        logger.warning(f"Audio download timeout: {video_id}")
+        return None
+    except Exception as e:
+        logger.error(f"Audio download error: {e}")
+        return None
+    finally:
+        if not path:
+            # Fayl bu so'rovga yetib kelmadi - prefetch uni o'zida saqlab qoladi
+            _prefetch_claimed.discard(video_id)
+
+
+def get_prefetch_stats() -> Dict[str, float]:
+    selections = (
+        _prefetch_stats["hits"] + _prefetch_stats["joined"] + _prefetch_stats["misses"]
+    )
+    served = _prefetch_stats["hits"] + _prefetch_stats["joined"]
+    return {
+        **_prefetch_stats,
+        "inflight": len(_prefetch_inflight),
+        "ready": len(_prefetched),
+        "hit_rate": round(served / selections, 3) if selections else 0.0,
+    }
+
+
 async def download_video_from_youtube(video_id: str, title: str) -> Optional[str]:
     """Fast video download with improved error handling and fallbacks."""
     if not video_id or not title:
         return None
 
-    loop = asyncio.get_running_loop()
-
     try:
-        return await asyncio.wait_for(
-            loop.run_in_executor(_pool, _video_sync, video_id, title),
+        path = await asyncio.wait_for(
+            get_single_flight("yt-video").do(
+                video_id,
+                run_blocking,
+                "youtube",
+                _video_sync,
+                video_id,
+                title,
+                on_orphan=_drop_orphan,
+            ),
             timeout=90,  # Increased timeout for video downloads
         )
+        return _acquire_file(path)
     except asyncio.TimeoutError:
         logger.warning(f"Video timeout: {video_id}")
         return None
@@ -261,4 +487,4 @@ async def cleanup_old_files(max_age: int = 1800) -> None:
 
 async def shutdown_downloader() -> None:
     """Graceful shutdown."""
-    _pool.shutdown(wait=False)
+    get_executor("youtube").shutdown(wait=False)
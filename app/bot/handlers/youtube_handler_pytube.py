@@ -1,4 +1,4 @@
-from pytubefix import Search
+from pytubefix import Search, YouTube
 from pathlib import Path
 import os
 import logging
@@ -15,6 +15,36 @@ def sanitize_filename(name: str) -> str:
     return "".join(c for c in name if c.isalnum() or c in " -_").rstrip()
 
 
+def _download_best_audio(video, label: str, max_size: int | None = None) -> str | None:
+    stream = video.streams.filter(only_audio=True).order_by("abr").desc().first()
+
+    if not stream:
+        logger.warning(f"No audio stream found for: {label}")
+        return None
+
+    title = sanitize_filename(video.title)
+    file_name = f"{title[:50]}-{video.video_id}.mp4"
+    out_path = MUSIC_DIR / file_name
+
+    if out_path.exists() and out_path.stat().st_size > 1024:
+        logger.info(f"File already exists: {out_path.name}")
+        return str(out_path)
+
+    # Oldindan yuklashda (prefetch) katta fayllar o'tkazib yuboriladi
+    if max_size is not None and stream.filesize > max_size:
+        logger.info(f"Audio stream too large ({stream.filesize} bytes): {label}")
+        return None
+
+    stream.download(output_path=str(MUSIC_DIR), filename=out_path.name)
+
+    if out_path.exists() and out_path.stat().st_size > 1024:
+        logger.info(f"Downloaded audio: {out_path.name}")
+        return str(out_path)
+    else:
+        logger.warning(f"Downloaded file is too small or not found: {out_path.name}")
+        return None
+
+
 def download_audio_with_pytube(query: str) -> str | None:
     try:
         search = Search(query)
@@ -22,32 +52,21 @@ def download_audio_with_pytube(query: str) -> str | None:
             logger.warning(f"No results for query: {query}")
             return None
 
-        video = search.results[0]
-        stream = video.streams.filter(only_audio=True).order_by("abr").desc().first()
-
-        if not stream:
-            logger.warning(f"No audio stream found for query: {query}")
-            return None
+        return _download_best_audio(search.results[0], query)
 
-        title = sanitize_filename(video.title)
-        file_name = f"{title[:50]}-{video.video_id}.mp4"
-        out_path = MUSIC_DIR / file_name
-
-        if out_path.exists() and out_path.stat().st_size > 1024:
-            logger.info(f"File already exists: {out_path.name}")
-            return str(out_path)
+    except Exception as e:
+        logger.error(f"pytubefix download error for '{query}': {e}")
+        return None
 
-        stream.download(output_path=str(MUSIC_DIR), filename=out_path.name)
 
-        if out_path.exists() and out_path.stat().st_size > 1024:
-            logger.info(f"Downloaded audio: {out_path.name}")
-            return str(out_path)
-        else:
-            logger.warning(
-                f"Downloaded file is too small or not found: {out_path.name}"
-            )
-            return None
+def download_audio_by_id_with_pytube(
+    video_id: str, max_size: int | None = None
+) -> str | None:
+    """Qidiruvsiz - natijadagi video id bo'yicha to'g'ridan-to'g'ri yuklash"""
+    try:
+        video = YouTube(f"https://www.youtube.com/watch?v={video_id}")
+        return _download_best_audio(video, video_id, max_size)
 
     except Exception as e:
-        logger.error(f"pytubefix download error for '{query}': {e}")
+        logger.error(f"pytubefix download error for video '{video_id}': {e}")
         return None
@@ -6,8 +6,10 @@ def get_admin_panel_keyboard() -> ReplyKeyboardMarkup:
     buttons = [
         [
             KeyboardButton(text="📁 Users excel"),
-            KeyboardButton(text="📊 Statistics"),
+            KeyboardButton(text="📄 Users CSV"),
+            KeyboardButton(text="🗂 Users Parquet"),
         ],
+        [KeyboardButton(text="📊 Statistics")],
         [KeyboardButton(text="🔧 Settings"), KeyboardButton(text="📈 Channels")],
         [
             KeyboardButton(text="💲 Fill Balance"),
@@ -49,6 +51,10 @@ def settings_keyboard() -> ReplyKeyboardMarkup:
         ],
         [
             KeyboardButton(text="Send Message to All Users"),
+            KeyboardButton(text="📨 Copy Message to All Users"),
+        ],
+        [
+            KeyboardButton(text="📬 Broadcast status"),
             KeyboardButton(text="🔙 Back to Admin Panel"),
         ],
     ]
@@ -4,6 +4,9 @@ from app.bot.models.channels import Channel
 from app.bot.models.statistics import Statistics
 from app.bot.models.referral import Referral
 from app.bot.models.backup import Backup
+from app.bot.models.broadcast import Broadcast, BroadcastRecipient
+from app.bot.models.search_cache import SearchCacheEntry
+from app.bot.models.usage import UsageEvent, UsageHourly, UsageDaily
 
 __all__ = [
     "User",
@@ -12,4 +15,10 @@ __all__ = [
     "Statistics",
     "Referral",
     "Backup",
+    "Broadcast",
+    "BroadcastRecipient",
+    "SearchCacheEntry",
+    "UsageEvent",
+    "UsageHourly",
+    "UsageDaily",
 ]
@@ -1,16 +1,25 @@
 from sqlalchemy.sql.sqltypes import BigInteger
 
-from app.core.models import BaseModel
+from app.core.models import BaseModelWithData
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column
 
 
-class Backup(BaseModel):
+class Backup(BaseModelWithData):
     __tablename__ = "backup"
 
-    url: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    url: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
 
     message_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
 
+    platform: Mapped[str] = mapped_column(String(16), nullable=True)
+    file_id: Mapped[str] = mapped_column(String, nullable=False)
+    file_unique_id: Mapped[str] = mapped_column(String, nullable=False)
+    media_type: Mapped[str] = mapped_column(String(16), nullable=False)
+    file_size: Mapped[int] = mapped_column(BigInteger, nullable=True)
+
     def __repr__(self):
-        return f"Backup(url={self.url}, message_id={self.message_id})"
+        return (
+            f"Backup(url={self.url}, media_type={self.media_type}, "
+            f"file_id={self.file_id})"
+        )
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.models import BaseModel
+from app.core.models.base import Base
+
+# BroadcastRecipient.status qiymatlari
+RECIPIENT_SENT = 1
+RECIPIENT_BLOCKED = 2
+RECIPIENT_DEACTIVATED = 3
+RECIPIENT_FAILED = 4
+
+
+class Broadcast(BaseModel):
+    __tablename__ = "broadcasts"
+
+    admin_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    media_type: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    media_file_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    # copy_message rejimi: shu xabar nusxasi yuboriladi
+    source_chat_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    source_message_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # running / done / cancelled
+    status: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="running", index=True
+    )
+    # Keyset kursor: shu tg_id gacha bo'lganlarga yuborilgan
+    last_tg_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sent: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    blocked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    deactivated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    retries: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed + self.blocked + self.deactivated
+
+    def __repr__(self) -> str:
+        return f"<Broadcast id={self.id!r} status={self.status!r}>"
+
+
+class BroadcastRecipient(Base):
+    """Har bir qabul qiluvchi uchun natija - ixcham, surrogate id siz"""
+
+    __tablename__ = "broadcast_recipients"
+
+    broadcast_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("broadcasts.id", ondelete="CASCADE"), primary_key=True
+    )
+    tg_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    status: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    attempts: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=1)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.models import BaseModel
+
+
+class SearchCacheEntry(BaseModel):
+    """Qidiruv keshining restart dan keyin ham saqlanadigan qismi"""
+
+    __tablename__ = "search_cache"
+    __table_args__ = (UniqueConstraint("namespace", "key"),)
+
+    namespace: Mapped[str] = mapped_column(String(32), nullable=False)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    value: Mapped[list | dict] = mapped_column(JSONB, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
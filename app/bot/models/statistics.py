@@ -4,12 +4,14 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from app.bot.models.users import User
 from app.core.models import BaseModel
-from sqlalchemy import BigInteger, ForeignKey
+from sqlalchemy import BigInteger, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 
 class Statistics(BaseModel):
     __tablename__ = "statistics"
+    # Har bir foydalanuvchiga bitta qator - ON CONFLICT (tg_id) shunga tayanadi
+    __table_args__ = (Index("ux_statistics_tg_id", "tg_id", unique=True),)
 
     tg_id: Mapped[int] = mapped_column(
         BigInteger,
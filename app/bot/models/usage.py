@@ -0,0 +1,49 @@
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Index, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.models import BaseModel
+
+
+class UsageEvent(BaseModel):
+    """Har bir yuklash/so'rov hodisasi. Jadval oylar bo'yicha bo'lingan"""
+
+    __tablename__ = "usage_events"
+    __table_args__ = (
+        Index("ix_usage_events_created_at", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # Partition kaliti primary key tarkibida bo'lishi shart
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, primary_key=True, nullable=False
+    )
+    tg_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    platform: Mapped[str] = mapped_column(String(16), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<UsageEvent tg_id={self.tg_id!r} platform={self.platform!r}>"
+
+
+class UsageHourly(BaseModel):
+    """Platforma bo'yicha soatlik hodisalar soni"""
+
+    __tablename__ = "usage_hourly"
+    __table_args__ = (UniqueConstraint("bucket", "platform"),)
+
+    bucket: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    platform: Mapped[str] = mapped_column(String(16), nullable=False)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class UsageDaily(BaseModel):
+    """Platforma bo'yicha kunlik hodisalar soni"""
+
+    __tablename__ = "usage_daily"
+    __table_args__ = (UniqueConstraint("day", "platform"),)
+
+    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    platform: Mapped[str] = mapped_column(String(16), nullable=False)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -60,6 +60,10 @@ class User(BaseModelWithData):
     tokens: Mapped[int] = mapped_column(
         BigInteger, default=0, nullable=False, index=True
     )
+    # Botni bloklagan (xabar yuborib bo'lmaydigan) foydalanuvchi
+    is_blocked: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default="false", nullable=False, index=True
+    )
 
     @hybrid_property
     def full_name(self) -> str:
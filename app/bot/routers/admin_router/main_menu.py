@@ -1,27 +1,42 @@
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 
 from aiogram import Router, F
 from aiogram.types import Message, FSInputFile
 from aiogram.enums.chat_action import ChatAction
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.utils.i18n import gettext as _
 
-from app.bot.controller.admin_controller import export_users_to_excel
+from app.bot.controller.admin_controller import (
+    export_users,
+    get_platform_usage,
+)
+from app.bot.controller.http_extractor import get_tier_stats
 from app.bot.filters.admin_filter import AdminFilter
 from app.bot.handlers.admin import (
-    get_last_7_days_statistics,
+    get_dashboard_statistics,
     get_premium_price,
     get_token_per_referral,
 )
+from app.bot.handlers.backup_handler import get_backup_stats
 from app.bot.handlers.channel_handler import get_all_channels
-from app.bot.handlers.statistics_handler import get_all_statistics
+from app.bot.handlers.user_handlers import get_user_cache_stats
+from app.bot.handlers.youtube_handler import get_prefetch_stats
 from app.bot.keyboards.admin_keyboards import (
     get_admin_panel_keyboard,
     get_channel_crud_keyboard,
 )
 from app.bot.keyboards.general_buttons import main_menu_keyboard
 from app.bot.models import Channel
+from app.core.databases.postgres import get_pool_stats
+from app.core.utils.cookie_pool import get_cookie_pool_stats
+from app.core.utils.executor import get_executor_stats, get_loop_watchdog
+from app.core.utils.metrics import get_latency_summary
+from app.core.utils.search_cache import get_search_cache_stats
+from app.core.utils.single_flight import get_single_flight_stats
+from app.core.utils.ydl_pool import get_ydl_stats
 
 main_menu_router = Router()
 
@@ -35,13 +50,34 @@ async def handle_admin_panel(message: Message):
     )
 
 
-@main_menu_router.message(AdminFilter(), F.text == "📁 Users excel")
+EXPORT_BUTTONS = {
+    "📁 Users excel": ("xlsx", "Users_report.xlsx"),
+    "📄 Users CSV": ("csv", "Users_report.csv"),
+    "🗂 Users Parquet": ("parquet", "Users_report.parquet"),
+}
+EXPORT_PROGRESS_INTERVAL = 3
+
+
+@main_menu_router.message(AdminFilter(), F.text.in_(EXPORT_BUTTONS))
 async def handle_statistics(message: Message):
+    fmt, file_name = EXPORT_BUTTONS[message.text]
     await message.bot.send_chat_action(message.chat.id, ChatAction.UPLOAD_DOCUMENT)
-    file_path: str = await export_users_to_excel()
-    try:
-        file_name = "Users_report.xlsx"
+    status = await message.answer(_("export_progress").format(done=0, total="…"))
+    last_update = time.monotonic()
 
+    async def progress(done: int, total: int) -> None:
+        nonlocal last_update
+        if time.monotonic() - last_update < EXPORT_PROGRESS_INTERVAL:
+            return
+        last_update = time.monotonic()
+        try:
+            await status.edit_text(_("export_progress").format(done=done, total=total))
+        except TelegramBadRequest:
+            pass
+
+    file_path = None
+    try:
+        file_path = await export_users(fmt, progress=progress)
         doc = FSInputFile(path=file_path, filename=file_name)
         caption = _("user_export_caption").format(
             file_name=file_name,
@@ -55,16 +91,19 @@ async def handle_statistics(message: Message):
             _("export_failed_error").format(error=err), parse_mode="HTML"
         )
     finally:
-        if os.path.exists(file_path):
+        if file_path and os.path.exists(file_path):
             os.remove(file_path)
+        try:
+            await status.delete()
+        except TelegramBadRequest:
+            pass
 
 
 @main_menu_router.message(AdminFilter(), F.text == "📊 Statistics")
 async def handle_last_users(message: Message):
     await message.bot.send_chat_action(message.chat.id, ChatAction.TYPING)
-    stats = await get_last_7_days_statistics()
+    stats = await get_dashboard_statistics()
     channels: list[Channel] = await get_all_channels()
-    statistics = await get_all_statistics()
 
     lines = [
         _("user_growth_header"),
@@ -99,14 +138,125 @@ async def handle_last_users(message: Message):
         lines.append(_("no_channels_connected"))
 
     lines.append(_("usage_statistics_header"))
-    lines.append(_("usage_from_text").format(count=statistics["from_text"]))
-    lines.append(_("usage_from_voice").format(count=statistics["from_voice"]))
-    lines.append(_("usage_from_youtube").format(count=statistics["from_youtube"]))
-    lines.append(_("usage_from_tiktok").format(count=statistics["from_tiktok"]))
-    lines.append(_("usage_from_like").format(count=statistics["from_like"]))
-    lines.append(_("usage_from_snapchat").format(count=statistics["from_snapchat"]))
-    lines.append(_("usage_from_instagram").format(count=statistics["from_instagram"]))
-    lines.append(_("usage_from_twitter").format(count=statistics["from_twitter"]))
+    lines.append(_("usage_from_text").format(count=stats["from_text"]))
+    lines.append(_("usage_from_voice").format(count=stats["from_voice"]))
+    lines.append(_("usage_from_youtube").format(count=stats["from_youtube"]))
+    lines.append(_("usage_from_tiktok").format(count=stats["from_tiktok"]))
+    lines.append(_("usage_from_like").format(count=stats["from_like"]))
+    lines.append(_("usage_from_snapchat").format(count=stats["from_snapchat"]))
+    lines.append(_("usage_from_instagram").format(count=stats["from_instagram"]))
+    lines.append(_("usage_from_twitter").format(count=stats["from_twitter"]))
+
+    now = datetime.now()
+    for header, usage in (
+        ("usage_last_24h_header", await get_platform_usage(now - timedelta(hours=24))),
+        (
+            "usage_last_7d_header",
+            await get_platform_usage(now - timedelta(days=6), hourly=False),
+        ),
+    ):
+        lines.append(_(header))
+        for platform, count in usage:
+            lines.append(
+                _("usage_platform_item").format(platform=platform, count=count)
+            )
+        if not usage:
+            lines.append(_("usage_no_events"))
+
+    backup_stats = get_backup_stats()
+    lines.append(
+        _("usage_media_cache").format(
+            hits=backup_stats["hits"],
+            misses=backup_stats["misses"],
+            rate=round(backup_stats["hit_rate"] * 100, 1),
+        )
+    )
+    for name, cache_stats in sorted(get_search_cache_stats().items()):
+        lines.append(
+            _("usage_search_cache").format(
+                name=name,
+                hits=cache_stats["hits"],
+                misses=cache_stats["misses"],
+                rate=round(cache_stats["hit_rate"] * 100, 1),
+                entries=cache_stats["entries"],
+            )
+        )
+    lines.append(_("usage_user_cache").format(**get_user_cache_stats()))
+    lines.append(
+        _("usage_coalesced_downloads").format(
+            count=sum(s["coalesced"] for s in get_single_flight_stats().values())
+        )
+    )
+    pool_stats = get_pool_stats()
+    lines.append(
+        _("usage_db_pool").format(
+            checked_out=pool_stats["checked_out"],
+            size=pool_stats["size"],
+            overflow=max(pool_stats["overflow"], 0),
+            wait_p95=round(pool_stats["wait"]["p95"] * 1000, 1),
+            timeouts=pool_stats["timeouts"],
+        )
+    )
+    loop_stats = get_loop_watchdog().stats()
+    lines.append(
+        _("usage_event_loop").format(
+            max_lag_ms=round(loop_stats["max_lag"] * 1000),
+            blocked=loop_stats["blocked_count"],
+        )
+    )
+    for name, executor_stats in sorted(get_executor_stats().items()):
+        lines.append(_("usage_executor").format(name=name, **executor_stats))
+    ydl_stats = get_ydl_stats()
+    lines.append(
+        _("usage_ydl_pool").format(
+            reused=ydl_stats["reused"],
+            created=ydl_stats["created"],
+            setup_ms=round(ydl_stats["create_latency"]["p50"] * 1000, 1),
+        )
+    )
+    for platform, cookie_stats in get_cookie_pool_stats().items():
+        lines.append(
+            _("usage_cookie_pool").format(
+                platform=platform,
+                healthy=cookie_stats["total"] - cookie_stats["quarantined_now"],
+                total=cookie_stats["total"],
+                quarantined=cookie_stats["quarantined_now"],
+                rate_limited=cookie_stats["rate_limited"],
+            )
+        )
+    prefetch_stats = get_prefetch_stats()
+    lines.append(
+        _("usage_music_prefetch").format(
+            rate=round(prefetch_stats["hit_rate"] * 100, 1),
+            served=prefetch_stats["hits"] + prefetch_stats["joined"],
+            selections=prefetch_stats["hits"]
+            + prefetch_stats["joined"]
+            + prefetch_stats["misses"],
+            wasted_mb=round(prefetch_stats["wasted_bytes"] / 1024 / 1024, 1),
+            skipped=prefetch_stats["skipped"],
+        )
+    )
+    for platform, tiers in sorted(get_tier_stats().items()):
+        lines.append(
+            _("usage_scrape_tiers").format(
+                platform=platform,
+                http=tiers["http"],
+                browser=tiers["browser"],
+                miss=tiers["miss"],
+            )
+        )
+    latencies = get_latency_summary()
+    if latencies:
+        lines.append(_("usage_latency_header"))
+        for name, summary in sorted(latencies.items()):
+            lines.append(
+                _("usage_latency_item").format(
+                    name=name,
+                    p50=round(summary["p50"] * 1000),
+                    p95=round(summary["p95"] * 1000),
+                    count=summary["count"],
+                )
+            )
 
     await message.answer(
         "\n".join(lines), parse_mode="HTML", disable_web_page_preview=True
@@ -1,5 +1,3 @@
-import asyncio
-
 from aiogram import Router, F
 from aiogram.types import (
     Message,
@@ -15,9 +13,12 @@ from app.bot.filters.admin_filter import AdminFilter
 from app.bot.handlers.admin import (
     get_token_per_referral,
     update_token_per_referral,
-    run_broadcast,
     get_premium_price,
 )
+from app.bot.handlers.broadcast_handler import (
+    get_broadcast_summary,
+    launch_broadcast,
+)
 from app.bot.keyboards.admin_keyboards import (
     get_admin_panel_keyboard,
     settings_keyboard,
@@ -136,8 +137,8 @@ async def process_broadcast_text(message: Message, state: FSMContext):
 )
 async def skip_broadcast_media(message: Message, state: FSMContext):
     data = await state.get_data()
-    asyncio.create_task(
-        run_broadcast(text=data["text"], media=None, admin_id=message.chat.id)
+    await launch_broadcast(
+        message.bot, admin_id=message.chat.id, text=data["text"], media=None
     )
     await message.answer(
         _("broadcast_started"),
@@ -161,8 +162,8 @@ async def process_broadcast_media(message: Message, state: FSMContext):
         media = (ContentType.DOCUMENT, message.document.file_id)
 
     data = await state.get_data()
-    asyncio.create_task(
-        run_broadcast(text=data["text"], media=media, admin_id=message.chat.id)
+    await launch_broadcast(
+        message.bot, admin_id=message.chat.id, text=data["text"], media=media
     )
     await message.answer(
         _("broadcast_with_media_started"),
@@ -170,3 +171,43 @@ async def process_broadcast_media(message: Message, state: FSMContext):
         reply_markup=get_admin_panel_keyboard(),
     )
     await state.clear()
+
+
+@settings_router.message(AdminFilter(), F.text == "📨 Copy Message to All Users")
+async def start_copy_broadcast(message: Message, state: FSMContext):
+    await state.clear()
+    await message.answer(
+        _("broadcast_copy_prompt"),
+        parse_mode="HTML",
+        reply_markup=back_to_admin_kb(),
+    )
+    await state.set_state(BroadcastForm.waiting_for_source)
+
+
+@settings_router.message(AdminFilter(), BroadcastForm.waiting_for_source)
+async def process_copy_broadcast_source(message: Message, state: FSMContext):
+    # Xabar qanday bo'lsa shunday (matn, media, formatlash) nusxalanadi
+    broadcast = await launch_broadcast(
+        message.bot,
+        admin_id=message.chat.id,
+        source=(message.chat.id, message.message_id),
+    )
+    await message.answer(
+        _("broadcast_copy_started").format(id=broadcast.id, total=broadcast.total),
+        parse_mode="HTML",
+        reply_markup=get_admin_panel_keyboard(),
+    )
+    await state.clear()
+
+
+@settings_router.message(AdminFilter(), F.text == "📬 Broadcast status")
+async def show_broadcast_status(message: Message):
+    summary = await get_broadcast_summary()
+    if summary is None:
+        await message.answer(_("broadcast_status_empty"))
+        return
+    await message.answer(
+        _("broadcast_status").format(**summary),
+        parse_mode="HTML",
+        reply_markup=settings_keyboard(),
+    )
@@ -3,6 +3,12 @@ from aiogram.types import Message, FSInputFile, CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+)
+from app.bot.handlers.queue_handler import queued_download
 from app.bot.handlers.instagram_handler import (
     download_instagram_video_only_mp4,
     validate_instagram_url,
@@ -10,13 +16,14 @@ from app.bot.handlers.instagram_handler import (
 )
 from app.bot.handlers.statistics_handler import update_statistics
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.general_buttons import get_music_download_button
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
 from app.bot.routers.music_router import (
     format_page_text,
     create_keyboard,
     get_controller,
-    _cache,
+    store_results,
 )
 from app.core.settings.config import get_settings, Settings
 from app.bot.handlers import shazam_handler as shz
@@ -26,12 +33,12 @@ settings: Settings = get_settings()
 instagram_router = Router()
 user_sessions = {}  # Session storage
 
-import time
 
 
 @instagram_router.message(F.text.contains("instagram.com"))
-async def handle_instagram_link(message: Message):
-    res = await remove_token(message)
+@queued_download("instagram")
+async def handle_instagram_link(message: Message, db_user: User | None = None):
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
@@ -43,15 +50,26 @@ async def handle_instagram_link(message: Message):
     instagram_url = validate_instagram_url(message.text)
 
     user_sessions[user_id] = {"url": instagram_url}
-    video_path = await download_instagram_video_only_mp4(instagram_url)
-    user_sessions[user_id]["video_path"] = video_path
+    async with media_flight(instagram_url) as backup:
+        if backup and await answer_from_backup(
+            message,
+            backup,
+            caption=_("ig_video_ready"),
+            reply_markup=get_music_download_button("instagram"),
+        ):
+            await update_statistics(message.from_user.id, field="from_instagram")
+            return
 
-    await message.answer_video(
-        FSInputFile(video_path),
-        caption=_("ig_video_ready"),
-        reply_markup=get_music_download_button("instagram"),
-    )
-    await update_statistics(message.from_user.id, field="from_instagram")
+        video_path = await download_instagram_video_only_mp4(instagram_url)
+        user_sessions[user_id]["video_path"] = video_path
+
+        sent = await message.answer_video(
+            FSInputFile(video_path),
+            caption=_("ig_video_ready"),
+            reply_markup=get_music_download_button("instagram"),
+        )
+        await add_to_backup(instagram_url, sent, platform="instagram")
+        await update_statistics(message.from_user.id, field="from_instagram")
 
 
 @instagram_router.callback_query(F.data.startswith("instagram:"))
@@ -104,14 +122,11 @@ async def handle_instagram_callback(callback_query: CallbackQuery):
             parse_mode="HTML",
         )
 
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         await callback_query.message.answer(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
@@ -11,8 +11,8 @@ language_router = Router()
 
 
 @language_router.message(F.text == "/lang")
-async def ask_language(message: Message):
-    user: User = await get_user_by_tg_id(message.from_user.id)
+async def ask_language(message: Message, db_user: User | None = None):
+    user: User = db_user or await get_user_by_tg_id(message.from_user.id)
     current_lang = user.language_code
     kb = await language_keyboard(selected_lang=current_lang)
     await message.answer(_("lang_choose"), reply_markup=kb)
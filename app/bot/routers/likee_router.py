@@ -1,4 +1,3 @@
-import time
 from aiogram import Router, F
 from aiogram.types import Message, FSInputFile, CallbackQuery
 from aiogram.utils.i18n import gettext as _
@@ -10,14 +9,21 @@ from app.bot.handlers.likee_handler import (
 )
 from app.bot.handlers import shazam_handler as shz
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
 from app.bot.routers.music_router import (
     get_controller,
     format_page_text,
     create_keyboard,
-    _cache,
+    store_results,
 )
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+)
+from app.bot.handlers.queue_handler import queued_download
 from app.bot.handlers.statistics_handler import update_statistics
 from app.bot.keyboards.general_buttons import get_music_download_button
 from app.core.settings.config import get_settings, Settings
@@ -28,8 +34,9 @@ user_sessions = {}
 
 
 @likee_router.message(F.text.contains("likee.video"))
-async def handle_likee_link(message: Message):
-    res = await remove_token(message)
+@queued_download("likee")
+async def handle_likee_link(message: Message, db_user: User | None = None):
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
@@ -43,16 +50,27 @@ async def handle_likee_link(message: Message):
     user_sessions[user_id] = {"url": likee_url}
 
     try:
-        video_path = await get_likee_video(likee_url)
-        user_sessions[user_id]["video_path"] = video_path
-
-        await message.answer_video(
-            FSInputFile(video_path),
-            caption=_("likee_video_ready"),
-            reply_markup=get_music_download_button("likee"),
-        )
-
-        await atomic_clear(video_path)
+        async with media_flight(likee_url) as backup:
+            if backup and await answer_from_backup(
+                message,
+                backup,
+                caption=_("likee_video_ready"),
+                reply_markup=get_music_download_button("likee"),
+            ):
+                await update_statistics(user_id, field="from_likee")
+                return
+
+            video_path = await get_likee_video(likee_url)
+            user_sessions[user_id]["video_path"] = video_path
+
+            sent = await message.answer_video(
+                FSInputFile(video_path),
+                caption=_("likee_video_ready"),
+                reply_markup=get_music_download_button("likee"),
+            )
+            await add_to_backup(likee_url, sent, platform="likee")
+
+            await atomic_clear(video_path)
 
     except Exception as e:
         await message.answer(_("download_failed") + f": {e}")
@@ -107,14 +125,11 @@ async def handle_likee_callback(callback_query: CallbackQuery):
             _("music_found").format(title=title, artist=artist), parse_mode="HTML"
         )
 
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         await callback_query.message.answer(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
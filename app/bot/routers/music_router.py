@@ -1,10 +1,9 @@
 from __future__ import annotations
-import asyncio
+import hashlib
 import logging
 import os
-import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 from uuid import uuid4
 from aiogram.utils.i18n import gettext as _
 
@@ -18,26 +17,51 @@ from aiogram.types import (
 )
 
 from app.bot.controller.shazam_controller import ShazamController
-from app.bot.extensions.clear import atomic_clear
 from app.bot.handlers import shazam_handler as shz
 from app.bot.handlers.statistics_handler import update_statistics
+from app.bot.handlers.queue_handler import run_queued
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
+from app.core.utils.job_queue import get_download_queue
+from app.core.utils.search_cache import (
+    SearchCache,
+    get_search_cache_stats,
+    normalize_query,
+)
 
 logger = logging.getLogger(__name__)
 
 music_router = Router()
-PAGE, COOLDOWN = 10, 1
+PAGE = 10
 
 # Global state with better management
 _controller: Optional[ShazamController] = None
-_cache: Dict[int, Dict] = {}
-_download_queue: Dict[int, float] = {}
-_cleanup_task: Optional[asyncio.Task] = None
 
-# Cache cleanup settings - UPDATED FOR PERSISTENT CACHE
-CACHE_CLEANUP_INTERVAL = 86400 * 3  # 3 days (only cleanup download queue)
-CACHE_MAX_AGE = 86400 * 14  # 14 days if you want some expiration
+CACHE_MAX_QUERIES = 5_000
+CACHE_MAX_AGE = 86400 * 14  # 14 days
+# Qidiruv kaliti (qkey) -> natijalar. Bir xil qidiruv natijalari barcha
+# foydalanuvchilar uchun bir marta saqlanadi, keyboard lar qkey ga bog'langan
+_cache = SearchCache("music-results", max_entries=CACHE_MAX_QUERIES, ttl=CACHE_MAX_AGE)
+
+
+class MusicHit:
+    __slots__ = ("title", "artist", "duration", "video_id")
+
+    def __init__(self, title: str, artist: str, duration: int, video_id: str):
+        self.title = title
+        self.artist = artist
+        self.duration = duration
+        self.video_id = video_id
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MusicHit":
+        return cls(
+            str(data.get("title") or "Unknown"),
+            str(data.get("artist") or "Unknown"),
+            int(data.get("duration") or 0),
+            str(data.get("id") or ""),
+        )
 
 
 def get_controller() -> ShazamController:
@@ -45,31 +69,44 @@ def get_controller() -> ShazamController:
     global _controller
     if _controller is None:
         _controller = ShazamController()
-        # Start cleanup task when controller is first created
-        _start_cleanup_task()
     return _controller
 
 
-def _start_cleanup_task():
-    """Start cleanup task only when event loop is available."""
-    global _cleanup_task
-    try:
-        if _cleanup_task is None or _cleanup_task.done():
-            _cleanup_task = asyncio.create_task(cleanup_cache_loop())
-    except RuntimeError:
-        # Event loop not running yet, task will be started later
-        logger.debug("Event loop not running, cleanup task will start later")
+def _query_key(query: str, hits: Tuple[MusicHit, ...]) -> str:
+    """
+    Qisqa kalit: normallashtirilgan so'rov + natijalar tarkibi.
+    Natijalar o'zgarsa yangi kalit olinadi - eski keyboard lar eski ro'yxatni
+    ko'rsatishda davom etadi. 12 hex belgi callback_data (64 bayt) ga sig'adi.
+    """
+    digest = hashlib.blake2b(digest_size=6)
+    digest.update(normalize_query(query).encode())
+    for hit in hits:
+        digest.update(f"\0{hit.video_id}\0{hit.title}\0{hit.artist}".encode())
+    return digest.hexdigest()
+
+
+def store_results(query: str, hits: Iterable[Dict[str, Any]]) -> str:
+    """Natijalarni saqlab, callback larda ishlatiladigan qkey ni qaytaradi"""
+    records = tuple(MusicHit.from_dict(hit) for hit in hits)
+    qkey = _query_key(query, records)
+    if _cache.get(qkey) is None:
+        _cache.set(qkey, records)
+    return qkey
+
+
+def get_results(qkey: str) -> Optional[Tuple[MusicHit, ...]]:
+    return _cache.get(qkey)
 
 
 # ── helpers with improvements ─────────────────────────────────────────────────
 def create_keyboard(
-    user_id: int, page: int, add_video: bool = False
+    qkey: str, page: int, add_video: bool = False
 ) -> InlineKeyboardMarkup:
     """Create paginated keyboard with video option."""
-    if user_id not in _cache:
+    hits = get_results(qkey)
+    if hits is None:
         return InlineKeyboardMarkup(inline_keyboard=[])
 
-    hits = _cache[user_id]["hits"]
     start, end = page * PAGE, (page + 1) * PAGE
 
     # Create number buttons (5 per row)
@@ -79,7 +116,7 @@ def create_keyboard(
     for offset, index in enumerate(range(start, min(end, len(hits))), 1):
         current_row.append(
             InlineKeyboardButton(
-                text=str(index + 1), callback_data=f"music:sel:{index}"
+                text=str(index + 1), callback_data=f"music:sel:{qkey}:{index}"
             )
         )
         if offset % 5 == 0:
@@ -93,11 +130,15 @@ def create_keyboard(
     nav_row = []
     if page > 0:
         nav_row.append(
-            InlineKeyboardButton(text="⬅️", callback_data=f"music:page:{page - 1}")
+            InlineKeyboardButton(
+                text="⬅️", callback_data=f"music:page:{qkey}:{page - 1}"
+            )
         )
     if end < len(hits):
         nav_row.append(
-            InlineKeyboardButton(text="➡️", callback_data=f"music:page:{page + 1}")
+            InlineKeyboardButton(
+                text="➡️", callback_data=f"music:page:{qkey}:{page + 1}"
+            )
         )
 
     if nav_row:
@@ -105,13 +146,16 @@ def create_keyboard(
 
     # Video button for media recognition
     if add_video and hits:
-        rows.append([InlineKeyboardButton(text="🎬", callback_data="music:video:0")])
+        rows.append(
+            [InlineKeyboardButton(text="🎬", callback_data=f"music:video:{qkey}:0")]
+        )
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
-def format_page_text(hits: List[Dict], page: int) -> str:
+def format_page_text(qkey: str, page: int) -> str:
     """Format page text with better error handling."""
+    hits = get_results(qkey)
     if not hits:
         return _("No results found.")
 
@@ -120,9 +164,9 @@ def format_page_text(hits: List[Dict], page: int) -> str:
 
     for number, hit in enumerate(hits[start_idx:end_idx], start=start_idx + 1):
         try:
-            title = hit.get("title", _("Unknown"))[:50]
-            artist = hit.get("artist", _("Unknown"))[:30]
-            duration = hit.get("duration", 0)
+            title = hit.title[:50]
+            artist = hit.artist[:30]
+            duration = hit.duration
 
             # Format duration
             if duration and duration > 0:
@@ -140,24 +184,6 @@ def format_page_text(hits: List[Dict], page: int) -> str:
     return "\n".join(lines)
 
 
-def is_cache_valid(user_id: int) -> bool:
-    """Check if user cache is valid."""
-    if user_id not in _cache:
-        return False
-
-    if CACHE_MAX_AGE == float("inf"):
-        return True
-
-    cache_age = time.time() - _cache[user_id]["timestamp"]
-    return cache_age < CACHE_MAX_AGE
-
-
-def can_download(user_id: int) -> bool:
-    """Check if user can download (rate limiting)."""
-    last_download = _download_queue.get(user_id, 0)
-    return time.time() - last_download >= COOLDOWN
-
-
 async def download_telegram_file(message: Message) -> Optional[str]:
     """Download telegram media file with error handling."""
     try:
@@ -183,62 +209,17 @@ async def download_telegram_file(message: Message) -> Optional[str]:
     return None
 
 
-# ── cache cleanup task - UPDATED FOR PERSISTENT CACHE ────────────────────────
-async def cleanup_cache_loop():
-    """Periodic cleanup - only cleans download queue, keeps search cache forever."""
-    while True:
-        try:
-            await asyncio.sleep(CACHE_CLEANUP_INTERVAL)
-            current_time = time.time()
-
-            # Only clean expired cache entries if CACHE_MAX_AGE is not infinite
-            if CACHE_MAX_AGE != float("inf"):
-                expired_users = [
-                    user_id
-                    for user_id, data in _cache.items()
-                    if current_time - data["timestamp"] > CACHE_MAX_AGE
-                ]
-
-                for user_id in expired_users:
-                    del _cache[user_id]
-
-                if expired_users:
-                    logger.info(f"Cleaned expired cache: {len(expired_users)} users")
-
-            # Clean old download queue entries (keep rate limiting working)
-            expired_downloads = [
-                user_id
-                for user_id, timestamp in _download_queue.items()
-                if current_time - timestamp > COOLDOWN * 10
-            ]
-
-            for user_id in expired_downloads:
-                del _download_queue[user_id]
-
-            if expired_downloads:
-                logger.info(f"Cleaned download queue: {len(expired_downloads)} entries")
-
-        except asyncio.CancelledError:
-            logger.info("Cache cleanup task cancelled")
-            break
-        except Exception as e:
-            logger.error(f"Cache cleanup error: {e}")
-
-
 # ── message handlers ──────────────────────────────────────────────────────────
 @music_router.message(F.text)
-async def handle_text_query(message: Message):
+async def handle_text_query(message: Message, db_user: User | None = None):
     """Handle text search queries."""
-    # Ensure cleanup task is running
-    res = await remove_token(message)
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
         )
         return
 
-    _start_cleanup_task()
-
     query = message.text.strip() if message.text else ""
 
     if len(query) < 2:
@@ -260,14 +241,15 @@ async def handle_text_query(message: Message):
             )
             return
 
-        # Cache results with current timestamp
-        _cache[message.from_user.id] = {"hits": hits, "timestamp": time.time()}
+        qkey = store_results(query, hits)
 
         await status_message.edit_text(
-            format_page_text(hits, 0),
-            reply_markup=create_keyboard(message.from_user.id, 0),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0),
             parse_mode="HTML",
         )
+        # Foydalanuvchi tanlayotganda birinchi natijalar fonda yuklanadi
+        get_controller().prefetch(hit.video_id for hit in get_results(qkey) or ())
 
     except Exception as e:
         logger.error(f"Text search error: {e}")
@@ -278,9 +260,6 @@ async def handle_text_query(message: Message):
 @music_router.message(F.voice | F.audio | F.video | F.video_note)
 async def handle_media_query(message: Message):
     """Handle media recognition queries."""
-    # Ensure cleanup task is running
-    _start_cleanup_task()
-
     status_message = await message.answer(_("🔍 Analyzing audio..."))
 
     try:
@@ -319,14 +298,11 @@ async def handle_media_query(message: Message):
                     )
                 ]
 
-            _cache[message.from_user.id] = {
-                "hits": youtube_hits,
-                "timestamp": time.time(),
-            }
+            qkey = store_results(search_query, youtube_hits)
 
             await status_message.edit_text(
-                format_page_text(youtube_hits, 0),
-                reply_markup=create_keyboard(message.from_user.id, 0, add_video=True),
+                format_page_text(qkey, 0),
+                reply_markup=create_keyboard(qkey, 0, add_video=True),
                 parse_mode="HTML",
             )
 
@@ -346,7 +322,9 @@ async def handle_media_query(message: Message):
 
 # ── callback handlers ─────────────────────────────────────────────────────────
 @music_router.callback_query(F.data.startswith("music:"))
-async def handle_callbacks(callback: CallbackQuery):
+async def handle_callbacks(
+    callback: CallbackQuery, db_user: User | None = None
+):
     """Handle callback queries with better error handling."""
     await callback.answer()
 
@@ -355,54 +333,62 @@ async def handle_callbacks(callback: CallbackQuery):
         action = parts[0]
         user_id = callback.from_user.id
 
+        # Eski formatdagi (qkey siz) tugmalar natijasi endi topilmaydi
+        hits = get_results(parts[1]) if len(parts) == 3 else None
+
         if action == "page":
-            page = int(parts[1])
-            if not is_cache_valid(user_id):
+            if hits is None:
                 await callback.message.answer(
                     _("⏰ Search results expired. Please search again.")
                 )
                 return
 
+            qkey, page = parts[1], int(parts[2])
             await callback.message.edit_text(
-                format_page_text(_cache[user_id]["hits"], page),
-                reply_markup=create_keyboard(user_id, page, add_video=True),
+                format_page_text(qkey, page),
+                reply_markup=create_keyboard(qkey, page, add_video=True),
                 parse_mode="HTML",
             )
 
         elif action == "video":
-            index = int(parts[1])
-            if not is_cache_valid(user_id) or index >= len(_cache[user_id]["hits"]):
+            index = int(parts[-1])
+            if hits is None or index >= len(hits):
                 await callback.message.answer(
                     _("⏰ Results expired or invalid selection.")
                 )
                 return
 
-            hit = _cache[user_id]["hits"][index]
-            status_message = await callback.message.answer(_("⏳ Downloading video..."))
-
-            await download_and_send_video(callback.message, status_message, hit)
+            hit = hits[index]
+            await run_queued(
+                callback.message,
+                user_id,
+                "music",
+                _download_and_send_video,
+                callback.message,
+                hit,
+                user=db_user,
+            )
             await update_statistics(callback.from_user.id, field="from_youtube")
 
         elif action == "sel":
-            index = int(parts[1])
+            index = int(parts[-1])
 
-            if not is_cache_valid(user_id) or index >= len(_cache[user_id]["hits"]):
+            if hits is None or index >= len(hits):
                 await callback.message.answer(
                     _("⏰ Results expired or invalid selection.")
                 )
                 return
 
-            if not can_download(user_id):
-                await callback.message.answer(
-                    _("⏳ Please wait a moment before next download.")
-                )
-                return
-
-            _download_queue[user_id] = time.time()
-            hit = _cache[user_id]["hits"][index]
-            status_message = await callback.message.answer(_("⏳ Downloading audio..."))
-
-            await download_and_send_audio(callback.message, status_message, hit)
+            hit = hits[index]
+            await run_queued(
+                callback.message,
+                user_id,
+                "music",
+                _download_and_send_audio,
+                callback.message,
+                hit,
+                user=db_user,
+            )
 
     except (ValueError, IndexError) as e:
         logger.error(f"Callback parsing error: {e}")
@@ -413,11 +399,24 @@ async def handle_callbacks(callback: CallbackQuery):
 
 
 # ── download workers ──────────────────────────────────────────────────────────
-async def download_and_send_audio(destination: Message, status: Message, info: Dict):
+async def _download_and_send_audio(destination: Message, info: MusicHit):
+    status = await destination.answer(_("⏳ Downloading audio..."))
+    await download_and_send_audio(destination, status, info)
+
+
+async def _download_and_send_video(destination: Message, info: MusicHit):
+    status = await destination.answer(_("⏳ Downloading video..."))
+    await download_and_send_video(destination, status, info)
+
+
+async def download_and_send_audio(
+    destination: Message, status: Message, info: MusicHit
+):
     """Download and send audio with comprehensive error handling."""
+    file_path = None
     try:
         file_path = await get_controller().download_full_track(
-            info["title"], info["artist"]
+            info.title, info.artist, info.video_id
         )
 
         if file_path and os.path.exists(file_path):
@@ -429,13 +428,12 @@ async def download_and_send_audio(destination: Message, status: Message, info: D
 
             await destination.answer_audio(
                 FSInputFile(file_path),
-                title=info["title"][:100],  # Telegram limits
-                performer=info["artist"][:100],
-                caption=f"🎵 <b>{info['title'][:100]}</b>\n👤 {info['artist'][:100]}",
+                title=info.title[:100],  # Telegram limits
+                performer=info.artist[:100],
+                caption=f"🎵 <b>{info.title[:100]}</b>\n👤 {info.artist[:100]}",
                 parse_mode="HTML",
             )
 
-            await atomic_clear(file_path)
             await status.delete()
 
         else:
@@ -448,17 +446,23 @@ async def download_and_send_audio(destination: Message, status: Message, info: D
         await status.edit_text(
             _("❌ Download error: {error}").format(error=str(e)[:100])
         )
+    finally:
+        if file_path:
+            # Bir xil fayl bir nechta so'rovga berilgan bo'lishi mumkin
+            await get_controller().release_file(file_path)
 
 
-async def download_and_send_video(destination: Message, status: Message, info: Dict):
+async def download_and_send_video(
+    destination: Message, status: Message, info: MusicHit
+):
     """Download and send video with comprehensive error handling."""
+    file_path = None
     try:
-        video_id = info.get("id")
-        if not video_id:
+        if not info.video_id:
             await status.edit_text(_("❌ Video ID not available."))
             return
 
-        file_path = await get_controller().download_video(video_id, info["title"])
+        file_path = await get_controller().download_video(info.video_id, info.title)
 
         if file_path and os.path.exists(file_path):
             # Verify file
@@ -469,12 +473,11 @@ async def download_and_send_video(destination: Message, status: Message, info: D
 
             await destination.answer_video(
                 FSInputFile(file_path),
-                caption=f"🎬 <b>{info['title'][:100]}</b>",
+                caption=f"🎬 <b>{info.title[:100]}</b>",
                 parse_mode="HTML",
                 supports_streaming=True,
             )
 
-            await atomic_clear(file_path)
             await status.delete()
 
         else:
@@ -487,35 +490,22 @@ async def download_and_send_video(destination: Message, status: Message, info: D
         await status.edit_text(
             _("❌ Video download error: {error}").format(error=str(e)[:100])
         )
+    finally:
+        if file_path:
+            # Bir xil fayl bir nechta so'rovga berilgan bo'lishi mumkin
+            await get_controller().release_file(file_path)
 
 
 # ── Additional utility functions for cache management ────────────────────────
-def clear_user_cache(user_id: int) -> bool:
-    """Manually clear cache for a specific user."""
-    if user_id in _cache:
-        del _cache[user_id]
-        logger.info(f"Cleared cache for user {user_id}")
-        return True
-    return False
+def clear_results_cache() -> None:
+    """Manually clear stored search results."""
+    _cache.clear()
+    logger.info("Cleared music results cache")
 
 
 def get_cache_stats() -> Dict:
     """Get cache statistics for monitoring."""
-    current_time = time.time()
-    cache_stats = {
-        "total_users": len(_cache),
-        "total_download_queue": len(_download_queue),
-        "cache_ages": [],
+    return {
+        "search_caches": get_search_cache_stats(),
+        "download_queue": get_download_queue().get_stats(),
     }
-
-    for user_id, data in _cache.items():
-        age_seconds = current_time - data["timestamp"]
-        cache_stats["cache_ages"].append(
-            {
-                "user_id": user_id,
-                "age_hours": age_seconds / 3600,
-                "hits_count": len(data.get("hits", [])),
-            }
-        )
-
-    return cache_stats
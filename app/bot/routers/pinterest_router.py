@@ -1,22 +1,30 @@
-import time
 from aiogram import Router, F
 from aiogram.types import Message, FSInputFile, CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+    resolve_session_video,
+)
+from app.bot.handlers.queue_handler import queued_download
 from app.bot.handlers.statistics_handler import update_statistics
 from app.bot.handlers.pinterest_handler import download_pinterest_media
 from app.bot.handlers import shazam_handler as shz
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
 from app.bot.routers.music_router import (
     get_controller,
     format_page_text,
     create_keyboard,
-    _cache,
+    store_results,
 )
 from app.bot.keyboards.general_buttons import get_music_download_button
 from app.core.settings.config import get_settings, Settings
+from app.core.utils.executor import run_blocking
 from pathlib import Path
 import logging
 import moviepy
@@ -42,8 +50,9 @@ def extract_audio_from_video(video_path: str) -> str | None:
 @pinterest_router.message(
     F.text.regexp(r"(https?://)?(www\.)?(pin\.it|pinterest\.com)/[^\s]+")
 )
-async def handle_pinterest_link(message: Message):
-    res = await remove_token(message)
+@queued_download("pinterest")
+async def handle_pinterest_link(message: Message, db_user: User | None = None):
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
@@ -56,27 +65,41 @@ async def handle_pinterest_link(message: Message):
     user_sessions[user_id] = {"url": url}
 
     try:
-        result = await download_pinterest_media(url)
-        if not result:
-            await message.answer(_("pinterest_download_failed"))
-            return
-
-        file_path, media_type = result
-        user_sessions[user_id]["video_path"] = file_path
-
-        if media_type == "video":
-            await message.answer_video(
-                FSInputFile(file_path),
-                caption=_("pinterest_video_ready"),
-                reply_markup=get_music_download_button("pinterest"),
-                supports_streaming=True,
-            )
-        elif media_type == "image":
-            await message.answer_photo(FSInputFile(file_path))
-        else:
-            await message.answer_document(FSInputFile(file_path))
+        async with media_flight(url) as backup:
+            if backup:
+                kwargs = {}
+                if backup.media_type == "video":
+                    kwargs = {
+                        "caption": _("pinterest_video_ready"),
+                        "reply_markup": get_music_download_button("pinterest"),
+                    }
+                if await answer_from_backup(message, backup, **kwargs):
+                    user_sessions[user_id]["file_id"] = backup.file_id
+                    await update_statistics(user_id, field="from_pinterest")
+                    return
+
+            result = await download_pinterest_media(url)
+            if not result:
+                await message.answer(_("pinterest_download_failed"))
+                return
+
+            file_path, media_type = result
+            user_sessions[user_id]["video_path"] = file_path
+
+            if media_type == "video":
+                sent = await message.answer_video(
+                    FSInputFile(file_path),
+                    caption=_("pinterest_video_ready"),
+                    reply_markup=get_music_download_button("pinterest"),
+                    supports_streaming=True,
+                )
+            elif media_type == "image":
+                sent = await message.answer_photo(FSInputFile(file_path))
+            else:
+                sent = await message.answer_document(FSInputFile(file_path))
+            await add_to_backup(url, sent, platform="pinterest")
 
-        await update_statistics(user_id, field="from_pinterest")
+            await update_statistics(user_id, field="from_pinterest")
 
     except Exception as e:
         logger.error(f"Pinterest error: {e}")
@@ -95,12 +118,13 @@ async def handle_pinterest_callback(callback_query: CallbackQuery):
     await callback_query.answer(_("extracting"))
 
     session = user_sessions.get(user_id)
-    if not session or not session.get("video_path"):
+    video_path = await resolve_session_video(callback_query.bot, session)
+    if not video_path:
         await callback_query.message.answer(_("session_expired"))
         return
 
     try:
-        audio_path = extract_audio_from_video(session["video_path"])
+        audio_path = await run_blocking("audio", extract_audio_from_video, video_path)
         if not audio_path or not Path(audio_path).exists():
             await callback_query.message.answer(_("extract_failed"))
             return
@@ -131,14 +155,11 @@ async def handle_pinterest_callback(callback_query: CallbackQuery):
             _("music_found").format(title=title, artist=artist), parse_mode="HTML"
         )
 
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         await callback_query.message.answer(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
@@ -1,4 +1,3 @@
-import time
 import re
 import logging
 from pathlib import Path
@@ -8,19 +7,29 @@ from aiogram.types import Message, FSInputFile, CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
 from app.core.utils.audio import extract_audio_from_video
+from app.core.utils.executor import run_blocking
+from app.bot.controller.group_controller import PlatformType
 from app.bot.controller.shorts_controller import YouTubeShortsController
 from app.bot.handlers import shazam_handler as shz
 from app.bot.routers.music_router import (
     get_controller,
     format_page_text,
     create_keyboard,
-    _cache,
+    store_results,
 )
 from app.bot.keyboards.general_buttons import get_music_download_button
 from app.bot.handlers.statistics_handler import update_statistics
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+    resolve_session_video,
+)
+from app.bot.handlers.queue_handler import queued_download
 from app.bot.state.session_store import user_sessions  # <-- moved user_sessions here
 
 shorts_router = Router()
@@ -43,8 +52,9 @@ def extract_shorts_url(text: str) -> str:
 @shorts_router.message(
     F.text.contains("youtube.com/shorts") | F.text.contains("youtu.be")
 )
-async def handle_shorts_link(message: Message):
-    res = await remove_token(message)
+@queued_download(PlatformType.YOUTUBE_SHORTS.queue_lane)
+async def handle_shorts_link(message: Message, db_user: User | None = None):
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
@@ -60,26 +70,40 @@ async def handle_shorts_link(message: Message):
     user_id = message.from_user.id
     user_sessions[user_id] = {"url": url}
 
-    controller = YouTubeShortsController(Path.cwd().parent / "media" / "youtube_shorts")
-    try:
-        video_path = await controller.download_video(url)
-        if not video_path:
-            await message.answer(_("shorts_no_files"))
-            return
-
-        user_sessions[user_id]["video_path"] = video_path
-
-        await message.answer_video(
-            FSInputFile(video_path),
+    async with media_flight(url) as backup:
+        if backup and await answer_from_backup(
+            message,
+            backup,
             caption=_("shorts_video_ready"),
             reply_markup=get_music_download_button("shorts"),
+        ):
+            user_sessions[user_id]["file_id"] = backup.file_id
+            await update_statistics(user_id, field="from_shorts")
+            return
+
+        controller = YouTubeShortsController(
+            Path.cwd().parent / "media" / "youtube_shorts"
         )
+        try:
+            video_path = await controller.download_video(url)
+            if not video_path:
+                await message.answer(_("shorts_no_files"))
+                return
 
-        await update_statistics(user_id, field="from_shorts")
+            user_sessions[user_id]["video_path"] = video_path
 
-    except Exception as e:
-        logger.exception("Shorts download error")
-        await message.answer(_("shorts_error") + f"\n{e}")
+            sent = await message.answer_video(
+                FSInputFile(video_path),
+                caption=_("shorts_video_ready"),
+                reply_markup=get_music_download_button("shorts"),
+            )
+            await add_to_backup(url, sent, platform="shorts")
+
+            await update_statistics(user_id, field="from_shorts")
+
+        except Exception as e:
+            logger.exception("Shorts download error")
+            await message.answer(_("shorts_error") + f"\n{e}")
 
 
 @shorts_router.callback_query(F.data == "shorts:download_music")
@@ -89,13 +113,13 @@ async def handle_shorts_music(callback_query: CallbackQuery):
     user_id = callback_query.from_user.id
     session = user_sessions.get(user_id)
 
-    if not session or not session.get("video_path"):
+    video_path = await resolve_session_video(callback_query.bot, session)
+    if not video_path:
         await callback_query.message.answer(_("session_expired"))
         return
 
     try:
-        video_path = session["video_path"]
-        audio_path = extract_audio_from_video(video_path)
+        audio_path = await run_blocking("audio", extract_audio_from_video, video_path)
 
         if not audio_path:
             await callback_query.message.answer(_("extract_failed"))
@@ -127,14 +151,11 @@ async def handle_shorts_music(callback_query: CallbackQuery):
             _("music_found").format(title=title, artist=artist), parse_mode="HTML"
         )
 
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         await callback_query.message.answer(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
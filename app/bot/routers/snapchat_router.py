@@ -1,4 +1,3 @@
-import time
 from aiogram import Router, F
 from aiogram.types import Message, FSInputFile, CallbackQuery
 from pathlib import Path
@@ -8,19 +7,28 @@ from aiogram.utils.i18n import gettext as _
 
 from app.bot.handlers.snapchat_handler import download_snapchat_media
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+    resolve_session_video,
+)
+from app.bot.handlers.queue_handler import queued_download
 from app.bot.handlers.statistics_handler import update_statistics
 from app.bot.handlers import shazam_handler as shz
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
 from app.bot.routers.music_router import (
     get_controller,
     format_page_text,
     create_keyboard,
-    _cache,
+    store_results,
 )
 from app.bot.keyboards.general_buttons import get_music_download_button
 from app.core.settings.config import get_settings, Settings
 from app.core.utils.audio import extract_audio_from_video
+from app.core.utils.executor import run_blocking
 
 settings: Settings = get_settings()
 snapchat_router = Router()
@@ -29,8 +37,9 @@ user_sessions = {}
 
 
 @snapchat_router.message(F.text.contains("snapchat.com"))
-async def handle_snapchat_link(message: Message):
-    res = await remove_token(message)
+@queued_download("snapchat")
+async def handle_snapchat_link(message: Message, db_user: User | None = None):
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
@@ -44,21 +53,33 @@ async def handle_snapchat_link(message: Message):
     user_sessions[user_id] = {"url": url}
 
     try:
-        file_path = await download_snapchat_media(url)
-        if not file_path or not Path(file_path).exists():
-            await message.answer(_("snapchat_download_failed"))
-            return
-
-        user_sessions[user_id]["video_path"] = file_path
-
-        await message.answer_video(
-            FSInputFile(file_path),
-            caption=_("snapchat_video_ready"),
-            reply_markup=get_music_download_button("snapchat"),
-            supports_streaming=True,
-        )
-
-        await update_statistics(user_id, field="from_snapchat")
+        async with media_flight(url) as backup:
+            if backup and await answer_from_backup(
+                message,
+                backup,
+                caption=_("snapchat_video_ready"),
+                reply_markup=get_music_download_button("snapchat"),
+            ):
+                user_sessions[user_id]["file_id"] = backup.file_id
+                await update_statistics(user_id, field="from_snapchat")
+                return
+
+            file_path = await download_snapchat_media(url)
+            if not file_path or not Path(file_path).exists():
+                await message.answer(_("snapchat_download_failed"))
+                return
+
+            user_sessions[user_id]["video_path"] = file_path
+
+            sent = await message.answer_video(
+                FSInputFile(file_path),
+                caption=_("snapchat_video_ready"),
+                reply_markup=get_music_download_button("snapchat"),
+                supports_streaming=True,
+            )
+            await add_to_backup(url, sent, platform="snapchat")
+
+            await update_statistics(user_id, field="from_snapchat")
 
     except Exception as e:
         logger.error(f"Snapchat download error: {e}")
@@ -77,12 +98,13 @@ async def handle_snapchat_callback(callback_query: CallbackQuery):
     await callback_query.answer(_("extracting"))
 
     session = user_sessions.get(user_id)
-    if not session or not session.get("video_path"):
+    video_path = await resolve_session_video(callback_query.bot, session)
+    if not video_path:
         await callback_query.message.answer(_("session_expired"))
         return
 
     try:
-        audio_path = extract_audio_from_video(session["video_path"])
+        audio_path = await run_blocking("audio", extract_audio_from_video, video_path)
         if not audio_path or not Path(audio_path).exists():
             await callback_query.message.answer(_("extract_failed"))
             return
@@ -113,14 +135,11 @@ async def handle_snapchat_callback(callback_query: CallbackQuery):
             _("music_found").format(title=title, artist=artist), parse_mode="HTML"
         )
 
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         await callback_query.message.answer(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
@@ -12,13 +12,17 @@ from app.bot.handlers.user_handlers import (
 from app.bot.keyboards.general_buttons import main_menu_keyboard
 from app.bot.keyboards.language_keyboard import language_keyboard
 from app.bot.models import User
+from app.core.databases.postgres import session_scope
 
 start_router = Router()
 
 
-async def start_function(message: Message, ref_id=None):
+async def _register_user(message: Message, ref_id=None) -> User:
     await create_user(message, ref_id)
-    user: User = await get_user_by_tg_id(message.from_user.id)
+    return await get_user_by_tg_id(message.from_user.id)
+
+
+async def _answer_start(message: Message, user: User):
     if user.language_code is None:
         kb = await language_keyboard(selected_lang=None)
         await message.answer(_("start_welcome"), reply_markup=kb)
@@ -26,24 +30,29 @@ async def start_function(message: Message, ref_id=None):
         await message.answer(_("start"), reply_markup=main_menu_keyboard(message))
 
 
+async def start_function(message: Message, ref_id=None):
+    # Ichki yordamchilar bitta ulanishdan foydalanadi; javob yuborilayotganda
+    # ulanish pool ga qaytarilgan bo'ladi
+    async with session_scope():
+        user = await _register_user(message, ref_id)
+    await _answer_start(message, user)
+
+
 @start_router.message(CommandStart(deep_link=True))
 async def handle_start_deep_link(message: Message, command: CommandStart):
-    user = await get_user_by_tg_id(message.from_user.id)
     referrer_id = command.args if command.args and command.args.isdigit() else None
-    if user is None:
-        if referrer_id:
+    async with session_scope():
+        existing = await get_user_by_tg_id(message.from_user.id)
+        if existing is None and referrer_id:
             inviter = await get_user_by_tg_id(int(referrer_id))
-            if inviter is None:
-                referrer_id = None
-            else:
-                referrer_id = inviter.tg_id
-            await start_function(message, int(referrer_id))
-            await add_tokens(referrer_id)
+            referrer_id = inviter.tg_id if inviter is not None else None
         else:
-            await start_function(message)
-    else:
-        await start_function(message)
-    await create_statistics(message.from_user.id)
+            referrer_id = None
+        user = await _register_user(message, referrer_id)
+        if referrer_id:
+            await add_tokens(referrer_id)
+        await create_statistics(message.from_user.id)
+    await _answer_start(message, user)
 
 
 @start_router.message(CommandStart())
@@ -1,4 +1,3 @@
-import time
 import re
 import logging
 from pathlib import Path
@@ -8,19 +7,28 @@ from aiogram.types import Message, FSInputFile, CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
 from app.core.utils.audio import extract_audio_from_video
+from app.core.utils.executor import run_blocking
 from app.bot.controller.threads_controller import ThreadsController
 from app.bot.handlers import shazam_handler as shz
 from app.bot.routers.music_router import (
     get_controller,
     format_page_text,
     create_keyboard,
-    _cache,
+    store_results,
 )
 from app.bot.keyboards.general_buttons import get_music_download_button
 from app.bot.handlers.statistics_handler import update_statistics
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+    resolve_session_video,
+)
+from app.bot.handlers.queue_handler import queued_download
 
 threads_router = Router()
 logger = logging.getLogger(__name__)
@@ -42,8 +50,9 @@ def extract_threads_url(text: str) -> str:
 
 
 @threads_router.message(F.text.contains("threads.com"))
-async def handle_threads_link(message: Message):
-    res = await remove_token(message)
+@queued_download("threads")
+async def handle_threads_link(message: Message, db_user: User | None = None):
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
@@ -59,42 +68,53 @@ async def handle_threads_link(message: Message):
     user_id = message.from_user.id
     user_sessions[user_id] = {"url": url}
 
-    controller = ThreadsController(Path.cwd().parent / "media" / "threads")
-    try:
-        result = await controller.download_media(url)
-        if not result["success"]:
-            await message.answer(result["message"])
+    async with media_flight(url) as backup:
+        if backup and await answer_from_backup(
+            message,
+            backup,
+            caption=_("threads_video_ready"),
+            reply_markup=get_music_download_button("threads"),
+        ):
+            user_sessions[user_id]["file_id"] = backup.file_id
+            await update_statistics(user_id, field="from_threads")
             return
 
-        files = result["downloaded_files"]
-        if not files:
-            await message.answer(_("threads_no_files"))
-            return
+        controller = ThreadsController(Path.cwd().parent / "media" / "threads")
+        try:
+            result = await controller.download_media(url)
+            if not result["success"]:
+                await message.answer(result["message"])
+                return
 
-        video_file = next((f for f in files if f["type"] == "video"), None)
-        if not video_file:
-            await message.answer(_("threads_no_files"))
-            return
+            files = result["downloaded_files"]
+            if not files:
+                await message.answer(_("threads_no_files"))
+                return
 
-        video_path = Path(video_file["path"])
-        if not video_path.exists():
-            await message.answer(_("threads_no_files"))
-            return
+            video_file = next((f for f in files if f["type"] == "video"), None)
+            if not video_file:
+                await message.answer(_("threads_no_files"))
+                return
 
-        user_sessions[user_id]["video_path"] = str(video_path)
+            video_path = Path(video_file["path"])
+            if not video_path.exists():
+                await message.answer(_("threads_no_files"))
+                return
 
-        await message.answer_video(
-            FSInputFile(video_path),
-            caption=_("threads_video_ready"),
-            reply_markup=get_music_download_button("threads"),
-        )
+            user_sessions[user_id]["video_path"] = str(video_path)
 
-    except Exception as e:
-        logger.exception("Threads download error")
-        await message.answer(_("threads_error") + f"\n{e}")
-    finally:
-        controller.close()
-        await update_statistics(user_id, field="from_threads")
+            sent = await message.answer_video(
+                FSInputFile(video_path),
+                caption=_("threads_video_ready"),
+                reply_markup=get_music_download_button("threads"),
+            )
+            await add_to_backup(url, sent, platform="threads")
+
+        except Exception as e:
+            logger.exception("Threads download error")
+            await message.answer(_("threads_error") + f"\n{e}")
+        finally:
+            await update_statistics(user_id, field="from_threads")
 
 
 @threads_router.callback_query(F.data == "threads:download_music")
@@ -103,15 +123,13 @@ async def handle_threads_callback(callback_query: CallbackQuery):
 
     user_id = callback_query.from_user.id
     session = user_sessions.get(user_id)
-    if not session or not session.get("video_path"):
+    video_path = await resolve_session_video(callback_query.bot, session)
+    if not video_path:
         await callback_query.message.answer(_("session_expired"))
         return
 
     try:
-        video_path = session["video_path"]
-        audio_path = extract_audio_from_video(
-            video_path
-        )  # Use same smart extract method
+        audio_path = await run_blocking("audio", extract_audio_from_video, video_path)
 
         if not audio_path:
             await callback_query.message.answer(_("extract_failed"))
@@ -143,14 +161,11 @@ async def handle_threads_callback(callback_query: CallbackQuery):
             _("music_found").format(title=title, artist=artist), parse_mode="HTML"
         )
 
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         await callback_query.message.answer(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
@@ -1,10 +1,15 @@
-import time
 
 from aiogram import Router, F
 from aiogram.types import Message, FSInputFile, CallbackQuery
 from aiogram.utils.i18n import gettext as _
 
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+)
+from app.bot.handlers.queue_handler import queued_download
 from app.bot.handlers.statistics_handler import update_statistics
 from app.bot.handlers.tiktok_handler import (
     get_tiktok_video,
@@ -13,12 +18,13 @@ from app.bot.handlers.tiktok_handler import (
 )
 from app.bot.handlers import shazam_handler as shz
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
 from app.bot.routers.music_router import (
     get_controller,
     format_page_text,
     create_keyboard,
-    _cache,
+    store_results,
 )
 from app.bot.keyboards.general_buttons import get_music_download_button
 from app.core.settings.config import get_settings, Settings
@@ -29,8 +35,9 @@ user_sessions = {}
 
 
 @tiktok_router.message(F.text.contains("tiktok.com"))
-async def handle_tiktok_link(message: Message):
-    res = await remove_token(message)
+@queued_download("tiktok")
+async def handle_tiktok_link(message: Message, db_user: User | None = None):
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
@@ -43,16 +50,27 @@ async def handle_tiktok_link(message: Message):
     tiktok_url = validate_tiktok_url(message.text)
     user_sessions[user_id] = {"url": tiktok_url}
     try:
-        video_path = await get_tiktok_video(tiktok_url)
-        user_sessions[user_id]["video_path"] = video_path
-
-        await message.answer_video(
-            FSInputFile(video_path),
-            caption=_("tiktok_video_ready"),
-            reply_markup=get_music_download_button("tiktok"),
-        )
-
-        await atomic_clear(video_path)
+        async with media_flight(tiktok_url) as backup:
+            if backup and await answer_from_backup(
+                message,
+                backup,
+                caption=_("tiktok_video_ready"),
+                reply_markup=get_music_download_button("tiktok"),
+            ):
+                await update_statistics(user_id, field="from_tiktok")
+                return
+
+            video_path = await get_tiktok_video(tiktok_url)
+            user_sessions[user_id]["video_path"] = video_path
+
+            sent = await message.answer_video(
+                FSInputFile(video_path),
+                caption=_("tiktok_video_ready"),
+                reply_markup=get_music_download_button("tiktok"),
+            )
+            await add_to_backup(tiktok_url, sent, platform="tiktok")
+
+            await atomic_clear(video_path)
 
     except Exception as e:
         await message.answer(_("download_failed") + f": {e}")
@@ -108,14 +126,11 @@ async def handle_tiktok_callback(callback_query: CallbackQuery):
             parse_mode="HTML",
         )
 
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         await callback_query.message.answer(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
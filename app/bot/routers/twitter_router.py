@@ -1,4 +1,3 @@
-import time
 import re
 import logging
 from pathlib import Path
@@ -11,14 +10,23 @@ from app.bot.controller.twitter_controller import TwitterController
 from app.bot.handlers import shazam_handler as shz
 from app.bot.handlers.twitter_handler import TwitterHandler
 from app.bot.handlers.user_handlers import remove_token
+from app.bot.models import User
 from app.bot.keyboards.payment_keyboard import get_payment_keyboard
 from app.core.utils.audio import extract_audio_from_video
+from app.core.utils.executor import run_blocking
 from app.bot.extensions.clear import atomic_clear
+from app.bot.handlers.backup_handler import (
+    media_flight,
+    add_to_backup,
+    answer_from_backup,
+    resolve_session_video,
+)
+from app.bot.handlers.queue_handler import queued_download
 from app.bot.routers.music_router import (
     get_controller,
     format_page_text,
     create_keyboard,
-    _cache,
+    store_results,
 )
 from app.bot.keyboards.general_buttons import get_music_download_button
 from app.bot.handlers.statistics_handler import update_statistics
@@ -35,8 +43,9 @@ def extract_twitter_url(text: str) -> str:
 
 
 @twitter_router.message(F.text.contains("twitter.com") | F.text.contains("x.com"))
-async def handle_twitter_message(message: Message):
-    res = await remove_token(message)
+@queued_download("twitter")
+async def handle_twitter_message(message: Message, db_user: User | None = None):
+    res = await remove_token(message, db_user)
     if not res:
         await message.answer(
             _("You have no any requests left. 😢"), reply_markup=get_payment_keyboard()
@@ -54,33 +63,46 @@ async def handle_twitter_message(message: Message):
     twitter_handler.get_sessions()[user_id] = {"url": url}
 
     try:
-        result = await controller.download_media(url)
-
-        if not result["success"] or not result["downloaded_files"]:
-            await message.answer(result["message"])
-            return
-
-        video = next(
-            (f for f in result["downloaded_files"] if f["type"] == "video"), None
-        )
-        if not video:
-            await message.answer(_("twitter_no_files"))
-            return
-
-        video_path = Path(video["path"])
-        if not video_path.exists():
-            await message.answer(_("twitter_no_files"))
-            return
-
-        twitter_handler.get_sessions()[user_id]["video_path"] = str(video_path)
-
-        await message.answer_video(
-            FSInputFile(video_path),
-            caption=_("twitter_video_ready"),
-            reply_markup=get_music_download_button("twitter"),
-        )
-
-        await atomic_clear(video_path)
+        async with media_flight(url) as backup:
+            if backup and await answer_from_backup(
+                message,
+                backup,
+                caption=_("twitter_video_ready"),
+                reply_markup=get_music_download_button("twitter"),
+            ):
+                twitter_handler.get_sessions()[user_id]["file_id"] = backup.file_id
+                await update_statistics(user_id, field="from_twitter")
+                return
+
+            result = await controller.download_media(url)
+
+            if not result["success"] or not result["downloaded_files"]:
+                await message.answer(result["message"])
+                return
+
+            video = next(
+                (f for f in result["downloaded_files"] if f["type"] == "video"), None
+            )
+            if not video:
+                await message.answer(_("twitter_no_files"))
+                return
+
+            video_path = Path(video["path"])
+            if not video_path.exists():
+                await message.answer(_("twitter_no_files"))
+                return
+
+            twitter_handler.get_sessions()[user_id]["video_path"] = str(video_path)
+
+            sent = await message.answer_video(
+                FSInputFile(video_path),
+                caption=_("twitter_video_ready"),
+                reply_markup=get_music_download_button("twitter"),
+            )
+            await add_to_backup(url, sent, platform="twitter")
+            twitter_handler.get_sessions()[user_id]["file_id"] = sent.video.file_id
+
+            await atomic_clear(video_path)
 
     except Exception as e:
         logger.exception("Twitter download error")
@@ -94,12 +116,13 @@ async def handle_twitter_callback(callback_query: CallbackQuery):
     user_id = callback_query.from_user.id
 
     session = twitter_handler.get_sessions().get(user_id)
-    if not session or not session.get("video_path"):
+    video_path = await resolve_session_video(callback_query.bot, session)
+    if not video_path:
         await callback_query.message.answer(_("session_expired"))
         return
 
     try:
-        audio_path = extract_audio_from_video(session["video_path"])
+        audio_path = await run_blocking("audio", extract_audio_from_video, video_path)
         if not audio_path:
             await callback_query.message.answer(_("extract_failed"))
             return
@@ -130,14 +153,11 @@ async def handle_twitter_callback(callback_query: CallbackQuery):
             _("music_found").format(title=title, artist=artist), parse_mode="HTML"
         )
 
-        _cache[user_id] = {
-            "hits": youtube_hits,
-            "timestamp": time.time(),
-        }
+        qkey = store_results(search_query, youtube_hits)
 
         await callback_query.message.answer(
-            format_page_text(youtube_hits, 0),
-            reply_markup=create_keyboard(user_id, 0, add_video=True),
+            format_page_text(qkey, 0),
+            reply_markup=create_keyboard(qkey, 0, add_video=True),
             parse_mode="HTML",
         )
 
@@ -9,6 +9,7 @@ from aiogram.utils.i18n import gettext as _
 from app.bot.handlers.admin import get_token_per_referral
 from app.bot.handlers.referral_handler import get_user_by_tg_id
 from app.bot.handlers.user_handlers import get_referral_count
+from app.bot.models import User
 from app.core.settings.config import get_settings, Settings
 
 user_router = Router()
@@ -52,8 +53,10 @@ async def handle_refer_friends(message: Message):
 
 
 @user_router.callback_query(F.data == "invite_friends")
-async def invite_friends(callback_query: CallbackQuery):
-    user = await get_user_by_tg_id(callback_query.from_user.id)
+async def invite_friends(
+    callback_query: CallbackQuery, db_user: User | None = None
+):
+    user = db_user or await get_user_by_tg_id(callback_query.from_user.id)
     bot_username = (await callback_query.bot.get_me()).username
 
     if not bot_username:
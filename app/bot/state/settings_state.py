@@ -8,3 +8,4 @@ class SettingsForm(StatesGroup):
 class BroadcastForm(StatesGroup):
     waiting_for_text = State()
     waiting_for_media = State()
+    waiting_for_source = State()
@@ -0,0 +1,8 @@
+# Bot API orqali yuboriladigan faylning maksimal hajmi
+TELEGRAM_MAX_FILE_SIZE = 50 * 1024 * 1024
+
+# send_media_group dagi maksimal elementlar soni
+TELEGRAM_MEDIA_GROUP_LIMIT = 10
+
+# Yuklab olishda bir marta o'qiladigan bo'lak hajmi
+DOWNLOAD_CHUNK_SIZE = 512 * 1024
@@ -1,28 +1,68 @@
+import asyncio
+import logging
+import time
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from functools import cache
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Optional, Tuple
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
 from app.core.settings.config import get_settings, Settings
+from app.core.utils.metrics import get_latency
 
+logger = logging.getLogger(__name__)
 settings: Settings = get_settings()
 
+# Joriy task dagi ochiq sessiya: ichma-ich chaqiruvlar yangi ulanish olmaydi,
+# uning ulanishida SAVEPOINT ochadi
+_current_session: ContextVar[Optional[Tuple[AsyncSession, asyncio.Task]]] = (
+    ContextVar("current_session", default=None)
+)
+
+_pool_stats: Dict[str, int] = {
+    "connects": 0,
+    "checkouts": 0,
+    "timeouts": 0,
+    "reused_connections": 0,
+}
+
 
 @cache
-def get_async_engine():
-    return create_async_engine(
-        settings.get_async_postgres_url(),
-        pool_size=3,
-        max_overflow=5,
+def get_async_engine() -> AsyncEngine:
+    # asyncpg prepared statement lar ulanish darajasida keshlanadi
+    url = make_url(settings.get_async_postgres_url()).update_query_dict(
+        {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+    )
+    engine = create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
         future=True,
         echo=False,
     )
 
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _pool_stats["connects"] += 1
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _pool_stats["checkouts"] += 1
+
+    return engine
+
 
 @cache
 def get_session_maker() -> async_sessionmaker[AsyncSession]:
@@ -34,8 +74,69 @@ def get_session_maker() -> async_sessionmaker[AsyncSession]:
     )
 
 
+async def acquire_connection(session: AsyncSession) -> None:
+    """Pool dan ulanish olish vaqtini o'lchaydi (pool to'lganda kutish shu yerda)"""
+    started = time.perf_counter()
+    try:
+        await session.connection()
+    except PoolTimeoutError:
+        _pool_stats["timeouts"] += 1
+        logger.error(
+            f"DB pool to'ldi: {settings.DB_POOL_TIMEOUT}s ichida ulanish olinmadi"
+        )
+        raise
+    finally:
+        get_latency("db-pool-wait").observe(time.perf_counter() - started)
+
+
 @asynccontextmanager
-async def get_general_session() -> AsyncGenerator[AsyncSession, None]:
+async def session_scope() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Bitta task ichida bitta ulanish. Tranzaksiyani tashqi blok boshqaradi:
+    xatosiz tugasa commit, xato bo'lsa rollback qiladi.
+    Ichma-ich chaqiruv shu ulanishdagi SAVEPOINT ga bog'langan alohida sessiya
+    oladi - uning commit/rollback i faqat savepoint ga ta'sir qiladi, xato
+    esa keyingi chaqiruvlarni buzmaydi.
+    Boshqa task larga (asyncio.gather va h.k.) ulanish uzatilmaydi.
+    """
+    task = asyncio.current_task()
+    current = _current_session.get()
+    if current is not None and current[1] is task:
+        _pool_stats["reused_connections"] += 1
+        connection = await current[0].connection()
+        async with AsyncSession(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            autoflush=False,
+            expire_on_commit=False,
+        ) as session:
+            yield session
+        return
+
     session_maker = get_session_maker()
     async with session_maker() as session:
+        await acquire_connection(session)
+        token = _current_session.set((session, task))
+        try:
+            yield session
+            if session.in_transaction():
+                await session.commit()
+        finally:
+            _current_session.reset(token)
+
+
+@asynccontextmanager
+async def get_general_session() -> AsyncGenerator[AsyncSession, None]:
+    async with session_scope() as session:
         yield session
+
+
+def get_pool_stats() -> Dict[str, object]:
+    pool = get_async_engine().pool
+    return {
+        **_pool_stats,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "wait": get_latency("db-pool-wait").summary(),
+    }
@@ -34,8 +34,6 @@ class CheckSubscriptionMiddleware(BaseMiddleware):
         #     return None
 
         if isinstance(event, Message):
-            if await is_free_for_month(user_id):
-                return await handler(event, data)
             text = event.text or ""
             if (
                 text.startswith("/help")
@@ -43,8 +41,12 @@ class CheckSubscriptionMiddleware(BaseMiddleware):
                 or text.startswith("/new")
             ):
                 return await handler(event, data)
+            # Obuna holati keshlanadi - obuna bo'lgan foydalanuvchi uchun
+            # DB ga ham, Telegram ga ham murojaat qilinmaydi
             unsubscribed = await fetch_unsubscribed_channels(user_id, bot)
-            if unsubscribed:
+            if unsubscribed and not await is_free_for_month(
+                user_id, data.get("db_user")
+            ):
                 buttons = await get_channel_keyboard(unsubscribed)
                 prompt = f"📢 Please subscribe to the following {len(unsubscribed)} channels first:"
                 try:
@@ -14,7 +14,9 @@ class UserI18nMiddleware(SimpleI18nMiddleware):
 
         if user and user.id:
             try:
+                # Keyingi middleware va handlerlar uchun: handler(message, db_user)
                 db_user: User = await get_user_by_tg_id(user.id)
+                data["db_user"] = db_user
                 if db_user and db_user.language_code:
                     return db_user.language_code
             except Exception as e:
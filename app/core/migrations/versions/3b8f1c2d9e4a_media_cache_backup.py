@@ -0,0 +1,47 @@
+"""media cache columns for backup
+
+Revision ID: 3b8f1c2d9e4a
+Revises: 950ae4d6d476
+Create Date: 2026-10-17 10:12:41.208135
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b8f1c2d9e4a"
+down_revision: Union[str, None] = "950ae4d6d476"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Old rows only pointed at channel messages and carry no file_id.
+    op.execute("DELETE FROM backup")
+    op.add_column("backup", sa.Column("platform", sa.String(length=16), nullable=True))
+    op.add_column("backup", sa.Column("file_id", sa.String(), nullable=False))
+    op.add_column("backup", sa.Column("file_unique_id", sa.String(), nullable=False))
+    op.add_column(
+        "backup", sa.Column("media_type", sa.String(length=16), nullable=False)
+    )
+    op.add_column("backup", sa.Column("file_size", sa.BigInteger(), nullable=True))
+    op.add_column("backup", sa.Column("created_at", sa.DateTime(), nullable=False))
+    op.add_column("backup", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.drop_index(op.f("ix_backup_url"), table_name="backup")
+    op.create_index(op.f("ix_backup_url"), "backup", ["url"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_backup_url"), table_name="backup")
+    op.create_index(op.f("ix_backup_url"), "backup", ["url"], unique=False)
+    op.drop_column("backup", "updated_at")
+    op.drop_column("backup", "created_at")
+    op.drop_column("backup", "file_size")
+    op.drop_column("backup", "media_type")
+    op.drop_column("backup", "file_unique_id")
+    op.drop_column("backup", "file_id")
+    op.drop_column("backup", "platform")
@@ -0,0 +1,57 @@
+"""broadcast progress table and users.is_blocked
+
+Revision ID: 5e8c0b3a9d62
+Revises: d93b6e2f8a17
+Create Date: 2026-10-17 18:05:37.264019
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8c0b3a9d62"
+down_revision: Union[str, None] = "d93b6e2f8a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("is_blocked", sa.Boolean(), server_default="false", nullable=False),
+    )
+    op.create_index(op.f("ix_users_is_blocked"), "users", ["is_blocked"], unique=False)
+
+    op.create_table(
+        "broadcasts",
+        sa.Column("admin_id", sa.BigInteger(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=True),
+        sa.Column("media_type", sa.String(length=16), nullable=True),
+        sa.Column("media_file_id", sa.String(), nullable=True),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("last_tg_id", sa.BigInteger(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("sent", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("blocked", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_broadcasts_id"), "broadcasts", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_broadcasts_status"), "broadcasts", ["status"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_broadcasts_status"), table_name="broadcasts")
+    op.drop_index(op.f("ix_broadcasts_id"), table_name="broadcasts")
+    op.drop_table("broadcasts")
+    op.drop_index(op.f("ix_users_is_blocked"), table_name="users")
+    op.drop_column("users", "is_blocked")
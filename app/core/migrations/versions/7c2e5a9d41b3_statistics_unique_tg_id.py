@@ -0,0 +1,57 @@
+"""unique statistics row per user
+
+Revision ID: 7c2e5a9d41b3
+Revises: 3b8f1c2d9e4a
+Create Date: 2026-10-17 14:03:12.517204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e5a9d41b3"
+down_revision: Union[str, None] = "3b8f1c2d9e4a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = (
+    "from_text",
+    "from_voice",
+    "from_youtube",
+    "from_tiktok",
+    "from_like",
+    "from_snapchat",
+    "from_instagram",
+    "from_twitter",
+    "from_video",
+)
+
+
+def upgrade() -> None:
+    # Takroriy qatorlar birinchisiga qo'shilib, qolganlari o'chiriladi
+    sums = ", ".join(f"{c} = d.{c}" for c in COUNTERS)
+    totals = ", ".join(f"SUM({c}) AS {c}" for c in COUNTERS)
+    op.execute(
+        f"""
+        UPDATE statistics s SET {sums}
+        FROM (
+            SELECT tg_id, MIN(id) AS keep_id, {totals}
+            FROM statistics GROUP BY tg_id HAVING COUNT(*) > 1
+        ) d
+        WHERE s.tg_id = d.tg_id AND s.id = d.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM statistics s USING statistics k
+        WHERE s.tg_id = k.tg_id AND s.id > k.id
+        """
+    )
+    op.create_index("ux_statistics_tg_id", "statistics", ["tg_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ux_statistics_tg_id", table_name="statistics")
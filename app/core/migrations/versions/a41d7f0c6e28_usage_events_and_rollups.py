@@ -0,0 +1,75 @@
+"""usage events partitioned table and hourly/daily rollups
+
+Revision ID: a41d7f0c6e28
+Revises: 7c2e5a9d41b3
+Create Date: 2026-10-17 15:27:54.093611
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a41d7f0c6e28"
+down_revision: Union[str, None] = "7c2e5a9d41b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usage_events",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("tg_id", sa.BigInteger(), nullable=False),
+        sa.Column("platform", sa.String(length=16), nullable=False),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_usage_events_created_at", "usage_events", ["created_at"], unique=False
+    )
+    # Oylik partition lar bot ishga tushganda yaratiladi (usage_handler),
+    # ulardan tashqaridagi qatorlar default ga tushadi
+    op.execute("CREATE TABLE usage_events_default PARTITION OF usage_events DEFAULT")
+
+    op.create_table(
+        "usage_hourly",
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("platform", sa.String(length=16), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("bucket", "platform"),
+    )
+    op.create_index(op.f("ix_usage_hourly_id"), "usage_hourly", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_usage_hourly_bucket"), "usage_hourly", ["bucket"], unique=False
+    )
+
+    op.create_table(
+        "usage_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("platform", sa.String(length=16), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("day", "platform"),
+    )
+    op.create_index(op.f("ix_usage_daily_id"), "usage_daily", ["id"], unique=False)
+    op.create_index(op.f("ix_usage_daily_day"), "usage_daily", ["day"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_usage_daily_day"), table_name="usage_daily")
+    op.drop_index(op.f("ix_usage_daily_id"), table_name="usage_daily")
+    op.drop_table("usage_daily")
+    op.drop_index(op.f("ix_usage_hourly_bucket"), table_name="usage_hourly")
+    op.drop_index(op.f("ix_usage_hourly_id"), table_name="usage_hourly")
+    op.drop_table("usage_hourly")
+    op.drop_index("ix_usage_events_created_at", table_name="usage_events")
+    # Partition lar ham birga o'chadi
+    op.drop_table("usage_events")
@@ -0,0 +1,56 @@
+"""broadcast copy mode and per-recipient results
+
+Revision ID: b6f2d8e4c1a9
+Revises: 5e8c0b3a9d62
+Create Date: 2026-10-17 19:22:48.551207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6f2d8e4c1a9"
+down_revision: Union[str, None] = "5e8c0b3a9d62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "broadcasts", sa.Column("source_chat_id", sa.BigInteger(), nullable=True)
+    )
+    op.add_column(
+        "broadcasts", sa.Column("source_message_id", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "broadcasts",
+        sa.Column("deactivated", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "broadcasts",
+        sa.Column("retries", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    op.create_table(
+        "broadcast_recipients",
+        sa.Column("broadcast_id", sa.Integer(), nullable=False),
+        sa.Column("tg_id", sa.BigInteger(), nullable=False),
+        sa.Column("status", sa.SmallInteger(), nullable=False),
+        sa.Column("attempts", sa.SmallInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["broadcast_id"], ["broadcasts.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("broadcast_id", "tg_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("broadcast_recipients")
+    op.drop_column("broadcasts", "retries")
+    op.drop_column("broadcasts", "deactivated")
+    op.drop_column("broadcasts", "source_message_id")
+    op.drop_column("broadcasts", "source_chat_id")
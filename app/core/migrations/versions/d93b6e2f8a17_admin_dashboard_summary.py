@@ -0,0 +1,73 @@
+"""admin dashboard summary materialized view
+
+Revision ID: d93b6e2f8a17
+Revises: a41d7f0c6e28
+Create Date: 2026-10-17 16:48:09.731520
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d93b6e2f8a17"
+down_revision: Union[str, None] = "a41d7f0c6e28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = (
+    "from_text",
+    "from_voice",
+    "from_youtube",
+    "from_tiktok",
+    "from_like",
+    "from_snapchat",
+    "from_instagram",
+    "from_twitter",
+    "from_video",
+)
+
+
+def upgrade() -> None:
+    # Faqat DASHBOARD_USE_MATVIEW yoqilganda o'qiladi va fonda yangilanadi
+    usage = ", ".join(f"COALESCE(SUM(s.{c}), 0) AS {c}" for c in COUNTERS)
+    op.execute(
+        f"""
+        CREATE MATERIALIZED VIEW admin_dashboard_summary AS
+        SELECT 1 AS id, g.*, u.*
+        FROM (
+            SELECT
+                COUNT(*) FILTER (
+                    WHERE created_at >= date_trunc('day', LOCALTIMESTAMP)
+                ) AS today,
+                COUNT(*) FILTER (
+                    WHERE created_at >= date_trunc('day', LOCALTIMESTAMP)
+                        - INTERVAL '1 day'
+                    AND created_at < date_trunc('day', LOCALTIMESTAMP)
+                ) AS yesterday,
+                COUNT(*) FILTER (
+                    WHERE created_at >= LOCALTIMESTAMP - INTERVAL '7 days'
+                ) AS last_week,
+                COUNT(*) FILTER (
+                    WHERE created_at >= LOCALTIMESTAMP - INTERVAL '30 days'
+                ) AS last_month,
+                COUNT(*) FILTER (
+                    WHERE created_at >= LOCALTIMESTAMP - INTERVAL '365 days'
+                ) AS last_year,
+                COUNT(*) AS all_time
+            FROM users
+        ) g
+        CROSS JOIN (SELECT {usage} FROM statistics s) u
+        """
+    )
+    # REFRESH ... CONCURRENTLY uchun unique index kerak
+    op.execute(
+        "CREATE UNIQUE INDEX ux_admin_dashboard_summary_id "
+        "ON admin_dashboard_summary (id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS admin_dashboard_summary")
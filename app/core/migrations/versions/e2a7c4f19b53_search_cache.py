@@ -0,0 +1,46 @@
+"""persistent search cache
+
+Revision ID: e2a7c4f19b53
+Revises: b6f2d8e4c1a9
+Create Date: 2026-10-17 20:04:11.318924
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a7c4f19b53"
+down_revision: Union[str, None] = "b6f2d8e4c1a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_cache",
+        sa.Column("namespace", sa.String(length=32), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("value", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("namespace", "key"),
+    )
+    op.create_index(op.f("ix_search_cache_id"), "search_cache", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_search_cache_expires_at"),
+        "search_cache",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_search_cache_expires_at"), table_name="search_cache")
+    op.drop_index(op.f("ix_search_cache_id"), table_name="search_cache")
+    op.drop_table("search_cache")
@@ -17,11 +17,93 @@ class Settings(BaseSettings):
 
     # Selenium Credentials
     SELENIUM_REMOTE_URL: str
+    SELENIUM_USE_REMOTE: bool = False
+    SELENIUM_POOL_SIZE: int = 3
+    SELENIUM_MAX_PAGES: int = 50
+    CHROMEDRIVER_PATH: str = "/usr/bin/chromedriver"
 
     # API KEYS
     LIKEE_API_KEY: str
     TWITTER_API_KEY: str
 
+    # Media cache (url -> telegram file_id)
+    MEDIA_CACHE_TTL_DAYS: int = 30
+
+    # Umumiy aiohttp sessiya
+    HTTP_TIMEOUT: float = 60
+    HTTP_CONNECT_TIMEOUT: float = 10
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_LIMIT_PER_HOST: int = 10
+    HTTP_DNS_TTL: int = 300
+
+    # Foydalanuvchi profili keshi
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL: int = 120
+
+    # Kanal obunasi keshi (soniya)
+    SUBSCRIPTION_POSITIVE_TTL: int = 600
+    SUBSCRIPTION_NEGATIVE_TTL: int = 20
+    # Bot a'zolikni tekshira olmagan kanal shu muddat tekshirilmaydi
+    SUBSCRIPTION_UNREACHABLE_TTL: int = 60
+    CHANNELS_CACHE_TTL: int = 300
+
+    # Yuklashlar navbati
+    DOWNLOAD_USER_LIMIT: int = 2
+    DOWNLOAD_PREMIUM_USER_LIMIT: int = 4
+    DOWNLOAD_QUEUE_MAX_DEPTH: int = 50
+
+    # Cookie fayllar pool i: xato bergan cookie karantinga olinadi
+    # (muddati har safar ikki baravar oshadi, MAX gacha)
+    COOKIE_QUARANTINE_BASE: float = 60
+    COOKIE_QUARANTINE_MAX: float = 3600
+    COOKIE_MAX_ATTEMPTS: int = 3
+
+    # Qidiruv natijalarining birinchilarini foydalanuvchi tanlayotganda oldindan
+    # yuklash (prefetch). TOP=0 - o'chirilgan
+    MUSIC_PREFETCH_TOP: int = 2
+    MUSIC_PREFETCH_MAX_INFLIGHT: int = 4
+    MUSIC_PREFETCH_MAX_FILE_SIZE: int = 15 * 1024 * 1024
+    MUSIC_PREFETCH_MAX_BYTES: int = 500 * 1024 * 1024
+    MUSIC_PREFETCH_TTL: int = 600
+
+    # PostgreSQL ulanishlar pool i
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # pgbouncer (transaction mode) ishlatilsa 0 qilinadi
+    DB_STATEMENT_CACHE_SIZE: int = 500
+
+    # Qidiruv natijalari keshi. PERSISTENT yoqilsa ko'p so'ralganlari
+    # Postgres da ham saqlanadi va restart dan keyin tiklanadi
+    SEARCH_CACHE_PERSISTENT: bool = False
+    SEARCH_CACHE_PERSIST_AFTER_HITS: int = 2
+    SEARCH_CACHE_PERSIST_TTL: int = 86400 * 3
+
+    # Statistika hisoblagichlari buferi (write-behind)
+    STATS_FLUSH_INTERVAL: float = 5
+    STATS_FLUSH_MAX_EVENTS: int = 500
+    STATS_BUFFER_MAX_KEYS: int = 20_000
+    # usage_events partition lari necha oy saqlanadi (rollup lar o'chirilmaydi)
+    USAGE_EVENTS_RETENTION_MONTHS: int = 6
+
+    # Admin panel statistikasi keshi (soniya) va ixtiyoriy materialized view
+    DASHBOARD_CACHE_TTL: int = 60
+    DASHBOARD_USE_MATVIEW: bool = False
+    DASHBOARD_REFRESH_INTERVAL: int = 300
+
+    # Broadcast: Telegram ~30 xabar/s global cheklovi ostida
+    BROADCAST_RATE: float = 28
+    BROADCAST_BURST: float = 28
+    BROADCAST_WORKERS: int = 16
+    BROADCAST_PAGE_SIZE: int = 500
+    BROADCAST_MAX_RETRIES: int = 3
+    BROADCAST_PROGRESS_INTERVAL: int = 15
+
+    # Event loop 'lag' shu soniyadan oshsa watchdog ogohlantiradi
+    LOOP_LAG_THRESHOLD: float = 0.5
+
     model_config = SettingsConfigDict(env_file=".env")
 
     @property
@@ -0,0 +1,220 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.core.extensions.utils import WORKDIR
+from app.core.settings.config import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+COOKIE_ROOT = WORKDIR.parent / "static" / "cookie"
+
+OUTCOME_OK = "ok"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_AUTH = "auth"
+# Video o'chirilgan, yopiq va h.k. - cookie aybdor emas, boshqasi ham yordam bermaydi
+OUTCOME_CONTENT = "content"
+OUTCOME_ERROR = "error"
+
+_OUTCOME_MARKERS = (
+    (OUTCOME_RATE_LIMITED, ("429", "too many requests", "rate-limit", "rate limit")),
+    (
+        OUTCOME_AUTH,
+        (
+            "sign in to confirm",
+            "not a bot",
+            "login required",
+            "cookies are no longer valid",
+            "use --cookies",
+        ),
+    ),
+    (
+        OUTCOME_CONTENT,
+        (
+            "video unavailable",
+            "private video",
+            "has been removed",
+            "no longer available",
+            "does not exist",
+            "unsupported url",
+        ),
+    ),
+)
+
+# Sog'liq ko'rsatkichlari uchun EWMA koeffitsienti
+ALPHA = 0.3
+
+
+def classify_error(error: BaseException | str) -> str:
+    text = str(error).lower()
+    for outcome, markers in _OUTCOME_MARKERS:
+        if any(marker in text for marker in markers):
+            return outcome
+    return OUTCOME_ERROR
+
+
+class _CookieState:
+    __slots__ = (
+        "path",
+        "ok_rate",
+        "rate_limited",
+        "latency",
+        "strikes",
+        "quarantined_until",
+        "last_used",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        # Yangi cookie optimistik baholanadi - birinchi bo'lib sinab ko'riladi
+        self.ok_rate = 1.0
+        self.rate_limited = 0.0
+        self.latency = 0.0
+        self.strikes = 0
+        self.quarantined_until = 0.0
+        self.last_used = 0.0
+
+    def score(self) -> float:
+        return self.ok_rate - self.rate_limited - min(self.latency / 60, 0.5)
+
+
+class CookiePool:
+    """
+    Bitta platformaning cookie fayllari. Har bir cookie oxirgi natijalar,
+    tezlik va rate-limit xatolari bo'yicha baholanadi; xato bergani
+    karantinga olinadi (muddati har safar ikki baravar oshadi).
+    Papkaga qo'shilgan yoki o'chirilgan fayllar restart siz hisobga olinadi.
+    """
+
+    def __init__(self, cookie_type: str):
+        self.cookie_type = cookie_type
+        self.directory = COOKIE_ROOT / cookie_type
+        self._states: Dict[str, _CookieState] = {}
+        self._dir_mtime: Optional[float] = None
+        # Yuklashlar thread pool larda ishlaydi
+        self._lock = threading.Lock()
+        self.stats = {
+            "successes": 0,
+            "failures": 0,
+            "rate_limited": 0,
+            "quarantined": 0,
+        }
+
+    def _rescan(self) -> None:
+        try:
+            dir_mtime = self.directory.stat().st_mtime
+        except OSError:
+            self._states.clear()
+            self._dir_mtime = None
+            return
+        # Fayl qo'shilsa/o'chirilsa papka mtime i o'zgaradi
+        if dir_mtime == self._dir_mtime:
+            return
+        self._dir_mtime = dir_mtime
+
+        paths = {
+            entry.path
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".txt") and entry.is_file()
+        }
+        for path in sorted(paths - self._states.keys()):
+            self._states[path] = _CookieState(path)
+            logger.info(f"{self.cookie_type} cookie qo'shildi: {Path(path).name}")
+        for path in self._states.keys() - paths:
+            del self._states[path]
+
+    def candidates(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Karantinda bo'lmagan cookie lar, eng sog'lomi birinchi. Hammasi karantinda
+        bo'lsa - karantini eng tez tugaydigani (butunlay to'xtab qolmaslik uchun).
+        """
+        with self._lock:
+            self._rescan()
+            now = time.monotonic()
+            states = [s for s in self._states.values() if s.quarantined_until <= now]
+            if states:
+                # Teng baholilar orasida eng uzoq ishlatilmagani - yuk taqsimlanadi
+                states.sort(key=lambda s: (-round(s.score(), 2), s.last_used))
+            else:
+                states = sorted(
+                    self._states.values(), key=lambda s: s.quarantined_until
+                )[:1]
+            if limit is not None:
+                states = states[:limit]
+            if states:
+                states[0].last_used = now
+            return [s.path for s in states]
+
+    def acquire(self) -> Optional[str]:
+        paths = self.candidates(limit=1)
+        return paths[0] if paths else None
+
+    def report(
+        self, path: Optional[str], outcome: str, latency: Optional[float] = None
+    ) -> None:
+        if path is None or outcome == OUTCOME_CONTENT:
+            return
+        with self._lock:
+            state = self._states.get(path)
+            if state is None:
+                return
+
+            if outcome == OUTCOME_OK:
+                self.stats["successes"] += 1
+                state.ok_rate += ALPHA * (1 - state.ok_rate)
+                state.rate_limited -= ALPHA * state.rate_limited
+                if latency is not None:
+                    state.latency += ALPHA * (latency - state.latency)
+                state.strikes = 0
+                return
+
+            self.stats["failures"] += 1
+            rate_limited = outcome == OUTCOME_RATE_LIMITED
+            if rate_limited:
+                self.stats["rate_limited"] += 1
+            state.ok_rate -= ALPHA * state.ok_rate
+            state.rate_limited += ALPHA * (float(rate_limited) - state.rate_limited)
+            state.strikes += 1
+            # Tarmoq/timeout kabi umumiy xato birinchi marta kechiriladi
+            if outcome == OUTCOME_ERROR and state.strikes < 2:
+                return
+
+            backoff = min(
+                settings.COOKIE_QUARANTINE_MAX,
+                settings.COOKIE_QUARANTINE_BASE * 2 ** (state.strikes - 1),
+            )
+            state.quarantined_until = time.monotonic() + backoff
+            self.stats["quarantined"] += 1
+            logger.warning(
+                f"{self.cookie_type} cookie {Path(path).name} {backoff:.0f}s "
+                f"karantinga olindi ({outcome})"
+            )
+
+    def get_stats(self) -> Dict[str, int]:
+        now = time.monotonic()
+        with self._lock:
+            quarantined = sum(
+                1 for s in self._states.values() if s.quarantined_until > now
+            )
+            total = len(self._states)
+        return {**self.stats, "total": total, "quarantined_now": quarantined}
+
+
+_pools: Dict[str, CookiePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_cookie_pool(cookie_type: str) -> CookiePool:
+    pool = _pools.get(cookie_type)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(cookie_type, CookiePool(cookie_type))
+    return pool
+
+
+def get_cookie_pool_stats() -> Dict[str, Dict[str, int]]:
+    return {name: pool.get_stats() for name, pool in _pools.items()}
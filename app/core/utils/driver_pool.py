@@ -0,0 +1,184 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import cache
+from typing import Iterator
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from app.core.settings.config import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class _PooledDriver:
+    __slots__ = ("driver", "pages", "created_at")
+
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """
+    Qayta ishlatiladigan headless Chrome sessiyalari.
+    Har bir so'rov yangi Chrome ochmaydi - bo'sh driver olinadi va qaytariladi.
+    N ta sahifadan keyin yoki sog'lig'i tekshiruvdan o'tmasa driver yangilanadi.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.SELENIUM_POOL_SIZE,
+        max_pages: int = settings.SELENIUM_MAX_PAGES,
+        remote_url: str | None = None,
+    ):
+        self.size = size
+        self.max_pages = max_pages
+        self.remote_url = remote_url
+        self._idle: "queue.LifoQueue[_PooledDriver]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "broken": 0}
+
+    def _build_options(self) -> Options:
+        options = Options()
+        # DOMContentLoaded da qaytadi - qolganini page_ready.wait_for_media kutadi
+        options.page_load_strategy = "eager"
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option("useAutomationExtension", False)
+        options.add_argument(f"--user-agent={USER_AGENT}")
+        return options
+
+    def _create(self) -> _PooledDriver:
+        options = self._build_options()
+        if self.remote_url:
+            driver = webdriver.Remote(
+                command_executor=self.remote_url, options=options
+            )
+        else:
+            driver = webdriver.Chrome(
+                service=Service(settings.CHROMEDRIVER_PATH), options=options
+            )
+            # Har bir yangi sahifada navigator.webdriver yashiriladi
+            driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument",
+                {
+                    "source": "Object.defineProperty(navigator, 'webdriver', "
+                    "{get: () => undefined})"
+                },
+            )
+        driver.set_page_load_timeout(30)
+        self.stats["created"] += 1
+        logger.info(f"Yangi Chrome driver ochildi (jami: {self.stats['created']})")
+        return _PooledDriver(driver)
+
+    @staticmethod
+    def _is_healthy(pooled: _PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            return bool(pooled.driver.window_handles)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(pooled: _PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"Driver yopishda xatolik: {e}")
+
+    def _checkout(self) -> _PooledDriver:
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                return self._create()
+
+            if self._is_healthy(pooled):
+                self.stats["reused"] += 1
+                return pooled
+
+            self.stats["broken"] += 1
+            self._quit(pooled)
+
+    def _checkin(self, pooled: _PooledDriver, broken: bool) -> None:
+        if broken or self._closed:
+            self._quit(pooled)
+            return
+
+        if pooled.pages >= self.max_pages:
+            self.stats["recycled"] += 1
+            self._quit(pooled)
+            return
+
+        try:
+            pooled.driver.delete_all_cookies()
+            pooled.driver.get("about:blank")
+        except Exception:
+            self.stats["broken"] += 1
+            self._quit(pooled)
+            return
+
+        self._idle.put(pooled)
+
+    @contextmanager
+    def driver(self, timeout: float = 60) -> Iterator[WebDriver]:
+        """Pool dan driver olish (bo'sh driver bo'lmasa timeout gacha kutadi)"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Bo'sh Chrome driver topilmadi")
+
+        pooled = None
+        broken = False
+        try:
+            pooled = self._checkout()
+            yield pooled.driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            if pooled is not None:
+                pooled.pages += 1
+                self._checkin(pooled, broken)
+            self._slots.release()
+
+    def warm_up(self, count: int = 1) -> None:
+        """Birinchi so'rov sovuq start kutmasligi uchun driverlarni oldindan ochish"""
+        for _ in range(min(count, self.size) - self._idle.qsize()):
+            try:
+                self._idle.put(self._create())
+            except Exception as e:
+                logger.error(f"Chrome driver oldindan ochilmadi: {e}")
+                return
+
+    def close_all(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+@cache
+def get_driver_pool() -> DriverPool:
+    remote_url = settings.SELENIUM_REMOTE_URL if settings.SELENIUM_USE_REMOTE else None
+    return DriverPool(remote_url=remote_url)
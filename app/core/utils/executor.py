@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, TypeVar
+
+from app.core.settings.config import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+T = TypeVar("T")
+
+# Har bir platforma uchun alohida, chegaralangan thread pool.
+# Sekin platforma (masalan, Threads/Chrome) boshqalarning navbatini band qilmaydi.
+POOL_SIZES: Dict[str, int] = {
+    "tiktok": 4,
+    "instagram": 4,
+    "likee": 4,
+    "pinterest": 4,
+    "twitter": 4,
+    "shorts": 4,
+    "threads": 2,
+    "snapchat": 2,
+    "youtube": 8,
+    "yt-search": 4,
+    "audio": 2,
+    # Musiqa prefetch - foydalanuvchi so'rovlari bilan raqobatlashmasligi uchun alohida
+    "prefetch": 2,
+    "export": 2,
+    "default": 4,
+}
+
+_executors: Dict[str, concurrent.futures.ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+_inflight: Dict[str, int] = {}
+
+
+def get_executor(name: str) -> concurrent.futures.ThreadPoolExecutor:
+    """Nomlangan thread pool (birinchi murojaatda yaratiladi)"""
+    executor = _executors.get(name)
+    if executor is not None:
+        return executor
+
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=POOL_SIZES.get(name, POOL_SIZES["default"]),
+                thread_name_prefix=name,
+            )
+            _executors[name] = executor
+        return executor
+
+
+async def run_blocking(
+    pool: str, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Bloklovchi funksiyani event loop dan tashqarida, nomlangan pool da bajaradi"""
+    loop = asyncio.get_running_loop()
+    _inflight[pool] = _inflight.get(pool, 0) + 1
+    try:
+        return await loop.run_in_executor(
+            get_executor(pool), functools.partial(func, *args, **kwargs)
+        )
+    finally:
+        _inflight[pool] -= 1
+
+
+def get_executor_stats() -> Dict[str, Dict[str, int]]:
+    return {
+        name: {
+            "workers": POOL_SIZES.get(name, POOL_SIZES["default"]),
+            "inflight": _inflight.get(name, 0),
+        }
+        for name in _executors
+    }
+
+
+def shutdown_executors(wait: bool = False) -> None:
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
+        _executors.clear()
+
+
+class LoopLagWatchdog:
+    """
+    Event loop bloklanishini kuzatadi. Loop ichida heartbeat task ishlaydi,
+    alohida thread esa heartbeat kechiksa loop thread ining stack ini log qiladi -
+    shunda aynan qaysi chaqiruv loop ni to'xtatgani ko'rinadi.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float | None = None):
+        self.interval = interval
+        self.threshold = threshold or settings.LOOP_LAG_THRESHOLD
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._monitor, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            started = time.monotonic()
+            self._last_beat = started
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - started - self.interval
+            self.max_lag = max(self.max_lag, lag)
+
+    def _monitor(self) -> None:
+        reported = False
+        while not self._stop.wait(self.interval):
+            lag = time.monotonic() - self._last_beat - self.interval
+            if lag < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+
+            reported = True
+            self.blocked_count += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)[-10:]) if frame else "?"
+            logger.warning(
+                f"Event loop {lag:.2f}s dan beri bloklangan. "
+                f"Loop hozir bajarayotgan joy:\n{stack}"
+            )
+
+    def stats(self) -> Dict[str, float]:
+        return {"max_lag": round(self.max_lag, 3), "blocked_count": self.blocked_count}
+
+
+_watchdog: LoopLagWatchdog | None = None
+
+
+def get_loop_watchdog() -> LoopLagWatchdog:
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = LoopLagWatchdog()
+    return _watchdog
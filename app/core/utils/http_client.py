@@ -0,0 +1,147 @@
+import logging
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+import aiohttp
+
+from app.core.constants.media import DOWNLOAD_CHUNK_SIZE, TELEGRAM_MAX_FILE_SIZE
+from app.core.settings.config import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _create_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_POOL_LIMIT,
+        limit_per_host=settings.HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=settings.HTTP_DNS_TTL,
+        use_dns_cache=True,
+        keepalive_timeout=30,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(
+            total=settings.HTTP_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            sock_read=settings.HTTP_CONNECT_TIMEOUT * 3,
+        ),
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """
+    Butun ilova uchun bitta keep-alive aiohttp sessiya.
+    Odatda startup hook da ochiladi; bu yerda faqat zaxira sifatida yaratiladi.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+
+async def fetch_text(url: str, **kwargs) -> Optional[str]:
+    """Sahifa HTML ini olish; xatolik bo'lsa None"""
+    session = await get_http_session()
+    try:
+        async with session.get(url, **kwargs) as response:
+            if response.status != 200:
+                logger.warning(f"HTTP {response.status}: {url}")
+                return None
+            return await response.text()
+    except Exception as e:
+        logger.warning(f"Sahifani olishda xatolik ({url}): {e}")
+        return None
+
+
+async def fetch_json(url: str, **kwargs) -> Optional[dict]:
+    session = await get_http_session()
+    async with session.get(url, **kwargs) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
+
+class FileTooLargeError(Exception):
+    def __init__(self, size: int, max_size: int):
+        super().__init__(f"Fayl hajmi {size} bayt, ruxsat etilgan: {max_size} bayt")
+        self.size = size
+        self.max_size = max_size
+
+
+async def stream_download(
+    url: str,
+    file_path: Path,
+    max_size: int = TELEGRAM_MAX_FILE_SIZE,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    expect_type: Optional[str] = None,
+    **kwargs,
+) -> int:
+    """
+    Faylni bo'laklab diskka yozadi - xotirada butun fayl saqlanmaydi.
+    Content-Length yoki yozilgan hajm max_size dan oshsa FileTooLargeError,
+    expect_type berilsa va Content-Type unga mos kelmasa ValueError.
+    Xatolik yoki bekor qilinishda chala fayl o'chiriladi. Natija: yozilgan baytlar.
+    """
+    file_path = Path(file_path)
+    session = await get_http_session()
+    written = 0
+    try:
+        async with session.get(url, **kwargs) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "").lower()
+            if expect_type and expect_type not in content_type:
+                raise ValueError(f"Kutilmagan Content-Type: {content_type}")
+            if response.content_length and response.content_length > max_size:
+                raise FileTooLargeError(response.content_length, max_size)
+
+            async with aiofiles.open(file_path, "wb") as f:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    written += len(chunk)
+                    if written > max_size:
+                        raise FileTooLargeError(written, max_size)
+                    await f.write(chunk)
+    except BaseException:
+        # CancelledError ham shu yerga tushadi
+        file_path.unlink(missing_ok=True)
+        raise
+    return written
+
+
+async def download_file(
+    url: str, file_path: Path, max_size: int = TELEGRAM_MAX_FILE_SIZE, **kwargs
+) -> bool:
+    """URL dagi faylni diskka yozish; muvaffaqiyatsiz bo'lsa False"""
+    try:
+        written = await stream_download(url, file_path, max_size=max_size, **kwargs)
+    except FileTooLargeError as e:
+        logger.warning(f"Fayl juda katta ({url}): {e}")
+        return False
+    except Exception as e:
+        logger.error(f"Fayl yuklab olishda xatolik ({url}): {e}")
+        return False
+
+    if written == 0:
+        Path(file_path).unlink(missing_ok=True)
+        return False
+    return True
+
+
+async def start_http_session() -> None:
+    await get_http_session()
+
+
+async def close_http_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
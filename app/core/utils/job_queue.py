@@ -0,0 +1,183 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from functools import cache
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.settings.config import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+# Har bir platforma uchun bir vaqtda bajariladigan yuklashlar soni
+PLATFORM_WORKERS: Dict[str, int] = {
+    "tiktok": 4,
+    "instagram": 4,
+    "likee": 3,
+    "pinterest": 3,
+    "twitter": 3,
+    "shorts": 3,
+    "threads": 2,
+    "snapchat": 2,
+    "music": 4,
+    # Bir vaqtda qayta ishlanadigan guruh xabarlari
+    "group": 10,
+    "default": 3,
+}
+
+PRIORITY_PREMIUM = 0
+PRIORITY_REGULAR = 1
+
+
+class QueueRejected(Exception):
+    pass
+
+
+class QueueFullError(QueueRejected):
+    pass
+
+
+class UserLimitError(QueueRejected):
+    pass
+
+
+class _PlatformLane:
+    __slots__ = ("workers", "running", "waiters")
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.running = 0
+        # (priority, seq, future) - premium foydalanuvchilar oldinda
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+
+
+class DownloadQueue:
+    """
+    Yuklashlar navbati: platforma bo'yicha worker soni, foydalanuvchi bo'yicha
+    parallel yuklashlar chegarasi va navbat uzunligi cheklovi.
+    Ish chaqiruvchining o'z task ida bajariladi - navbat faqat ruxsat beradi,
+    shuning uchun i18n va boshqa context lar saqlanadi.
+    """
+
+    def __init__(
+        self,
+        user_limit: int = settings.DOWNLOAD_USER_LIMIT,
+        premium_user_limit: int = settings.DOWNLOAD_PREMIUM_USER_LIMIT,
+        max_depth: int = settings.DOWNLOAD_QUEUE_MAX_DEPTH,
+    ):
+        self.user_limit = user_limit
+        self.premium_user_limit = premium_user_limit
+        self.max_depth = max_depth
+        self._lanes: Dict[str, _PlatformLane] = {}
+        self._user_jobs: Dict[int, int] = {}
+        self._seq = itertools.count()
+        self.stats = {
+            "accepted": 0,
+            "waited": 0,
+            "rejected_full": 0,
+            "rejected_user": 0,
+        }
+
+    def _lane(self, platform: str) -> _PlatformLane:
+        lane = self._lanes.get(platform)
+        if lane is None:
+            workers = PLATFORM_WORKERS.get(platform, PLATFORM_WORKERS["default"])
+            lane = self._lanes[platform] = _PlatformLane(workers)
+        return lane
+
+    def depth(self, platform: str) -> int:
+        return len(self._lane(platform).waiters)
+
+    def _release(self, lane: _PlatformLane) -> None:
+        while lane.waiters:
+            _, _, future = heapq.heappop(lane.waiters)
+            if not future.done():
+                # Slot to'g'ridan-to'g'ri navbatdagiga beriladi
+                future.set_result(None)
+                return
+        lane.running -= 1
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        platform: str,
+        user_id: Optional[int],
+        premium: bool = False,
+        on_wait: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> AsyncIterator[None]:
+        """
+        Yuklash uchun ruxsat. Bo'sh worker bo'lmasa navbatda kutadi
+        (on_wait ga navbatdagi o'rni beriladi). Navbat to'la bo'lsa QueueFullError,
+        foydalanuvchining parallel yuklashlari ko'p bo'lsa UserLimitError.
+        user_id None bo'lsa foydalanuvchi chegarasi hisobga olinmaydi
+        (masalan, allaqachon "group" slotini olgan xabar ichidagi linklar).
+        """
+        limit = self.premium_user_limit if premium else self.user_limit
+        if user_id is not None and self._user_jobs.get(user_id, 0) >= limit:
+            self.stats["rejected_user"] += 1
+            raise UserLimitError(user_id)
+
+        lane = self._lane(platform)
+        must_wait = lane.running >= lane.workers or lane.waiters
+        if must_wait and len(lane.waiters) >= self.max_depth:
+            self.stats["rejected_full"] += 1
+            raise QueueFullError(platform)
+
+        self.stats["accepted"] += 1
+        if user_id is not None:
+            self._user_jobs[user_id] = self._user_jobs.get(user_id, 0) + 1
+        try:
+            if must_wait:
+                self.stats["waited"] += 1
+                future = asyncio.get_running_loop().create_future()
+                priority = PRIORITY_PREMIUM if premium else PRIORITY_REGULAR
+                heapq.heappush(lane.waiters, (priority, next(self._seq), future))
+                try:
+                    if on_wait is not None:
+                        position = sum(1 for p, _, _ in lane.waiters if p <= priority)
+                        try:
+                            await on_wait(position)
+                        except Exception as e:
+                            logger.warning(f"Navbat xabarini yuborib bo'lmadi: {e}")
+                    await future
+                except asyncio.CancelledError:
+                    if future.done() and not future.cancelled():
+                        # Slot berilgan edi - keyingisiga o'tkaziladi
+                        self._release(lane)
+                    else:
+                        future.cancel()
+                        lane.waiters = [w for w in lane.waiters if w[2] is not future]
+                        heapq.heapify(lane.waiters)
+                    raise
+            else:
+                lane.running += 1
+
+            try:
+                yield
+            finally:
+                self._release(lane)
+        finally:
+            if user_id is not None:
+                self._user_jobs[user_id] -= 1
+                if not self._user_jobs[user_id]:
+                    del self._user_jobs[user_id]
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            "lanes": {
+                platform: {
+                    "workers": lane.workers,
+                    "running": lane.running,
+                    "queued": len(lane.waiters),
+                }
+                for platform, lane in self._lanes.items()
+            },
+        }
+
+
+@cache
+def get_download_queue() -> DownloadQueue:
+    return DownloadQueue()
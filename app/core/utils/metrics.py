@@ -0,0 +1,49 @@
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+
+class LatencyStats:
+    """Oxirgi N ta o'lchov bo'yicha p50/p95 (thread-safe)"""
+
+    def __init__(self, max_samples: int = 500):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def percentile(self, p: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "max": round(self.percentile(100), 3),
+        }
+
+
+_latencies: Dict[str, LatencyStats] = {}
+_latencies_lock = threading.Lock()
+
+
+def get_latency(name: str) -> LatencyStats:
+    stats = _latencies.get(name)
+    if stats is None:
+        with _latencies_lock:
+            stats = _latencies.setdefault(name, LatencyStats())
+    return stats
+
+
+def get_latency_summary() -> Dict[str, Dict[str, float]]:
+    return {name: stats.summary() for name, stats in _latencies.items()}
@@ -0,0 +1,65 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.core.utils.metrics import get_latency
+
+logger = logging.getLogger(__name__)
+
+# Sahifa tayyor bo'lishini kutish uchun maksimal vaqt (soniya)
+PLATFORM_TIMEOUTS: Dict[str, float] = {
+    "threads": 15,
+    "snapchat": 10,
+}
+
+# Har bir platforma uchun: media DOM da paydo bo'ldimi ("dom")
+# yoki media URL lari bor embedded JSON tayyormi ("json")
+_READY_SCRIPTS: Dict[str, str] = {
+    "threads": """
+        if (document.querySelector('video[src], video source[src]')) return 'dom';
+        const big = Array.from(document.images).some(
+            i => i.naturalWidth >= 320 && /scontent|cdninstagram|fbcdn/.test(i.src)
+        );
+        if (big) return 'dom';
+        if (document.readyState === 'complete' && Array.from(document.scripts).some(
+            s => s.type === 'application/json'
+                && /"(video_versions|image_versions2)"/.test(s.textContent)
+        )) return 'json';
+        return null;
+    """,
+    "snapchat": """
+        if (document.querySelector('video[src]')) return 'dom';
+        const data = document.getElementById('__NEXT_DATA__');
+        if (data && data.textContent.includes('"mediaUrl"')) return 'json';
+        return null;
+    """,
+}
+
+
+def wait_for_media(
+    driver: WebDriver, platform: str, timeout: Optional[float] = None
+) -> Optional[str]:
+    """
+    Media elementlari yoki embedded JSON paydo bo'lishi bilan qaytadi.
+    Natija: "dom", "json" yoki timeout bo'lsa None.
+    """
+    timeout = timeout or PLATFORM_TIMEOUTS.get(platform, 10)
+    script = _READY_SCRIPTS[platform]
+    started = time.monotonic()
+    signal = None
+    try:
+        signal = WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+            lambda d: d.execute_script(script)
+        )
+    except TimeoutException:
+        logger.warning(f"{platform}: media {timeout}s ichida paydo bo'lmadi")
+    finally:
+        elapsed = time.monotonic() - started
+        get_latency(f"ready.{platform}").observe(elapsed)
+        logger.info(f"{platform} sahifa tayyor: {elapsed:.2f}s ({signal or 'timeout'})")
+
+    return signal
@@ -0,0 +1,233 @@
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.settings.config import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+_SPACES_RE = re.compile(r"\s+")
+
+_caches: Dict[str, "SearchCache"] = {}
+
+# search_cache.key ustuni uzunligi
+MAX_PERSISTENT_KEY = 255
+
+
+def normalize_query(text: str) -> str:
+    """
+    Qidiruv kaliti: katta-kichik harf, ortiqcha bo'shliqlar va diakritik
+    belgilar farqi yo'qotiladi ("Beyoncé  Halo" == "beyonce halo").
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _SPACES_RE.sub(" ", text).strip().casefold()
+
+
+def _estimate_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "hits")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.hits = 0
+
+
+class SearchCache:
+    """
+    LRU + TTL kesh. OrderedDict tufayli olish, yozish va eng eski yozuvni
+    chiqarish O(1). Chegara yozuvlar soni va (ixtiyoriy) taxminiy baytlar bo'yicha.
+    persistent=True bo'lsa ko'p so'ralgan yozuvlar Postgres ga ham yoziladi
+    va restart dan keyin o'sha yerdan tiklanadi.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        persistent: bool = False,
+        persist_after_hits: int = settings.SEARCH_CACHE_PERSIST_AFTER_HITS,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.persistent = persistent and settings.SEARCH_CACHE_PERSISTENT
+        self.persist_after_hits = persist_after_hits
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        # yt-dlp qidiruvi thread pool da ishlaydi
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "persistent_hits": 0,
+        }
+        _caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key, count=False) is not None
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+
+    def _lookup(self, key: Hashable, count: bool = True) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                if count:
+                    self.stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            if count:
+                self.stats["hits"] += 1
+                entry.hits += 1
+            return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._lookup(key)
+        return default if entry is None else entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        size = _estimate_size(value) if self.max_bytes else 0
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = _Entry(value, expires_at, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes and len(self._data) > 1
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return None
+            value = self._data[key].value
+            self._remove(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    async def aget(self, key: str) -> Any:
+        """Avval xotiradan, bo'lmasa (persistent bo'lsa) Postgres dan"""
+        persistent = self.persistent and len(key) <= MAX_PERSISTENT_KEY
+        entry = self._lookup(key)
+        if entry is not None:
+            if persistent and entry.hits == self.persist_after_hits:
+                await _store_persistent(self.name, key, entry.value)
+            return entry.value
+        if not persistent:
+            return None
+
+        value = await _load_persistent(self.name, key)
+        if value is not None:
+            self.stats["persistent_hits"] += 1
+            self.set(key, value)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0,
+        }
+
+
+async def _load_persistent(namespace: str, key: str) -> Any:
+    from sqlalchemy.future import select
+
+    from app.bot.models import SearchCacheEntry
+    from app.core.databases.postgres import get_general_session
+
+    try:
+        async with get_general_session() as session:
+            result = await session.execute(
+                select(SearchCacheEntry.value).where(
+                    SearchCacheEntry.namespace == namespace,
+                    SearchCacheEntry.key == key,
+                    SearchCacheEntry.expires_at > datetime.now(),
+                )
+            )
+            return result.scalar_one_or_none()
+    except Exception as e:
+        logger.warning(f"{namespace} keshini bazadan o'qib bo'lmadi: {e}")
+        return None
+
+
+async def _store_persistent(namespace: str, key: str, value: Any) -> None:
+    from sqlalchemy.dialects.postgresql import insert
+
+    from app.bot.models import SearchCacheEntry
+    from app.core.databases.postgres import get_general_session
+
+    expires_at = datetime.now() + timedelta(seconds=settings.SEARCH_CACHE_PERSIST_TTL)
+    stmt = insert(SearchCacheEntry).values(
+        namespace=namespace, key=key, value=value, expires_at=expires_at
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["namespace", "key"],
+        set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+    )
+    try:
+        async with get_general_session() as session:
+            await session.execute(stmt)
+            await session.commit()
+    except Exception as e:
+        logger.warning(f"{namespace} keshini bazaga yozib bo'lmadi: {e}")
+
+
+async def purge_persistent_cache() -> None:
+    """Muddati o'tgan saqlangan yozuvlarni o'chirish"""
+    from sqlalchemy import delete
+
+    from app.bot.models import SearchCacheEntry
+    from app.core.databases.postgres import get_general_session
+
+    async with get_general_session() as session:
+        await session.execute(
+            delete(SearchCacheEntry).where(
+                SearchCacheEntry.expires_at <= datetime.now()
+            )
+        )
+        await session.commit()
+
+
+def get_search_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.get_stats() for name, cache in _caches.items()}
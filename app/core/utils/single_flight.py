@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Waiters:
+    __slots__ = ("count", "on_orphan")
+
+    def __init__(self, on_orphan: Optional[Callable[[Any], None]]):
+        self.count = 0
+        self.on_orphan = on_orphan
+
+
+class SingleFlight:
+    """
+    Bir xil kalit bo'yicha parallel so'rovlarni bitta bajarishga birlashtiradi.
+    Birinchi kelgan (leader) ishni bajaradi, qolganlar (follower) uning natijasini kutadi.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Natijani hali olmagan kutuvchilar. Kimdir olgach yozuv o'chiriladi
+        self._waiters: Dict[asyncio.Future, _Waiters] = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    def is_inflight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        on_orphan: Optional[Callable[[T], None]] = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        func ni kalit bo'yicha bir marta bajarib, natijani hamma kutuvchilarga beradi.
+        on_orphan - natijani hech bir kutuvchi olmay qolsa (hammasi timeout yoki
+        bekor qilingan), o'sha natija bilan chaqiriladi: masalan faylni o'chirish.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            logger.info(f"{self.name}: '{key}' allaqachon yuklanmoqda, natija kutiladi")
+        else:
+            self.stats["leaders"] += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = task
+            self._waiters[task] = _Waiters(on_orphan)
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            task.add_done_callback(self._on_done)
+
+        waiters = self._waiters.get(task)
+        if waiters is not None:
+            waiters.count += 1
+        try:
+            # Bitta kutuvchi bekor qilinsa, umumiy ish to'xtamaydi
+            result = await asyncio.shield(task)
+        except BaseException:
+            if waiters is not None:
+                waiters.count -= 1
+                if task.done():
+                    self._on_done(task)
+            raise
+        self._waiters.pop(task, None)
+        return result
+
+    def _on_done(self, task: asyncio.Future) -> None:
+        """Natija tayyor, lekin uni kutayotgan hech kim qolmagan bo'lsa"""
+        waiters = self._waiters.get(task)
+        if waiters is None or waiters.count > 0:
+            return
+        del self._waiters[task]
+        if waiters.on_orphan is None or task.cancelled() or task.exception():
+            return
+        try:
+            waiters.on_orphan(task.result())
+        except Exception as e:
+            logger.warning(f"{self.name}: egasiz natijani tozalashda xatolik: {e}")
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[bool]:
+        """
+        Kalitni blok davomida band qiladi. Natija: True - leader (ishni bajaradi),
+        False - boshqa leader ishini tugatdi, natijani keshdan olish mumkin.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            logger.info(f"{self.name}: '{key}' allaqachon yuklanmoqda, natija kutiladi")
+            await asyncio.shield(future)
+            yield False
+            return
+
+        self.stats["leaders"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            yield True
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(None)
+
+
+_flights: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    flight = _flights.get(name)
+    if flight is None:
+        flight = _flights[name] = SingleFlight(name)
+    return flight
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    return {name: dict(flight.stats) for name, flight in _flights.items()}
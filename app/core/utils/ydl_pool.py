@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import yt_dlp
+from yt_dlp.utils import DEFAULT_OUTTMPL
+
+from app.core.utils.metrics import get_latency
+
+logger = logging.getLogger(__name__)
+
+# Shuncha yuklashdan keyin instance yangilanadi (cookie jar, kesh lar o'smasligi uchun)
+MAX_USES = 200
+
+# (platform, profile) -> instance. Har bir worker thread o'z instance lariga
+# ega, shuning uchun lock kerak emas. Cookie fayl almashsa instance
+# almashtirilmaydi - faqat uning cookie jar i qayta yuklanadi
+_local = threading.local()
+_stats = {
+    "created": 0,
+    "reused": 0,
+    "recycled": 0,
+    "discarded": 0,
+    "cookie_swaps": 0,
+}
+# Hisoblagichlarni bir nechta worker thread yangilaydi
+_stats_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+class _PooledYdl:
+    __slots__ = ("ydl", "uses", "cookiefile")
+
+    def __init__(self, ydl: yt_dlp.YoutubeDL, cookiefile: Optional[str]):
+        self.ydl = ydl
+        self.uses = 0
+        self.cookiefile = cookiefile
+
+
+def _instances() -> Dict[Tuple[str, str], _PooledYdl]:
+    instances = getattr(_local, "instances", None)
+    if instances is None:
+        instances = _local.instances = {}
+    return instances
+
+
+def _create(opts: Dict[str, Any]) -> _PooledYdl:
+    started = time.perf_counter()
+    ydl = yt_dlp.YoutubeDL(dict(opts))
+    get_latency("ydl-create").observe(time.perf_counter() - started)
+    _count("created")
+    return _PooledYdl(ydl, opts.get("cookiefile"))
+
+
+def _close(pooled: _PooledYdl) -> None:
+    try:
+        pooled.ydl.close()
+    except Exception as e:
+        logger.warning(f"YoutubeDL yopishda xatolik: {e}")
+
+
+def _swap_cookies(pooled: _PooledYdl, cookiefile: Optional[str]) -> None:
+    """
+    Boshqa cookie fayl: jar joyida tozalanib qayta yuklanadi. HTTP handler lar
+    shu jar obyektini ishlatadi, shuning uchun instance ni qayta yaratish shart emas.
+    """
+    jar = pooled.ydl.cookiejar
+    jar.clear()
+    jar.filename = cookiefile
+    if cookiefile and os.access(cookiefile, os.R_OK):
+        jar.load()
+    pooled.ydl.params["cookiefile"] = cookiefile
+    pooled.cookiefile = cookiefile
+    _count("cookie_swaps")
+
+
+@contextmanager
+def pooled_ydl(
+    platform: str,
+    profile: str,
+    opts: Dict[str, Any],
+    outtmpl: Optional[str] = None,
+) -> Iterator[yt_dlp.YoutubeDL]:
+    """
+    Joriy thread uchun oldindan sozlangan YoutubeDL. Extractor lar, cookie jar
+    va HTTP handler lar har chaqiruvda qayta yaratilmaydi.
+    Bir (platform, profile) uchun opts doim bir xil bo'lishi kerak - faqat
+    cookiefile va outtmpl har chaqiruvda farq qilishi mumkin (outtmpl ni shu
+    profilning har bir chaqiruvi beradi). Kutilmagan xatolikdan keyin instance
+    tashlanadi.
+    """
+    key = (platform, profile)
+    instances = _instances()
+    pooled = instances.pop(key, None)
+    if pooled is None:
+        pooled = _create(opts)
+    else:
+        _count("reused")
+
+    try:
+        cookiefile = opts.get("cookiefile")
+        if cookiefile != pooled.cookiefile:
+            _swap_cookies(pooled, cookiefile)
+        if outtmpl is not None:
+            pooled.ydl.params["outtmpl"] = {**DEFAULT_OUTTMPL, "default": outtmpl}
+        yield pooled.ydl
+    except yt_dlp.utils.DownloadError:
+        # Yuklab bo'lmadi (video yo'q, cookie yaroqsiz) - instance holati buzilmagan
+        instances[key] = pooled
+        raise
+    except BaseException:
+        _count("discarded")
+        _close(pooled)
+        raise
+
+    pooled.uses += 1
+    if pooled.uses >= MAX_USES:
+        _count("recycled")
+        _close(pooled)
+        return
+
+    try:
+        # Yangilangan cookie lar avvalgidek faylga yoziladi
+        pooled.ydl.save_cookies()
+    except Exception as e:
+        logger.warning(f"{platform} cookie larini saqlab bo'lmadi: {e}")
+    instances[key] = pooled
+
+
+def get_ydl_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    return {**stats, "create_latency": get_latency("ydl-create").summary()}
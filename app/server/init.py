@@ -3,9 +3,23 @@ import os
 from pathlib import Path
 from sqlalchemy.future import select
 
+from app.bot.handlers.admin import start_dashboard_refresh, stop_dashboard_refresh
+from app.bot.handlers.broadcast_handler import resume_broadcasts, stop_broadcasts
+from app.bot.handlers.statistics_handler import statistics_buffer
+from app.bot.handlers.usage_handler import (
+    start_usage_maintenance,
+    stop_usage_maintenance,
+)
 from app.bot.models import AdminRequirements
 from app.core.extensions.utils import WORKDIR
+from app.core.settings.config import get_settings, Settings
 from app.core.databases.postgres import get_general_session
+from app.core.utils.driver_pool import get_driver_pool
+from app.core.utils.executor import run_blocking, shutdown_executors
+from app.core.utils.http_client import close_http_session, start_http_session
+from app.core.utils.search_cache import purge_persistent_cache
+
+settings: Settings = get_settings()
 
 
 async def admin_init():
@@ -78,3 +92,27 @@ async def set_default_commands(bot: Bot):
             BotCommand(command="help", description="Get help"),
         ]
     )
+
+
+async def on_startup(bot: Bot) -> None:
+    # Barcha tashqi HTTP so'rovlar uchun bitta keep-alive sessiya
+    await start_http_session()
+    start_usage_maintenance()
+    statistics_buffer.start()
+    start_dashboard_refresh()
+    await resume_broadcasts(bot)
+    if settings.SEARCH_CACHE_PERSISTENT:
+        try:
+            await purge_persistent_cache()
+        except Exception as e:
+            logging.warning(f"Search cache purge failed: {e}")
+
+
+async def on_shutdown() -> None:
+    stop_broadcasts()
+    stop_dashboard_refresh()
+    stop_usage_maintenance()
+    await statistics_buffer.stop()
+    await run_blocking("default", get_driver_pool().close_all)
+    await close_http_session()
+    shutdown_executors()
@@ -11,8 +11,16 @@ from app.core.settings.config import get_settings, Settings
 from app.core.extensions.utils import WORKDIR
 from app.core.middlewares.channel_join import CheckSubscriptionMiddleware
 from app.core.middlewares.group_chat_middle import GroupChatMiddleware
-from app.server.init import init, admin_init, set_default_commands
+from app.server.init import (
+    init,
+    admin_init,
+    set_default_commands,
+    on_startup,
+    on_shutdown,
+)
 from app.server.logout import log_out
+from app.core.utils.driver_pool import get_driver_pool
+from app.core.utils.executor import get_loop_watchdog, run_blocking
 
 settings: Settings = get_settings()
 i18n = I18n(path=WORKDIR / "locales", default_locale="uz", domain="messages")
@@ -48,9 +56,23 @@ async def main() -> None:
     # Routerlarni qo'shish
     dp.include_router(v1_router)
 
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+
     await set_default_commands(bot)
     await admin_init()
-    await dp.start_polling(bot, drop_pending_updates=True)
+
+    # Event loop bloklanishini kuzatish
+    watchdog = get_loop_watchdog()
+    watchdog.start()
+
+    # Birinchi Threads/Snapchat so'rovi uchun Chrome oldindan ochiladi
+    warm_up = asyncio.create_task(run_blocking("threads", get_driver_pool().warm_up))
+    try:
+        await dp.start_polling(bot, drop_pending_updates=True)
+    finally:
+        warm_up.cancel()
+        watchdog.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+import os
+import sys
+from pathlib import Path
+
+# Settings majburiy maydonlari - testlar tashqi servislarga ulanmaydi
+for key, value in {
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "SELENIUM_REMOTE_URL": "http://localhost:4444",
+    "LIKEE_API_KEY": "test",
+    "TWITTER_API_KEY": "test",
+}.items():
+    os.environ.setdefault(key, value)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
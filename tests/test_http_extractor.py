@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+
+from app.bot.controller.http_extractor import (
+    parse_snapchat_html,
+    parse_threads_html,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+CDN = "https://scontent.cdninstagram.com"
+
+
+def load(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.threads.net/@tingla/post/DAbCdEf123",
+        "https://www.threads.com/t/DAbCdEf123",
+    ],
+)
+def test_threads_picks_post_by_code(url):
+    media = parse_threads_html(load("threads_post.html"), url)
+
+    assert media == [("video", f"{CDN}/o1/v/post_720.mp4")]
+
+
+def test_threads_falls_back_to_first_post_without_code():
+    media = parse_threads_html(
+        load("threads_post.html"), "https://www.threads.net/@tingla"
+    )
+
+    assert media == [("image", f"{CDN}/v/related.jpg")]
+
+
+def test_threads_carousel_keeps_order_and_largest_image():
+    media = parse_threads_html(
+        load("threads_carousel.html"),
+        "https://www.threads.net/@tingla/post/DCarousel9",
+    )
+
+    assert media == [
+        ("image", f"{CDN}/v/slide1_1080.jpg"),
+        ("video", f"{CDN}/o1/v/slide2.mp4"),
+    ]
+
+
+def test_threads_text_post_ignores_profile_og_image():
+    media = parse_threads_html(
+        load("threads_text_post.html"),
+        "https://www.threads.net/@tingla/post/DTextOnly1",
+    )
+
+    assert media == []
+
+
+def test_threads_og_video_fallback():
+    media = parse_threads_html(
+        load("threads_og_video.html"),
+        "https://www.threads.net/@tingla/post/DOgVideo01",
+    )
+
+    assert media == [("video", f"{CDN}/o1/v/og_post_secure.mp4")]
+
+
+def test_snapchat_reads_next_data_media_url():
+    media_url = parse_snapchat_html(load("snapchat_spotlight.html"))
+
+    assert media_url == (
+        "https://cf-st.sc-cdn.net/d/spotlight_main.mp4?mo=GlkaEhoAGgAyAX06AQRCBgi"
+    )
+
+
+def test_snapchat_og_video_fallback():
+    media_url = parse_snapchat_html(load("snapchat_og_video.html"))
+
+    assert media_url == "https://cf-st.sc-cdn.net/d/og_video.mp4"
+
+
+def test_snapchat_without_video_returns_none():
+    assert parse_snapchat_html(load("snapchat_no_media.html")) is None